@@ -1,4 +1,6 @@
+import click
 from flask import Flask
+from flask.cli import with_appcontext
 from flask_sqlalchemy import SQLAlchemy
 from flask_marshmallow import Marshmallow
 from flask_restx import Api
@@ -6,20 +8,73 @@ from flask_restx import Api
 db = SQLAlchemy()
 ma = Marshmallow()
 
-def create_app() -> Flask:
+def create_app(config_overrides: dict = None) -> Flask:
     app = Flask(__name__)
     app.config.from_object("config.Config")
+    if config_overrides:
+        app.config.update(config_overrides)
+    _apply_pool_options(app)
+
+    from app.services.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
 
     db.init_app(app)
     ma.init_app(app)
 
+    from app.services.response_cache import init_response_cache
+    init_response_cache(app)
+
+    # Request/SQL instrumentation and the Prometheus '/metrics' endpoint
+    from app.services.metrics import init_metrics
+    init_metrics(app)
+
+    # Optional in-memory serving tier for the daily data and yearly statistics reads
+    from app.services.memory_store import init_memory_store
+    init_memory_store(app)
+
     # Initialize the API with Swagger UI at '/swagger/'
     api = Api(app, doc="/swagger/", title="Weather API", version="1.0", description="API for weather data analysis")
 
     # Import the namespace after initializing the Api
     from app.routes.weather import weather_ns
+    from app.routes.yield_analysis import yield_ns
 
-    # Register the namespace with the API under the '/api/weather' path
+    # Register the namespaces with the API under the '/api/weather' and '/api/yield' paths
     api.add_namespace(weather_ns, path="/api/weather")
+    api.add_namespace(yield_ns, path="/api/yield")
+
+    app.cli.add_command(init_db_command)
+
+    return app
+
+
+def _apply_pool_options(app: Flask) -> None:
+    """Passes the DB_POOL_* settings to the engine unless the database is SQLite"""
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        return
+    options = {
+        "pool_size": app.config.get("DB_POOL_SIZE", 5),
+        "max_overflow": app.config.get("DB_MAX_OVERFLOW", 10),
+        "pool_timeout": app.config.get("DB_POOL_TIMEOUT", 30),
+        "pool_recycle": app.config.get("DB_POOL_RECYCLE", 1800),
+        "pool_pre_ping": app.config.get("DB_POOL_PRE_PING", True),
+    }
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {**options, **app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})}
+
+
+@click.command("init-db")
+@with_appcontext
+def init_db_command():
+    """Creates the database tables of the models (run once before starting the server)."""
+    db.create_all()
+    click.echo("Initialized the database.")
+
 
-    return app
\ No newline at end of file
+def dispose_engines_after_fork(app: Flask) -> None:
+    """
+    Drops the pooled connections a forked worker inherited from its parent, so every
+    worker opens its own; the parent's sockets are left open for the parent to use.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
\ No newline at end of file
@@ -0,0 +1,38 @@
+import contextlib
+
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.routes.weather_async import weather_routes
+from app.services.async_db import create_async_database
+
+
+def _settings(config_overrides=None):
+    """The upper-case settings of config.Config, like Flask's from_object, plus overrides"""
+    from config import Config
+    settings = {name: getattr(Config, name) for name in dir(Config) if name.isupper()}
+    settings.update(config_overrides or {})
+    return settings
+
+
+def create_asgi_app(config_overrides: dict = None) -> Starlette:
+    """
+    Builds the async (ASGI) variant of the weather API, served under /api/weather
+    like the Flask app, e.g. with `uvicorn asgi:app --workers 2`.
+
+    The engine is created at startup and disposed at shutdown, so every server
+    process gets its own connection pool.
+    """
+    settings = _settings(config_overrides)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        engine, app.state.sessions = create_async_database(settings)
+        try:
+            yield
+        finally:
+            await engine.dispose()
+
+    app = Starlette(routes=[Mount("/api/weather", routes=weather_routes)], lifespan=lifespan)
+    app.state.settings = settings
+    return app
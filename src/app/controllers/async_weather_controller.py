@@ -0,0 +1,188 @@
+import asyncio
+from datetime import date as date_type
+
+from sqlalchemy import func, select, tuple_
+
+from app.controllers.weather_analytics_controller import WeatherAnalyticsController
+from app.models.weather_data import WeatherData
+from app.models.weather_stats import WeatherStats
+
+
+class AsyncWeatherController:
+    """
+    Async counterparts of the WeatherAnalyticsController reads, for the ASGI app.
+
+    Queries run on an AsyncSession, so a waiting query does not hold up other
+    requests. Filtering, cursors and formatting are shared with the synchronous
+    controller, so both APIs return the same JSON.
+    """
+
+    @staticmethod
+    async def fetch_weather_data_for_date(session, station_id=None, date=None, page=1, per_page=20,
+                                          cursor=None, include_total=False, start_date=None, end_date=None):
+        """
+        Retrieves weather data for a station and/or date or date range.
+
+        Args:
+            session (AsyncSession): The session to query with.
+            station_id (str): The ID of the weather station.
+            date (str): The specific date (ISO format).
+            page (int): The page number for paginated results (default is 1).
+            per_page (int): The number of results per page (default is 20).
+            cursor (str): Opaque keyset cursor; when not None (use "" for the first page)
+                results are paged on (station_id, date) instead of page numbers.
+            include_total (bool): Whether to count all matching rows (keyset mode only).
+            start_date (str): First date to include (ISO format, inclusive).
+            end_date (str): Last date to include (ISO format, inclusive).
+
+        Returns:
+            list: The formatted weather data, or in keyset mode a dict with "items",
+            "next_cursor" and optionally "total".
+
+        Raises:
+            ValueError: If a date or the cursor is malformed.
+        """
+        query = AsyncWeatherController._weather_data_query(station_id, date, start_date, end_date)
+        return await AsyncWeatherController._paginate(
+            session, query, (WeatherData.station_id, WeatherData.date), page, per_page,
+            cursor, include_total, WeatherAnalyticsController._format_weather_data,
+        )
+
+    @staticmethod
+    async def fetch_aggregated_weather_statistics(session, station_id=None, year=None, page=1, per_page=20,
+                                                  cursor=None, include_total=False):
+        """
+        Retrieves aggregated weather statistics for a station and/or year.
+
+        Args:
+            session (AsyncSession): The session to query with.
+            station_id (str): The ID of the weather station.
+            year (int): The year for which statistics are to be fetched.
+            page (int): The page number for paginated results (default is 1).
+            per_page (int): The number of records per page (default is 20).
+            cursor (str): Opaque keyset cursor, as for fetch_weather_data_for_date.
+            include_total (bool): Whether to count all matching rows (keyset mode only).
+
+        Returns:
+            list: The formatted statistics, or in keyset mode a dict with "items",
+            "next_cursor" and optionally "total".
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        query = select(*WeatherAnalyticsController.WEATHER_STATS_COLUMNS)
+        if station_id:
+            query = query.where(WeatherStats.station_id == station_id)
+        if year:
+            query = query.where(WeatherStats.year == year)
+        return await AsyncWeatherController._paginate(
+            session, query, (WeatherStats.station_id, WeatherStats.year), page, per_page,
+            cursor, include_total, WeatherAnalyticsController._format_weather_stats,
+        )
+
+    @staticmethod
+    async def fetch_stations(session_factory, station_ids, start_date=None, end_date=None,
+                             max_rows=1000, concurrency=5):
+        """
+        Fetches daily data and yearly statistics for several stations, issuing the
+        per-station sub-queries concurrently.
+
+        Every sub-query runs on its own session (a session runs one query at a time);
+        at most `concurrency` of them hold a connection at once.
+
+        Args:
+            session_factory (async_sessionmaker): Creates the per-query sessions.
+            station_ids (list): The station IDs, answered in this order.
+            start_date (str): First date to include (ISO format, inclusive).
+            end_date (str): Last date to include (ISO format, inclusive).
+            max_rows (int): Upper bound on daily rows returned per station.
+            concurrency (int): Maximum number of sub-queries in flight.
+
+        Returns:
+            list: One {"station_id", "data", "truncated", "statistics"} entry per station.
+
+        Raises:
+            ValueError: If a date is malformed.
+        """
+        start, end = WeatherAnalyticsController._parse_date_range(start_date, end_date)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(query, format_func):
+            async with semaphore, session_factory() as session:
+                return format_func((await session.execute(query)).all())
+
+        def statistics_query(station_id):
+            query = select(*WeatherAnalyticsController.WEATHER_STATS_COLUMNS).where(WeatherStats.station_id == station_id)
+            if start:
+                query = query.where(WeatherStats.year >= start.year)
+            if end:
+                query = query.where(WeatherStats.year <= end.year)
+            return query.order_by(WeatherStats.year)
+
+        data_queries = [
+            AsyncWeatherController._weather_data_query(station_id, None, start_date, end_date)
+            .order_by(WeatherData.date).limit(max_rows + 1)
+            for station_id in station_ids
+        ]
+        results = await asyncio.gather(
+            *(run(query, WeatherAnalyticsController._format_weather_data) for query in data_queries),
+            *(run(statistics_query(s), WeatherAnalyticsController._format_weather_stats) for s in station_ids),
+        )
+        data, statistics = results[:len(station_ids)], results[len(station_ids):]
+        return [
+            {
+                "station_id": station_id,
+                "data": rows[:max_rows],
+                "truncated": len(rows) > max_rows,
+                "statistics": stats,
+            }
+            for station_id, rows, stats in zip(station_ids, data, statistics)
+        ]
+
+    @staticmethod
+    def _weather_data_query(station_id, date, start_date, end_date):
+        """
+        Builds the filtered weather_data select.
+
+        Raises:
+            ValueError: If a date is malformed.
+        """
+        query = select(*WeatherAnalyticsController.WEATHER_DATA_COLUMNS)
+        if station_id:
+            query = query.where(WeatherData.station_id == station_id)
+        if date:
+            try:
+                query = query.where(WeatherData.date == date_type.fromisoformat(date))
+            except (TypeError, ValueError):
+                raise ValueError("Dates must be in ISO format (YYYY-MM-DD).") from None
+        start, end = WeatherAnalyticsController._parse_date_range(start_date, end_date)
+        return WeatherAnalyticsController._filter_by_date_range(query, WeatherData.date, start, end)
+
+    @staticmethod
+    async def _paginate(session, query, key_columns, page, per_page, cursor, include_total, format_func):
+        """
+        Page-number (OFFSET) or keyset pagination of a select, like the synchronous
+        _paginate_query and _keyset_paginate_query.
+
+        Returns:
+            list | dict: Formatted rows, or the keyset page dict.
+        """
+        if cursor is None:
+            query = query.order_by(*key_columns).limit(per_page).offset(max(page - 1, 0) * per_page)
+            return format_func((await session.execute(query)).all())
+
+        result = {}
+        if include_total:
+            result["total"] = await session.scalar(select(func.count()).select_from(query.subquery()))
+        if cursor:
+            query = query.where(tuple_(*key_columns) > WeatherAnalyticsController._decode_cursor(cursor, key_columns))
+        rows = (await session.execute(query.order_by(*key_columns).limit(per_page + 1))).all()
+
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        result["items"] = format_func(rows)
+        result["next_cursor"] = (
+            WeatherAnalyticsController._encode_cursor([getattr(rows[-1], column.key) for column in key_columns])
+            if has_more else None
+        )
+        return result
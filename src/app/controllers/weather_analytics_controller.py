@@ -1,15 +1,48 @@
+import base64
+import csv
+import io
+import json
+import math
+from datetime import date as date_type, timedelta
+
+from sqlalchemy import case, cast, func, literal, literal_column, select, tuple_
+
+from app import db
 from app.models.weather_data import WeatherData
 from app.models.weather_stats import WeatherStats
+from app.models.weather_rollup import WeatherRollup
+from app.models.weather_sketch import WeatherSketch
+from app.models.weather_normal import WeatherNormal
+from app.services.arrow_format import weather_data_ipc_chunks, weather_data_table, weather_stats_table
+from app.services.memory_store import memory_snapshot
+from app.services.prefix_sums import StationPrefixSums
+from app.services.quantile_sketch import decode_sketch, merge_sketches, quantiles
+from app.services.response_cache import LRUCache, cached_by_data_version
+from app.services.rollup_planner import plan_rollup
 
 class WeatherAnalyticsController:
     """
     This controller manages operations related to weather data retrieval and statistical analysis.
     It provides methods to fetch weather data for specific stations and dates, 
     and aggregate weather statistics for stations within a given year.
+
+    Reads select plain column tuples rather than ORM instances, so no identity-map
+    bookkeeping or attribute instrumentation is paid per row.
     """
 
+    WEATHER_DATA_COLUMNS = (
+        WeatherData.station_id, WeatherData.date,
+        WeatherData.max_temp, WeatherData.min_temp, WeatherData.precipitation,
+    )
+    WEATHER_DATA_FIELDS = ("station_id", "date", "max_temp", "min_temp", "precipitation")
+    WEATHER_STATS_COLUMNS = (
+        WeatherStats.station_id, WeatherStats.year,
+        WeatherStats.avg_max_temp, WeatherStats.avg_min_temp, WeatherStats.total_precipitation,
+    )
+
     @staticmethod
-    def fetch_aggregated_weather_statistics(station_id=None, year=None, page=1, per_page=20):
+    def fetch_aggregated_weather_statistics(station_id=None, year=None, page=1, per_page=20,
+                                            cursor=None, include_total=False, columnar=False):
         """
         Retrieves aggregated weather statistics for a specific weather station in a given year.
 
@@ -18,33 +51,625 @@ class WeatherAnalyticsController:
             year (int): The year for which statistics are to be fetched.
             page (int): The page number for paginated results (default is 1).
             per_page (int): The number of records per page (default is 20).
+            cursor (str): Opaque keyset cursor; when not None (use "" for the first page)
+                results are paged on (station_id, year) instead of page numbers.
+            include_total (bool): Whether to count all matching rows (keyset mode only).
+            columnar (bool): Whether to return the rows as a pyarrow Table instead of dictionaries.
+
+        Served from the in-memory snapshot when MEMORY_STORE_ENABLED is set.
 
         Returns:
-            list: A list of dictionaries containing the aggregated weather statistics.
+            list: A list of dictionaries containing the aggregated weather statistics,
+            or in keyset mode a dict with "items", "next_cursor" and optionally "total".
         """
-        query = WeatherStats.query
+        format_func = weather_stats_table if columnar else WeatherAnalyticsController._format_weather_stats
+        snapshot = memory_snapshot()
+        if snapshot is not None:
+            return snapshot.fetch_statistics(station_id, year, page, per_page, cursor, include_total, format_func)
+
+        query = db.session.query(*WeatherAnalyticsController.WEATHER_STATS_COLUMNS)
         query = WeatherAnalyticsController._filter_by_station_and_year(query, station_id, year)
-        
-        return WeatherAnalyticsController._paginate_query(query, page, per_page, WeatherAnalyticsController._format_weather_stats)
+        key_columns = (WeatherStats.station_id, WeatherStats.year)
+
+        if cursor is not None:
+            return WeatherAnalyticsController._keyset_paginate_query(
+                query, key_columns, cursor, per_page, include_total, format_func,
+            )
+        query = query.order_by(*key_columns)
+        return WeatherAnalyticsController._paginate_query(query, page, per_page, format_func)
 
     @staticmethod
-    def fetch_weather_data_for_date(station_id=None, date=None, page=1, per_page=20):
+    def fetch_weather_data_for_date(station_id=None, date=None, page=1, per_page=20,
+                                    cursor=None, include_total=False, start_date=None, end_date=None,
+                                    columnar=False):
         """
-        Retrieves weather data for a specific weather station on a given date.
+        Retrieves weather data for a specific weather station on a given date or date range.
 
         Args:
             station_id (str): The ID of the weather station.
             date (str): The specific date for which weather data is required (ISO format).
+            start_date (str): First date to include (ISO format, inclusive).
+            end_date (str): Last date to include (ISO format, inclusive).
             page (int): The page number for paginated results (default is 1).
             per_page (int): The number of results per page (default is 20).
+            cursor (str): Opaque keyset cursor; when not None (use "" for the first page)
+                results are paged on (station_id, date) instead of page numbers.
+            include_total (bool): Whether to count all matching rows (keyset mode only).
+            columnar (bool): Whether to return the rows as a pyarrow Table instead of dictionaries.
+
+        Served from the in-memory snapshot when MEMORY_STORE_ENABLED is set.
 
         Returns:
-            list: A list of dictionaries containing the weather data for the specified station and date.
+            list: A list of dictionaries containing the weather data for the specified station and date,
+            or in keyset mode a dict with "items", "next_cursor" and optionally "total".
         """
-        query = WeatherData.query
+        format_func = weather_data_table if columnar else WeatherAnalyticsController._format_weather_data
+        snapshot = memory_snapshot()
+        if snapshot is not None:
+            return snapshot.fetch_weather_data(
+                station_id, date, page, per_page, cursor, include_total, start_date, end_date, format_func
+            )
+
+        query = db.session.query(*WeatherAnalyticsController.WEATHER_DATA_COLUMNS)
         query = WeatherAnalyticsController._filter_by_station_and_date(query, station_id, date)
-        
-        return WeatherAnalyticsController._paginate_query(query, page, per_page, WeatherAnalyticsController._format_weather_data)
+        start, end = WeatherAnalyticsController._parse_date_range(start_date, end_date)
+        query = WeatherAnalyticsController._filter_by_date_range(query, WeatherData.date, start, end)
+        key_columns = (WeatherData.station_id, WeatherData.date)
+
+        if cursor is not None:
+            return WeatherAnalyticsController._keyset_paginate_query(
+                query, key_columns, cursor, per_page, include_total, format_func,
+            )
+        query = query.order_by(*key_columns)
+        return WeatherAnalyticsController._paginate_query(query, page, per_page, format_func)
+
+    @staticmethod
+    def fetch_batch(keys):
+        """
+        Resolves many station/date and station/year lookups with one set-based query per table.
+
+        Args:
+            keys (list): Dictionaries with "station_id" and either "date" (ISO format,
+                daily weather data) or "year" (aggregated statistics).
+
+        Returns:
+            list: One {"key": ..., "data": ...} entry per input key, in input order;
+            "data" is None when nothing matches.
+
+        Raises:
+            ValueError: If a key is malformed.
+        """
+        date_keys, year_keys, parsed = set(), set(), []
+        for key in keys:
+            if not isinstance(key, dict) or not isinstance(key.get("station_id"), str):
+                raise ValueError("Each key needs a station_id and a date or a year.")
+            if key.get("date") is not None:
+                try:
+                    lookup = ("date", key["station_id"], date_type.fromisoformat(key["date"]))
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid date: {key['date']}") from None
+                date_keys.add(lookup[1:])
+            elif key.get("year") is not None:
+                try:
+                    lookup = ("year", key["station_id"], int(key["year"]))
+                except (TypeError, ValueError):
+                    raise ValueError(f"Invalid year: {key['year']}") from None
+                year_keys.add(lookup[1:])
+            else:
+                raise ValueError("Each key needs a station_id and a date or a year.")
+            parsed.append((key, lookup))
+
+        found = {}
+        if date_keys:
+            rows = db.session.query(*WeatherAnalyticsController.WEATHER_DATA_COLUMNS).filter(
+                tuple_(WeatherData.station_id, WeatherData.date).in_(sorted(date_keys))
+            ).all()
+            for row, formatted in zip(rows, WeatherAnalyticsController._format_weather_data(rows)):
+                found[("date", row.station_id, row.date)] = formatted
+        if year_keys:
+            rows = db.session.query(*WeatherAnalyticsController.WEATHER_STATS_COLUMNS).filter(
+                tuple_(WeatherStats.station_id, WeatherStats.year).in_(sorted(year_keys))
+            ).all()
+            for row, formatted in zip(rows, WeatherAnalyticsController._format_weather_stats(rows)):
+                found[("year", row.station_id, row.year)] = formatted
+
+        return [{"key": key, "data": found.get(lookup)} for key, lookup in parsed]
+
+    RESAMPLE_PERIODS = ("week", "month", "season")
+
+    @staticmethod
+    def fetch_resampled_weather_data(station_id=None, start_date=None, end_date=None, period="month"):
+        """
+        Aggregates daily weather data into weekly, monthly or seasonal buckets in the database.
+
+        Weeks start on Monday; seasons are meteorological (DJF, MAM, JJA, SON), with
+        December counted in the following year's winter. Buckets are clipped to the
+        requested date range when computing the number of days they cover.
+
+        Args:
+            station_id (str): The ID of the weather station.
+            start_date (str): First date to include (ISO format, inclusive).
+            end_date (str): Last date to include (ISO format, inclusive).
+            period (str): "week", "month" or "season".
+
+        Returns:
+            list: One dictionary per station and period with mean temperatures (degrees Celsius),
+            total precipitation (centimeters), the covered and observed day counts and
+            the number of days missing each measurement, ordered by station and period start.
+
+        Raises:
+            ValueError: If no filter is given, a date is malformed or the period is unknown.
+        """
+        if period not in WeatherAnalyticsController.RESAMPLE_PERIODS:
+            raise ValueError(f"Unsupported period: {period}")
+        if not station_id and not (start_date and end_date):
+            raise ValueError("A station_id or both start_date and end_date are required.")
+        start, end = WeatherAnalyticsController._parse_date_range(start_date, end_date)
+
+        table = WeatherData.__table__
+        bucket = WeatherAnalyticsController._period_start(
+            table.c.date, period, db.session.get_bind().dialect.name
+        ).label("period_start")
+        query = select(
+            table.c.station_id,
+            bucket,
+            func.count().label("observed_days"),
+            func.avg(table.c.max_temp).label("avg_max_temp"),
+            func.avg(table.c.min_temp).label("avg_min_temp"),
+            func.sum(table.c.precipitation).label("total_precipitation"),
+            func.count(table.c.max_temp).label("max_temp_days"),
+            func.count(table.c.min_temp).label("min_temp_days"),
+            func.count(table.c.precipitation).label("precipitation_days"),
+        )
+        if station_id:
+            query = query.where(table.c.station_id == station_id)
+        query = WeatherAnalyticsController._filter_by_date_range(query, table.c.date, start, end)
+        query = query.group_by(table.c.station_id, bucket).order_by(table.c.station_id, bucket)
+
+        results = []
+        for row in db.session.execute(query):
+            period_start = row.period_start
+            if not isinstance(period_start, date_type):
+                period_start = date_type.fromisoformat(str(period_start)[:10])
+            days = WeatherAnalyticsController._days_covered(period_start, period, start, end)
+            results.append({
+                "station_id": row.station_id,
+                "period": period,
+                "period_start": period_start.isoformat(),
+                "days": days,
+                "observed_days": row.observed_days,
+                "avg_max_temp": float(row.avg_max_temp) / 10 if row.avg_max_temp is not None else None,
+                "avg_min_temp": float(row.avg_min_temp) / 10 if row.avg_min_temp is not None else None,
+                "total_precipitation": (
+                    row.total_precipitation / 100 if row.total_precipitation is not None else None
+                ),
+                "missing_max_temp": days - row.max_temp_days,
+                "missing_min_temp": days - row.min_temp_days,
+                "missing_precipitation": days - row.precipitation_days,
+            })
+        return results
+
+    @staticmethod
+    def _period_start(column, period, dialect_name):
+        """
+        Builds the SQL expression for the first day of the period containing each date.
+
+        Args:
+            column: The date column.
+            period (str): "week", "month" or "season".
+            dialect_name (str): "postgresql" or "sqlite".
+
+        Returns:
+            ColumnElement: A date (PostgreSQL) or ISO date string (SQLite) expression.
+        """
+        if dialect_name == "postgresql":
+            # Units are inlined rather than bound so the SELECT and GROUP BY expressions match
+            if period == "season":
+                # Quarters of date + 1 month are DJF, MAM, JJA, SON shifted by a month
+                shifted = column + literal_column("interval '1 month'")
+                start = func.date_trunc(literal_column("'quarter'"), shifted) - literal_column("interval '1 month'")
+            else:
+                start = func.date_trunc(literal_column(f"'{period}'"), column)
+            return cast(start, db.Date)
+        if dialect_name == "sqlite":
+            if period == "week":
+                weekday = (cast(func.strftime("%w", column), db.Integer) + 6) % 7
+                return func.date(column, "-" + cast(weekday, db.String) + " days")
+            if period == "month":
+                return func.date(column, "start of month")
+            next_month = func.date(column, "start of month", "+1 month")
+            months_into_season = (cast(func.strftime("%m", next_month), db.Integer) - 1) % 3
+            return func.date(next_month, "-" + cast(months_into_season, db.String) + " months", "-1 month")
+        raise NotImplementedError(f"Resampling is not supported for {dialect_name}")
+
+    @staticmethod
+    def _days_covered(period_start, period, start, end):
+        """
+        Counts the calendar days of a period that fall inside the requested range.
+
+        Args:
+            period_start (date): First day of the period.
+            period (str): "week", "month" or "season".
+            start (date): First requested date, or None.
+            end (date): Last requested date, or None.
+
+        Returns:
+            int: The number of covered days.
+        """
+        if period == "week":
+            period_end = period_start + timedelta(days=7)
+        else:
+            months = 1 if period == "month" else 3
+            month_index = period_start.year * 12 + period_start.month - 1 + months
+            period_end = date_type(month_index // 12, month_index % 12 + 1, 1)
+        first = max(period_start, start) if start else period_start
+        last = min(period_end - timedelta(days=1), end) if end else period_end - timedelta(days=1)
+        return max((last - first).days + 1, 0)
+
+    ROLLUP_MEASURES = (
+        "observed_days", "max_temp_sum", "max_temp_count", "heat_days", "min_temp_sum", "min_temp_count",
+        "precipitation_sum", "precipitation_count",
+    )
+
+    @staticmethod
+    def fetch_rollup(level="station", period="year", region=None, year=None):
+        """
+        Answers a region x period aggregate from the coarsest stored rollup grain.
+
+        Args:
+            level (str): "station", "state" (two-letter code) or "all".
+            period (str): "month", "season" (DJF, MAM, JJA, SON; December counts in
+                the following year) or "year".
+            region (str): Station id or state code to restrict to (ignored for "all").
+            year (int): The (season) year to restrict to.
+
+        Returns:
+            dict: "source_grain" (the stored grain read) and "items", one per region and
+            period with mean temperatures (degrees Celsius), total precipitation
+            (centimeters), observed days and heat days (summed over stations),
+            ordered by region, year and period.
+
+        Raises:
+            ValueError: If the level or period is unknown.
+        """
+        stored_level, stored_period = plan_rollup(level, period)
+        r = WeatherRollup
+
+        region_column = {"station": r.region, "state": r.state, "all": literal("ALL")}[level]
+        months_to_seasons = stored_period == "month" and period == "season"
+        if stored_period == period:
+            year_column, period_column = r.year, r.period
+        elif months_to_seasons:
+            year_column = r.year + case((r.period == 12, 1), else_=0)
+            period_column = case(
+                (r.period.in_([12, 1, 2]), 1), (r.period.in_([3, 4, 5]), 2),
+                (r.period.in_([6, 7, 8]), 3), else_=4,
+            )
+        else:
+            year_column, period_column = r.year, literal(0)
+
+        # Map stored cells onto the requested grain in a subquery, then sum them up
+        cells = select(
+            region_column.label("region"), year_column.label("year"), period_column.label("period"),
+            *(getattr(r, name) for name in WeatherAnalyticsController.ROLLUP_MEASURES),
+        ).where(r.grain == f"{stored_level}_{stored_period}")
+        if region and level != "all":
+            cells = cells.where(region_column == region)
+        if year is not None:
+            # A winter starts in the previous December; filter on stored years so the grain/year index is used
+            cells = cells.where(r.year.between(year - 1, year) if months_to_seasons else r.year == year)
+        cells = cells.subquery()
+
+        keys = (cells.c.region, cells.c.year, cells.c.period)
+        query = select(
+            *keys, *(func.sum(cells.c[name]).label(name) for name in WeatherAnalyticsController.ROLLUP_MEASURES)
+        )
+        if year is not None:
+            query = query.where(cells.c.year == year)
+        query = query.group_by(*keys).order_by(*keys)
+
+        items = [
+            {
+                "region": row.region,
+                "year": row.year,
+                "period": period,
+                "period_index": row.period if period != "year" else None,
+                "observed_days": row.observed_days,
+                "avg_max_temp": float(row.max_temp_sum) / row.max_temp_count / 10 if row.max_temp_count else None,
+                "avg_min_temp": float(row.min_temp_sum) / row.min_temp_count / 10 if row.min_temp_count else None,
+                "total_precipitation": float(row.precipitation_sum) / 100 if row.precipitation_count else None,
+                "heat_days": row.heat_days,
+            }
+            for row in db.session.execute(query)
+        ]
+        return {"source_grain": f"{stored_level}_{stored_period}", "items": items}
+
+    SKETCH_MEASURES = ("max_temp", "min_temp", "precipitation")
+
+    @staticmethod
+    def fetch_percentiles(measure, qs, station_ids=None, state=None, start_year=None, end_year=None,
+                          wet_days=False):
+        """
+        Answers percentiles of daily values for any set of station-years by merging their
+        stored sketches, without reading weather_data.
+
+        Args:
+            measure (str): "max_temp", "min_temp" or "precipitation".
+            qs (list): Quantiles between 0 and 1.
+            station_ids (list): Stations to include; None for every station.
+            state (str): Two-letter state code to restrict to.
+            start_year (int): First year to include.
+            end_year (int): Last year to include.
+            wet_days (bool): Only count days with precipitation above zero (precipitation only).
+
+        Returns:
+            dict: The measure, the number of "stations", "station_years" and "days" merged,
+            "min", "max" and "percentiles" ({"q", "value"} per quantile), in degrees
+            Celsius or millimeters; values are None when no day matches.
+
+        Raises:
+            ValueError: If the measure is unknown, a quantile is out of range or
+            wet_days is requested for a temperature.
+        """
+        if measure not in WeatherAnalyticsController.SKETCH_MEASURES:
+            raise ValueError(f"Unsupported measure: {measure}")
+        if not qs or any(not 0 <= q <= 1 for q in qs):
+            raise ValueError("Quantiles must be between 0 and 1.")
+        if wet_days and measure != "precipitation":
+            raise ValueError("wet_days only applies to precipitation.")
+
+        query = db.session.query(WeatherSketch.station_id, WeatherSketch.sketch).filter(WeatherSketch.measure == measure)
+        if station_ids:
+            query = query.filter(WeatherSketch.station_id.in_(station_ids))
+        if state:
+            query = query.filter(WeatherSketch.state == state.upper())
+        if start_year is not None:
+            query = query.filter(WeatherSketch.year >= start_year)
+        if end_year is not None:
+            query = query.filter(WeatherSketch.year <= end_year)
+        rows = query.all()
+
+        values, counts = merge_sketches(decode_sketch(sketch) for _, sketch in rows)
+        if wet_days:
+            values, counts = values[values > 0], counts[values > 0]
+        present = counts > 0
+        return {
+            "measure": measure,
+            "stations": len({station_id for station_id, _ in rows}),
+            "station_years": len(rows),
+            "days": int(counts.sum()),
+            "min": float(values[present][0]) / 10 if present.any() else None,
+            "max": float(values[present][-1]) / 10 if present.any() else None,
+            "percentiles": [
+                {"q": q, "value": value / 10 if value is not None else None}
+                for q, value in zip(qs, quantiles(values, counts, qs))
+            ],
+        }
+
+    NORMAL_MEASURES = ("max_temp", "min_temp", "precipitation")
+
+    @staticmethod
+    def fetch_anomalies(date, station_ids=None):
+        """
+        Returns a day's observations with their departure from the station's normal
+        for that day of the year, one indexed normals lookup per station-day.
+
+        Args:
+            date (str): The date (ISO format).
+            station_ids (list): Stations to include; None for every station observed that day.
+
+        Returns:
+            list: One dictionary per station with, per measure, the observed "value",
+            the "normal" and its "std" (degrees Celsius or millimeters), the "anomaly"
+            (value minus normal) and its "z_score"; None where a part is unavailable.
+
+        Raises:
+            ValueError: If the date is malformed.
+        """
+        try:
+            day = date_type.fromisoformat(date)
+        except (TypeError, ValueError):
+            raise ValueError("Dates must be in ISO format (YYYY-MM-DD).") from None
+        # Leap-year calendar day, as in scripts.weather_climatology.day_of_year
+        day_of_year = date_type(2000, day.month, day.day).timetuple().tm_yday
+
+        n = WeatherNormal
+        measures = WeatherAnalyticsController.NORMAL_MEASURES
+        query = db.session.query(
+            WeatherData.station_id,
+            *(getattr(WeatherData, m) for m in measures),
+            *(getattr(n, f"{m}_{part}") for m in measures for part in ("mean", "std")),
+        ).outerjoin(
+            n, (n.station_id == WeatherData.station_id) & (n.day_of_year == day_of_year)
+        ).filter(WeatherData.date == day)
+        if station_ids:
+            query = query.filter(WeatherData.station_id.in_(station_ids))
+
+        return [
+            {
+                "station_id": row.station_id,
+                "date": day.isoformat(),
+                "day_of_year": day_of_year,
+                **{
+                    m: WeatherAnalyticsController._anomaly(
+                        getattr(row, m), getattr(row, f"{m}_mean"), getattr(row, f"{m}_std")
+                    )
+                    for m in measures
+                },
+            }
+            for row in query.order_by(WeatherData.station_id)
+        ]
+
+    @staticmethod
+    def _anomaly(value, mean, std):
+        """Converts one observation and its normal from tenths and compares them"""
+        anomaly = value - mean if value is not None and mean is not None else None
+        return {
+            "value": value / 10 if value is not None else None,
+            "normal": mean / 10 if mean is not None else None,
+            "std": std / 10 if std is not None else None,
+            "anomaly": anomaly / 10 if anomaly is not None else None,
+            "z_score": anomaly / std if anomaly is not None and std else None,
+        }
+
+    MAX_MOVING_WINDOW = 366
+    # Stations whose prefix sums are kept in memory per data version (about 0.5 MB per 30 years)
+    PREFIX_SUMS_MAX_STATIONS = 64
+
+    @staticmethod
+    def fetch_growing_season(station_id, start_date=None, end_date=None, window=7):
+        """
+        Growing degree days, cumulative precipitation and moving averages for a
+        station over a date range, answered from the station's prefix sums
+        (kept for the most recently used stations until the data version changes)
+        instead of summing daily rows.
+
+        Args:
+            station_id (str): The ID of the weather station.
+            start_date (str): First date to include (ISO format, inclusive); the station's first day when omitted.
+            end_date (str): Last date to include (ISO format, inclusive); the station's last day when omitted.
+            window (int): Length in days of the trailing moving averages.
+
+        Returns:
+            dict: Range totals ("growing_degree_days", "total_precipitation" in centimeters,
+            mean temperatures and the observed day counts) and a "series" with, per day,
+            the running totals since start_date and the moving averages (degrees Celsius
+            or millimeters per day); None where nothing was observed.
+
+        Raises:
+            ValueError: If a date or the window is invalid, or the station has no data.
+        """
+        if not 1 <= window <= WeatherAnalyticsController.MAX_MOVING_WINDOW:
+            raise ValueError(f"window must be between 1 and {WeatherAnalyticsController.MAX_MOVING_WINDOW} days.")
+        start, end = WeatherAnalyticsController._parse_date_range(start_date, end_date)
+        # One bounded cache per data version, so a new version drops every station at once
+        stations = cached_by_data_version(
+            "prefix_sums",
+            lambda: LRUCache(WeatherAnalyticsController.PREFIX_SUMS_MAX_STATIONS, math.inf),
+        )
+        prefix = stations.get(station_id)
+        if prefix is None:
+            prefix = StationPrefixSums.from_rows(
+                db.session.query(WeatherData.date, WeatherData.max_temp, WeatherData.min_temp,
+                                 WeatherData.precipitation)
+                .filter(WeatherData.station_id == station_id).order_by(WeatherData.date).all()
+            )
+            if prefix is None:
+                raise ValueError(f"No weather data for station {station_id}.")
+            stations.set(station_id, prefix)
+        start = start or prefix.first_date
+        end = end or prefix.last_date
+        i, j = prefix.bounds(start, end)
+
+        def mean(name, scale):
+            total, count = prefix.range_total(name, i, j)
+            return total / count / scale if count else None
+
+        def optional(values, scale):
+            return [None if math.isnan(v) else v / scale for v in values.tolist()]
+
+        gdd, gdd_days = prefix.range_total("gdd", i, j)
+        precipitation, precipitation_days = prefix.range_total("precipitation", i, j)
+        dates = [prefix.first_date + timedelta(days=k) for k in range(i, j)]
+        series = zip(
+            dates,
+            (prefix.running_totals("gdd", i, j) / 10).tolist(),
+            (prefix.running_totals("precipitation", i, j) / 100).tolist(),
+            optional(prefix.moving_means("max_temp", i, j, window), 10),
+            optional(prefix.moving_means("min_temp", i, j, window), 10),
+            optional(prefix.moving_means("precipitation", i, j, window), 10),
+        )
+        return {
+            "station_id": station_id,
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "window": window,
+            "growing_degree_days": gdd / 10,
+            "gdd_days": gdd_days,
+            "avg_max_temp": mean("max_temp", 10),
+            "avg_min_temp": mean("min_temp", 10),
+            "total_precipitation": precipitation / 100,
+            "precipitation_days": precipitation_days,
+            "series": [
+                {
+                    "date": day.isoformat(),
+                    "growing_degree_days": cumulative_gdd,
+                    "total_precipitation": cumulative_precipitation,
+                    "moving_max_temp": moving_max,
+                    "moving_min_temp": moving_min,
+                    "moving_precipitation": moving_precipitation,
+                }
+                for day, cumulative_gdd, cumulative_precipitation, moving_max, moving_min, moving_precipitation
+                in series
+            ],
+        }
+
+    EXPORT_FORMATS = ("ndjson", "csv", "arrow")
+
+    @staticmethod
+    def stream_weather_data(station_id=None, start_date=None, end_date=None, fmt="ndjson", fetch_rows=5000):
+        """
+        Streams daily weather data for a station and/or a date range, ordered by station and date.
+
+        Rows are read through a server-side cursor fetch_rows at a time and serialized
+        chunk by chunk, so memory use does not grow with the size of the export.
+        Arguments are validated eagerly; the returned generator only does I/O.
+
+        Args:
+            station_id (str): The ID of the weather station.
+            start_date (str): First date to include (ISO format, inclusive).
+            end_date (str): Last date to include (ISO format, inclusive).
+            fmt (str): "ndjson" (one JSON object per line), "csv" (with a header row) or
+                "arrow" (an Arrow IPC stream with one record batch per fetch).
+            fetch_rows (int): The number of rows fetched from the database per round trip.
+
+        Returns:
+            generator: Text chunks of the serialized export (bytes for "arrow").
+
+        Raises:
+            ValueError: If no filter is given, a date is malformed or the format is unknown.
+        """
+        if fmt not in WeatherAnalyticsController.EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        if not station_id and not (start_date and end_date):
+            raise ValueError("A station_id or both start_date and end_date are required.")
+        start, end = WeatherAnalyticsController._parse_date_range(start_date, end_date)
+
+        table = WeatherData.__table__
+        query = select(*WeatherAnalyticsController.WEATHER_DATA_COLUMNS)
+        if station_id:
+            query = query.where(table.c.station_id == station_id)
+        query = WeatherAnalyticsController._filter_by_date_range(query, table.c.date, start, end)
+        query = query.order_by(table.c.station_id, table.c.date)
+
+        serialize = (
+            WeatherAnalyticsController._ndjson_chunk if fmt == "ndjson"
+            else WeatherAnalyticsController._csv_chunk
+        )
+
+        def generate():
+            if fmt == "csv":
+                yield serialize([WeatherAnalyticsController.WEATHER_DATA_FIELDS])
+            with db.engine.connect() as conn:
+                result = conn.execution_options(stream_results=True, yield_per=fetch_rows).execute(query)
+                if fmt == "arrow":
+                    yield from weather_data_ipc_chunks(result.partitions())
+                    return
+                for partition in result.partitions():
+                    yield serialize(WeatherAnalyticsController._convert_weather_rows(partition))
+
+        return generate()
+
+    @staticmethod
+    def _ndjson_chunk(rows):
+        columns = WeatherAnalyticsController.WEATHER_DATA_FIELDS
+        return "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows)
+
+    @staticmethod
+    def _csv_chunk(rows):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
 
     @staticmethod
     def _filter_by_station_and_year(query, station_id, year):
@@ -84,6 +709,48 @@ class WeatherAnalyticsController:
             query = query.filter_by(date=date)
         return query
 
+    @staticmethod
+    def _parse_date_range(start_date, end_date):
+        """
+        Parses optional ISO start and end dates.
+
+        Args:
+            start_date (str): First date (ISO format), or None.
+            end_date (str): Last date (ISO format), or None.
+
+        Returns:
+            tuple: (start, end) as dates, None where not given.
+
+        Raises:
+            ValueError: If a date is malformed.
+        """
+        try:
+            start = date_type.fromisoformat(start_date) if start_date else None
+            end = date_type.fromisoformat(end_date) if end_date else None
+        except (TypeError, ValueError):
+            raise ValueError("Dates must be in ISO format (YYYY-MM-DD).") from None
+        return start, end
+
+    @staticmethod
+    def _filter_by_date_range(query, column, start, end):
+        """
+        Applies an inclusive date range filter.
+
+        Args:
+            query: The query object (ORM query or Core select).
+            column: The date column to filter on.
+            start (date): First date to include, or None.
+            end (date): Last date to include, or None.
+
+        Returns:
+            query: The filtered query object.
+        """
+        if start:
+            query = query.filter(column >= start)
+        if end:
+            query = query.filter(column <= end)
+        return query
+
     @staticmethod
     def _paginate_query(query, page, per_page, format_func):
         """
@@ -98,29 +765,108 @@ class WeatherAnalyticsController:
         Returns:
             list: A list of formatted results for the requested page.
         """
-        data = query.paginate(page=page, per_page=per_page).items
+        data = query.paginate(page=page, per_page=per_page, count=False).items
         return format_func(data)
 
+    @staticmethod
+    def _keyset_paginate_query(query, key_columns, cursor, per_page, include_total, format_func):
+        """
+        Paginates on the unique key instead of OFFSET, so every page is an index
+        range scan no matter how deep it is.
+
+        Args:
+            query: The filtered query object.
+            key_columns (tuple): The (station_id, date|year) columns of the unique key.
+            cursor (str): Cursor returned as next_cursor by the previous page ("" for the first).
+            per_page (int): The number of results per page.
+            include_total (bool): Whether to run a COUNT over the filtered query.
+            format_func (function): The function to format the query result.
+
+        Returns:
+            dict: "items", "next_cursor" (None on the last page) and "total" when requested.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        result = {}
+        if include_total:
+            result["total"] = query.order_by(None).count()
+
+        if cursor:
+            query = query.filter(tuple_(*key_columns) > WeatherAnalyticsController._decode_cursor(cursor, key_columns))
+        rows = query.order_by(*key_columns).limit(per_page + 1).all()
+
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        result["items"] = format_func(rows)
+        result["next_cursor"] = (
+            WeatherAnalyticsController._encode_cursor(
+                [getattr(rows[-1], column.key) for column in key_columns]
+            ) if has_more else None
+        )
+        return result
+
+    @staticmethod
+    def _encode_cursor(key_values):
+        """
+        Encodes the last row's key as an opaque URL-safe cursor.
+
+        Args:
+            key_values (list): Values of the key columns (dates are stored in ISO format).
+
+        Returns:
+            str: The cursor.
+        """
+        payload = [v.isoformat() if isinstance(v, date_type) else v for v in key_values]
+        return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _decode_cursor(cursor, key_columns):
+        """
+        Decodes a cursor produced by _encode_cursor.
+
+        Args:
+            cursor (str): The opaque cursor.
+            key_columns (tuple): The key columns the cursor refers to.
+
+        Returns:
+            tuple: The key values, typed like the key columns.
+
+        Raises:
+            ValueError: If the cursor is malformed.
+        """
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if not isinstance(values, list) or len(values) != len(key_columns):
+                raise ValueError
+            return tuple(
+                date_type.fromisoformat(v) if column.key == "date" else column.type.python_type(v)
+                for v, column in zip(values, key_columns)
+            )
+        except (ValueError, TypeError, UnicodeDecodeError):
+            raise ValueError("Invalid cursor") from None
+
     @staticmethod
     def _format_weather_stats(data):
         """
         Formats the aggregated weather statistics data into a list of dictionaries.
         
         Args:
-            data: The raw weather statistics data to format.
+            data: Row tuples in WEATHER_STATS_COLUMNS order.
         
         Returns:
             list: The formatted weather statistics data.
         """
         return [
             {
-                "station_id": s.station_id,
-                "year": s.year,
-                "avg_max_temp": s.avg_max_temp,
-                "avg_min_temp": s.avg_min_temp,
-                "total_precipitation": s.total_precipitation,
+                "station_id": station_id,
+                "year": year,
+                "avg_max_temp": avg_max_temp,
+                "avg_min_temp": avg_min_temp,
+                "total_precipitation": total_precipitation,
             }
-            for s in data
+            for station_id, year, avg_max_temp, avg_min_temp, total_precipitation in data
         ]
 
     @staticmethod
@@ -129,18 +875,32 @@ class WeatherAnalyticsController:
         Formats the weather data for a given date into a list of dictionaries.
         
         Args:
-            data: The raw weather data to format.
+            data: Row tuples in WEATHER_DATA_COLUMNS order.
         
         Returns:
             list: The formatted weather data.
         """
+        columns = WeatherAnalyticsController.WEATHER_DATA_FIELDS
+        return [dict(zip(columns, row)) for row in WeatherAnalyticsController._convert_weather_rows(data)]
+
+    @staticmethod
+    def _convert_weather_rows(rows):
+        """
+        Converts raw weather_data rows from tenths to degrees Celsius and millimeters.
+
+        Args:
+            rows: Row tuples in WEATHER_DATA_COLUMNS order.
+
+        Returns:
+            list: Tuples of converted values, None for missing measurements.
+        """
         return [
-            {
-                "station_id": d.station_id,
-                "date": d.date.isoformat(),
-                "max_temp": d.max_temp / 10 if d.max_temp else None,
-                "min_temp": d.min_temp / 10 if d.min_temp else None,
-                "precipitation": d.precipitation / 10 if d.precipitation else None,
-            }
-            for d in data
+            (
+                station_id,
+                day.isoformat(),
+                max_temp / 10 if max_temp is not None else None,
+                min_temp / 10 if min_temp is not None else None,
+                precipitation / 10 if precipitation is not None else None,
+            )
+            for station_id, day, max_temp, min_temp, precipitation in rows
         ]
@@ -0,0 +1,189 @@
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+
+from app import db
+from app.models.weather_rollup import WeatherRollup
+from app.models.yield_data import YieldData
+from app.services.response_cache import cached_by_data_version
+
+# Rollup season numbers 1-4 (DJF, MAM, JJA, SON); winter Y runs from December Y-1
+SEASON_NAMES = ("winter", "spring", "summer", "autumn")
+SEASON_FEATURES = ("max_temp", "min_temp", "precipitation", "heat_days")
+
+
+class YieldAnalyticsController:
+    """
+    This controller relates yearly crop yield to weather features aggregated over all stations.
+    The per-year feature matrix is built from the station-season rollup cells and kept
+    in memory until the data version changes, so requests never scan weather_data.
+    """
+
+    @staticmethod
+    def fetch_yield_analysis(features=None, include_matrix=False):
+        """
+        Summarizes how yearly yield relates to each seasonal weather feature.
+
+        Args:
+            features (list): Feature names for a multiple regression of yield on year
+                and these features; None to skip the regression.
+            include_matrix (bool): Whether to return the per-year feature matrix as well.
+
+        Returns:
+            dict: "years", the linear yield "trend", per-feature "features" summaries
+            (correlation with yield and with detrended yield, simple regression slope,
+            intercept and r_squared), optionally "regression" and "matrix".
+
+        Raises:
+            ValueError: If a feature is unknown or there are too few years to fit.
+        """
+        matrix = cached_by_data_version(
+            "yield_feature_matrix", YieldAnalyticsController._build_feature_matrix
+        )
+        feature_names = [c for c in matrix.columns if c != "total_yield"]
+        unknown = [f for f in features or [] if f not in feature_names]
+        if unknown:
+            raise ValueError(f"Unknown features: {', '.join(unknown)}")
+        if len(matrix) < 3:
+            raise ValueError("At least three years with both yield and weather data are required.")
+
+        years = matrix.index.to_numpy(dtype=np.float64)
+        total_yield = matrix["total_yield"].to_numpy(dtype=np.float64)
+        trend_slope, trend_intercept = np.polyfit(years, total_yield, 1)
+        detrended = total_yield - (trend_slope * years + trend_intercept)
+
+        result = {
+            "years": [int(matrix.index.min()), int(matrix.index.max())],
+            "trend": {"slope": float(trend_slope), "intercept": float(trend_intercept)},
+            "features": {
+                name: YieldAnalyticsController._summarize_feature(
+                    matrix[name].to_numpy(dtype=np.float64), total_yield, detrended
+                )
+                for name in feature_names
+            },
+        }
+        if features:
+            result["regression"] = YieldAnalyticsController._regression(matrix, list(features))
+        if include_matrix:
+            result["matrix"] = [
+                {"year": int(year), **YieldAnalyticsController._json_values(row)}
+                for year, row in matrix.iterrows()
+            ]
+        return result
+
+    @staticmethod
+    def _build_feature_matrix():
+        """
+        Builds the per-year feature matrix joined with yield.
+
+        Temperatures are means over all station-days (degrees Celsius); precipitation
+        (centimeters) and heat days are per-station season totals averaged over the
+        reporting stations, so changes in station coverage do not look like climate.
+
+        Returns:
+            DataFrame: Indexed by year, with total_yield and <season>_<feature> columns.
+        """
+        r = WeatherRollup
+        cells = pd.DataFrame(
+            db.session.execute(select(
+                r.year, r.period, r.max_temp_sum, r.max_temp_count, r.min_temp_sum,
+                r.min_temp_count, r.precipitation_sum, r.precipitation_count, r.heat_days,
+            ).where(r.grain == "station_season")).all(),
+            columns=["year", "period", "max_temp_sum", "max_temp_count", "min_temp_sum",
+                     "min_temp_count", "precipitation_sum", "precipitation_count", "heat_days"],
+        )
+        yields = pd.DataFrame(
+            db.session.execute(select(YieldData.year, YieldData.total_yield)).all(),
+            columns=["year", "total_yield"],
+        ).set_index("year")
+        if cells.empty or yields.empty:
+            return yields.iloc[0:0]
+
+        cells["precipitation"] = (cells["precipitation_sum"] / 100).where(cells["precipitation_count"] > 0)
+        cells["heat_days"] = cells["heat_days"].where(cells["max_temp_count"] > 0)
+        grouped = cells.groupby(["year", "period"])
+        sums = grouped[["max_temp_sum", "max_temp_count", "min_temp_sum", "min_temp_count"]].sum()
+        seasonal = pd.DataFrame({
+            "max_temp": (sums["max_temp_sum"] / sums["max_temp_count"] / 10).where(sums["max_temp_count"] > 0),
+            "min_temp": (sums["min_temp_sum"] / sums["min_temp_count"] / 10).where(sums["min_temp_count"] > 0),
+            "precipitation": grouped["precipitation"].mean(),
+            "heat_days": grouped["heat_days"].mean(),
+        })
+
+        wide = seasonal.unstack("period")
+        wide.columns = [f"{SEASON_NAMES[period - 1]}_{feature}" for feature, period in wide.columns]
+        ordered = [
+            f"{season}_{feature}" for season in SEASON_NAMES for feature in SEASON_FEATURES
+            if f"{season}_{feature}" in wide.columns
+        ]
+        return yields.join(wide[ordered], how="inner").sort_index()
+
+    @staticmethod
+    def _summarize_feature(values, total_yield, detrended):
+        """
+        Correlation and simple linear regression of yield on one feature.
+
+        Args:
+            values (ndarray): Feature values per year (NaN where unavailable).
+            total_yield (ndarray): Yield per year.
+            detrended (ndarray): Yield minus its linear trend over the years.
+
+        Returns:
+            dict: n, correlation, detrended_correlation, slope, intercept and r_squared;
+            the statistics are None when the feature is constant or has fewer than 3 years.
+        """
+        valid = ~np.isnan(values)
+        x = values[valid]
+        summary = {"n": int(valid.sum())}
+        if x.size < 3 or np.ptp(x) == 0:
+            return {**summary, "correlation": None, "detrended_correlation": None,
+                    "slope": None, "intercept": None, "r_squared": None}
+        correlation = np.corrcoef(x, total_yield[valid])[0, 1]
+        slope, intercept = np.polyfit(x, total_yield[valid], 1)
+        return {
+            **summary,
+            "correlation": float(correlation),
+            "detrended_correlation": float(np.corrcoef(x, detrended[valid])[0, 1]),
+            "slope": float(slope),
+            "intercept": float(intercept),
+            "r_squared": float(correlation ** 2),
+        }
+
+    @staticmethod
+    def _regression(matrix, features):
+        """
+        Ordinary least squares of yield on the year (trend) and the given features.
+
+        Args:
+            matrix (DataFrame): The feature matrix.
+            features (list): Feature column names.
+
+        Returns:
+            dict: n, coefficients (intercept, year and each feature), r_squared and adjusted_r_squared.
+
+        Raises:
+            ValueError: If there are not enough complete years for the number of features.
+        """
+        data = matrix[["total_yield"] + features].dropna()
+        n, k = len(data), len(features) + 1
+        if n <= k + 1:
+            raise ValueError(f"{n} complete years are not enough to fit {len(features)} features.")
+        design = np.column_stack([
+            np.ones(n), data.index.to_numpy(dtype=np.float64), data[features].to_numpy(dtype=np.float64),
+        ])
+        target = data["total_yield"].to_numpy(dtype=np.float64)
+        coefficients, _, _, _ = np.linalg.lstsq(design, target, rcond=None)
+        residual = target - design @ coefficients
+        total = target - target.mean()
+        r_squared = 1 - residual @ residual / (total @ total)
+        return {
+            "n": n,
+            "coefficients": dict(zip(["intercept", "year"] + features, map(float, coefficients))),
+            "r_squared": float(r_squared),
+            "adjusted_r_squared": float(1 - (1 - r_squared) * (n - 1) / (n - k - 1)),
+        }
+
+    @staticmethod
+    def _json_values(row):
+        """Converts a matrix row to JSON-friendly values (NaN -> None)"""
+        return {name: (None if pd.isna(value) else float(value)) for name, value in row.items()}
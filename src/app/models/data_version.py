@@ -0,0 +1,12 @@
+from app import db
+
+
+class DataVersion(db.Model):
+    """Single-row counter bumped by the ingestor and the analytics engine on every data change"""
+    __tablename__ = 'data_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self):
+        return f'<DataVersion {self.version}>'
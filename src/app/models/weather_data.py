@@ -13,9 +13,11 @@ class WeatherData(db.Model):
     min_temp = db.Column(db.Integer)        # In tenths of a degree Celsius
     precipitation = db.Column(db.Integer)   # In tenths of a millimeter
 
-    # Unique constraint for station-date combination
+    # Unique constraint for station-date combination, plus a date-first index
+    # for lookups across all stations on a date or over a date range
     __table_args__ = (
         db.UniqueConstraint('station_id', 'date', name='unique_station_date'),
+        db.Index('ix_weather_data_date_station', 'date', 'station_id'),
     )
 
     def __repr__(self):
@@ -0,0 +1,25 @@
+from app import db
+
+
+class WeatherNormal(db.Model):
+    """
+    Smoothed 1985-2014 day-of-year normals per station, maintained by
+    scripts.weather_climatology alongside weather_stats. day_of_year counts on a
+    leap-year calendar (Feb 29 is day 60); values are in tenths, like weather_data.
+    """
+    __tablename__ = 'weather_normals'
+
+    station_id = db.Column(db.String(50), primary_key=True)
+    day_of_year = db.Column(db.Integer, primary_key=True)
+    max_temp_mean = db.Column(db.Float)
+    max_temp_std = db.Column(db.Float)
+    max_temp_count = db.Column(db.Integer, nullable=False)
+    min_temp_mean = db.Column(db.Float)
+    min_temp_std = db.Column(db.Float)
+    min_temp_count = db.Column(db.Integer, nullable=False)
+    precipitation_mean = db.Column(db.Float)
+    precipitation_std = db.Column(db.Float)
+    precipitation_count = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f'<WeatherNormal {self.station_id} day {self.day_of_year}>'
@@ -0,0 +1,32 @@
+from app import db
+
+
+class WeatherRollup(db.Model):
+    """
+    Precomputed additive aggregates at several region x period grains, maintained
+    by scripts.weather_rollups alongside weather_stats.
+    """
+    __tablename__ = 'weather_rollup'
+
+    id = db.Column(db.Integer, primary_key=True)
+    grain = db.Column(db.String(20), nullable=False)    # e.g. "station_month", "state_year"
+    region = db.Column(db.String(50), nullable=False)   # Station id, state code or "ALL"
+    state = db.Column(db.String(2))
+    year = db.Column(db.Integer, nullable=False)        # Season year for seasonal grains
+    period = db.Column(db.Integer, nullable=False)      # Month 1-12, season 1-4 (DJF..SON) or 0
+    observed_days = db.Column(db.Integer, nullable=False)
+    max_temp_sum = db.Column(db.BigInteger, nullable=False)        # In tenths of a degree Celsius
+    max_temp_count = db.Column(db.Integer, nullable=False)
+    heat_days = db.Column(db.Integer, nullable=False, server_default='0')  # Days with max_temp >= 30 degrees Celsius
+    min_temp_sum = db.Column(db.BigInteger, nullable=False)        # In tenths of a degree Celsius
+    min_temp_count = db.Column(db.Integer, nullable=False)
+    precipitation_sum = db.Column(db.BigInteger, nullable=False)   # In tenths of a millimeter
+    precipitation_count = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint('grain', 'region', 'year', 'period', name='unique_rollup_cell'),
+        db.Index('ix_weather_rollup_grain_year', 'grain', 'year'),
+    )
+
+    def __repr__(self):
+        return f'<WeatherRollup {self.grain} {self.region} {self.year}/{self.period}>'
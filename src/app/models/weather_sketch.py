@@ -0,0 +1,25 @@
+from app import db
+
+
+class WeatherSketch(db.Model):
+    """
+    Mergeable distribution of one measure for a station-year, maintained by
+    scripts.weather_sketches alongside weather_stats (see app.services.quantile_sketch).
+    """
+    __tablename__ = 'weather_sketch'
+
+    id = db.Column(db.Integer, primary_key=True)
+    station_id = db.Column(db.String(50), nullable=False)
+    state = db.Column(db.String(2))
+    year = db.Column(db.Integer, nullable=False)
+    measure = db.Column(db.String(20), nullable=False)      # max_temp, min_temp or precipitation
+    observations = db.Column(db.Integer, nullable=False)    # Non-missing days
+    sketch = db.Column(db.LargeBinary, nullable=False)      # Value histogram in tenths
+
+    __table_args__ = (
+        db.UniqueConstraint('station_id', 'year', 'measure', name='unique_sketch'),
+        db.Index('ix_weather_sketch_measure_year', 'measure', 'year'),
+    )
+
+    def __repr__(self):
+        return f'<WeatherSketch {self.station_id} {self.year} {self.measure}>'
@@ -11,9 +11,10 @@ class WeatherStats(db.Model):
     avg_min_temp = db.Column(db.Float)      # In degrees Celsius
     total_precipitation = db.Column(db.Float)  # In centimeters
 
-    # Unique constraint for station-year combination
+    # Unique constraint for station-year combination, plus an index for year-only filters
     __table_args__ = (
         db.UniqueConstraint('station_id', 'year', name='unique_station_year'),
+        db.Index('ix_weather_stats_year', 'year'),
     )
 
     def __repr__(self):
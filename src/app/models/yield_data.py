@@ -0,0 +1,17 @@
+from app import db
+
+
+class YieldData(db.Model):
+    """Represents yearly US corn grain yield loaded from yld_data"""
+    __tablename__ = 'yield_data'
+
+    id = db.Column(db.Integer, primary_key=True)
+    year = db.Column(db.Integer, nullable=False)
+    total_yield = db.Column(db.BigInteger, nullable=False)  # In 1000s of megatons, as published
+
+    __table_args__ = (
+        db.UniqueConstraint('year', name='unique_yield_year'),
+    )
+
+    def __repr__(self):
+        return f'<YieldData {self.year}>'
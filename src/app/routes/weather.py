@@ -1,9 +1,43 @@
-from flask_restx import Resource, Namespace
-from flask import request, jsonify, make_response
+from flask_restx import Resource, Namespace, fields
+from flask import Response, current_app, request, jsonify, make_response, stream_with_context
 from app.controllers.weather_analytics_controller import WeatherAnalyticsController
+from app.services.arrow_format import ARROW_STREAM_MIMETYPE, arrow_available, ipc_response_body, negotiate_format
+from app.services.response_cache import cached_json_response, cached_response
 
 weather_ns = Namespace("weather", description="Operations related to weather data analysis")
 
+batch_key_model = weather_ns.model("BatchKey", {
+    "station_id": fields.String(required=True, description="Unique identifier of the weather station"),
+    "date": fields.String(description="Date in ISO format (YYYY-MM-DD) for daily weather data"),
+    "year": fields.Integer(description="Year for aggregated weather statistics"),
+})
+batch_request_model = weather_ns.model("BatchRequest", {
+    "keys": fields.List(fields.Nested(batch_key_model), required=True),
+})
+
+
+def _flag(value):
+    """Parses a boolean query parameter ("true", "1", "yes")."""
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+def _negotiated_response(endpoint, params, producer):
+    """
+    Serves producer(columnar) as JSON, or as an Arrow IPC stream when the Accept
+    header prefers application/vnd.apache.arrow.stream (406 if pyarrow is missing).
+    """
+    fmt = negotiate_format()
+    if fmt is None:
+        return make_response(jsonify({"error": "Arrow responses require the 'pyarrow' package."}), 406)
+    if fmt == "arrow":
+        response = cached_response(
+            f"{endpoint}.arrow", params, lambda: producer(True), ipc_response_body, ARROW_STREAM_MIMETYPE
+        )
+    else:
+        response = cached_json_response(endpoint, params, lambda: producer(False))
+    response.vary.add("Accept")
+    return response
+
 
 @weather_ns.route("/")
 class WeatherDataResource(Resource):
@@ -13,25 +47,47 @@ class WeatherDataResource(Resource):
 
     @weather_ns.param("station_id", "Unique identifier of the weather station", type=str, required=False)
     @weather_ns.param("date", "Requested date in ISO format (YYYY-MM-DD)", type=str, required=False)
+    @weather_ns.param("start_date", "First date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
+    @weather_ns.param("end_date", "Last date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
     @weather_ns.param("per_page", "Page number for paginated results", type=int, default=20)
     @weather_ns.param("page", "Page number for paginated results", type=int, default=1)
+    @weather_ns.param("cursor", "Keyset cursor from next_cursor; pass an empty value for the first page", type=str, required=False)
+    @weather_ns.param("include_total", "Also count all matching rows (cursor mode only)", type=bool, default=False)
     def get(self):
         """
-        Fetch weather data based on station ID and date.
+        Fetch weather data based on station ID and date or date range.
+
+        Send "Accept: application/vnd.apache.arrow.stream" for an Arrow IPC stream
+        instead of JSON; in cursor mode next_cursor and total are schema metadata.
         
         Returns:
-            dict: Weather details for the specified parameters with HTTP status 200.
+            dict: Weather details for the specified parameters with HTTP status 200,
+            or 304 when the client's ETag is still current.
         """
         station_id = request.args.get("station_id")
         date = request.args.get("date")
+        start_date = request.args.get("start_date")
+        end_date = request.args.get("end_date")
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 20, type=int)
-        # Check if at least one of station_id or date is provided
-        if not station_id and not date:
+        cursor = request.args.get("cursor")
+        include_total = _flag(request.args.get("include_total"))
+        # Check if at least one of station_id, date or a date range is provided
+        if not station_id and not date and not (start_date or end_date):
             return make_response(jsonify({"error": "At least one of station_id or date is required."}), 400)
 
-        weather_data = WeatherAnalyticsController().fetch_weather_data_for_date(station_id, date, page, per_page)
-        return make_response(jsonify(weather_data), 200)
+        params = {"station_id": station_id, "date": date, "start_date": start_date, "end_date": end_date,
+                  "page": page, "per_page": per_page, "cursor": cursor, "include_total": include_total}
+        try:
+            return _negotiated_response(
+                "weather_data", params,
+                lambda columnar: WeatherAnalyticsController().fetch_weather_data_for_date(
+                    station_id, date, page, per_page, cursor=cursor, include_total=include_total,
+                    start_date=start_date, end_date=end_date, columnar=columnar,
+                ),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
 
 
 @weather_ns.route("/statistics")
@@ -44,17 +100,279 @@ class WeatherStatisticsResource(Resource):
     @weather_ns.param("year", "Year for statistical analysis", type=int, required=False)
     @weather_ns.param("page", "Page number for paginated results", type=int, default=1)
     @weather_ns.param("per_page", "Page number for paginated results", type=int, default=20)
+    @weather_ns.param("cursor", "Keyset cursor from next_cursor; pass an empty value for the first page", type=str, required=False)
+    @weather_ns.param("include_total", "Also count all matching rows (cursor mode only)", type=bool, default=False)
     def get(self):
         """
         Retrieve weather statistics for a specific station and year.
+
+        Send "Accept: application/vnd.apache.arrow.stream" for an Arrow IPC stream instead of JSON.
         
         Returns:
-            dict: Aggregated weather statistics with HTTP status 200.
+            dict: Aggregated weather statistics with HTTP status 200,
+            or 304 when the client's ETag is still current.
         """
         station_id = request.args.get("station_id")
         year = request.args.get("year", type=int)
         page = request.args.get("page", 1, type=int)
         per_page = request.args.get("per_page", 20, type=int)
+        cursor = request.args.get("cursor")
+        include_total = _flag(request.args.get("include_total"))
+
+        params = {"station_id": station_id, "year": year, "page": page, "per_page": per_page,
+                  "cursor": cursor, "include_total": include_total}
+        try:
+            return _negotiated_response(
+                "weather_stats", params,
+                lambda columnar: WeatherAnalyticsController().fetch_aggregated_weather_statistics(
+                    station_id, year, page, per_page, cursor=cursor, include_total=include_total,
+                    columnar=columnar,
+                ),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
+
+
+@weather_ns.route("/resample")
+class WeatherResampleResource(Resource):
+    """
+    Provides weekly, monthly or seasonal aggregates of the daily weather data.
+    """
+
+    @weather_ns.param("station_id", "Unique identifier of the weather station", type=str, required=False)
+    @weather_ns.param("start_date", "First date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
+    @weather_ns.param("end_date", "Last date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
+    @weather_ns.param("period", "Aggregation period: week, month or season", type=str, default="month")
+    def get(self):
+        """
+        Retrieve resampled weather data for a station and/or date range.
+
+        Returns:
+            list: One aggregate per station and period with HTTP status 200,
+            or 304 when the client's ETag is still current.
+        """
+        station_id = request.args.get("station_id")
+        start_date = request.args.get("start_date")
+        end_date = request.args.get("end_date")
+        period = request.args.get("period", "month").lower()
+
+        params = {"station_id": station_id, "start_date": start_date, "end_date": end_date, "period": period}
+        try:
+            return cached_json_response(
+                "weather_resample", params,
+                lambda: WeatherAnalyticsController().fetch_resampled_weather_data(
+                    station_id, start_date, end_date, period
+                ),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
+
+
+@weather_ns.route("/rollup")
+class WeatherRollupResource(Resource):
+    """
+    Provides regional and seasonal aggregates from the precomputed rollup cube.
+    """
+
+    @weather_ns.param("level", "Region level: station, state or all", type=str, default="station")
+    @weather_ns.param("period", "Aggregation period: month, season or year", type=str, default="year")
+    @weather_ns.param("region", "Station id or two-letter state code", type=str, required=False)
+    @weather_ns.param("year", "Year (season year for seasons) to restrict to", type=int, required=False)
+    def get(self):
+        """
+        Retrieve rolled-up weather aggregates for a region level and period.
+
+        Returns:
+            dict: The stored grain used and the aggregates with HTTP status 200,
+            or 304 when the client's ETag is still current.
+        """
+        level = request.args.get("level", "station").lower()
+        period = request.args.get("period", "year").lower()
+        region = request.args.get("region")
+        year = request.args.get("year", type=int)
+
+        params = {"level": level, "period": period, "region": region, "year": year}
+        try:
+            return cached_json_response(
+                "weather_rollup", params,
+                lambda: WeatherAnalyticsController().fetch_rollup(level, period, region, year),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
+
+
+@weather_ns.route("/percentiles")
+class WeatherPercentilesResource(Resource):
+    """
+    Provides percentiles of daily values from the stored per-station-year sketches.
+    """
+
+    @weather_ns.param("measure", "max_temp, min_temp or precipitation", type=str, default="max_temp")
+    @weather_ns.param("q", "Comma-separated quantiles between 0 and 1", type=str, default="0.5")
+    @weather_ns.param("station_id", "Comma-separated station ids", type=str, required=False)
+    @weather_ns.param("state", "Two-letter state code", type=str, required=False)
+    @weather_ns.param("start_year", "First year to include", type=int, required=False)
+    @weather_ns.param("end_year", "Last year to include", type=int, required=False)
+    @weather_ns.param("wet_days", "Only days with precipitation (precipitation only)", type=bool, default=False)
+    def get(self):
+        """
+        Compute percentiles of a daily measure over a set of stations and years.
+
+        Returns:
+            dict: Merged day counts, extremes and the requested percentiles with HTTP
+            status 200, or 304 when the client's ETag is still current.
+        """
+        measure = request.args.get("measure", "max_temp").lower()
+        try:
+            qs = [float(q) for q in request.args.get("q", "0.5").split(",") if q.strip()]
+        except ValueError:
+            return make_response(jsonify({"error": "Quantiles must be numbers between 0 and 1."}), 400)
+        station_ids = sorted({s for s in request.args.get("station_id", "").split(",") if s}) or None
+        state = request.args.get("state")
+        start_year = request.args.get("start_year", type=int)
+        end_year = request.args.get("end_year", type=int)
+        wet_days = _flag(request.args.get("wet_days"))
+
+        params = {"measure": measure, "q": qs, "station_id": station_ids, "state": state,
+                  "start_year": start_year, "end_year": end_year, "wet_days": wet_days}
+        try:
+            return cached_json_response(
+                "weather_percentiles", params,
+                lambda: WeatherAnalyticsController().fetch_percentiles(
+                    measure, qs, station_ids, state, start_year, end_year, wet_days,
+                ),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
+
+
+@weather_ns.route("/anomalies")
+class WeatherAnomaliesResource(Resource):
+    """
+    Compares a day's observations with the stations' 1985-2014 normals for that day.
+    """
+
+    @weather_ns.param("date", "Date in ISO format (YYYY-MM-DD)", type=str, required=True)
+    @weather_ns.param("station_id", "Comma-separated station ids; all stations when omitted", type=str, required=False)
+    def get(self):
+        """
+        Fetch observations with their anomalies versus the daily climatology normals.
+
+        Returns:
+            list: One entry per station observed that day with HTTP status 200,
+            or 304 when the client's ETag is still current.
+        """
+        date = request.args.get("date")
+        if not date:
+            return make_response(jsonify({"error": "date is required."}), 400)
+        station_ids = sorted({s for s in request.args.get("station_id", "").split(",") if s}) or None
+
+        params = {"date": date, "station_id": station_ids}
+        try:
+            return cached_json_response(
+                "weather_anomalies", params,
+                lambda: WeatherAnalyticsController().fetch_anomalies(date, station_ids),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
+
+
+@weather_ns.route("/growing-season")
+class WeatherGrowingSeasonResource(Resource):
+    """
+    Provides growing degree days, cumulative precipitation and moving averages for a station.
+    """
+
+    @weather_ns.param("station_id", "Unique identifier of the weather station", type=str, required=True)
+    @weather_ns.param("start_date", "First date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
+    @weather_ns.param("end_date", "Last date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
+    @weather_ns.param("window", "Length in days of the trailing moving averages", type=int, default=7)
+    def get(self):
+        """
+        Fetch growing-season metrics for a station over a date range.
+
+        Returns:
+            dict: Range totals and the daily series with HTTP status 200,
+            or 304 when the client's ETag is still current.
+        """
+        station_id = request.args.get("station_id")
+        if not station_id:
+            return make_response(jsonify({"error": "station_id is required."}), 400)
+        start_date = request.args.get("start_date")
+        end_date = request.args.get("end_date")
+        window = request.args.get("window", 7, type=int)
+
+        params = {"station_id": station_id, "start_date": start_date, "end_date": end_date, "window": window}
+        try:
+            return cached_json_response(
+                "weather_growing_season", params,
+                lambda: WeatherAnalyticsController().fetch_growing_season(station_id, start_date, end_date, window),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
+
+
+@weather_ns.route("/batch")
+class WeatherBatchResource(Resource):
+    """
+    Resolves many station/date or station/year lookups in a single request.
+    """
+
+    @weather_ns.expect(batch_request_model)
+    def post(self):
+        """
+        Fetch weather data and statistics for a list of keys.
+
+        Returns:
+            dict: "results" with one {"key", "data"} entry per requested key, in request order,
+            with HTTP status 200.
+        """
+        payload = request.get_json(silent=True) or {}
+        keys = payload.get("keys")
+        if not isinstance(keys, list) or not keys:
+            return make_response(jsonify({"error": "A non-empty list of keys is required."}), 400)
+        max_keys = current_app.config.get("BATCH_MAX_KEYS", 1000)
+        if len(keys) > max_keys:
+            return make_response(jsonify({"error": f"At most {max_keys} keys are allowed per request."}), 400)
+
+        try:
+            results = WeatherAnalyticsController().fetch_batch(keys)
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
+        return make_response(jsonify({"results": results}), 200)
+
+
+@weather_ns.route("/export")
+class WeatherExportResource(Resource):
+    """
+    Streams full station time series (or a date range across stations) as NDJSON, CSV or an Arrow IPC stream.
+    """
+
+    @weather_ns.param("station_id", "Unique identifier of the weather station", type=str, required=False)
+    @weather_ns.param("start_date", "First date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
+    @weather_ns.param("end_date", "Last date in ISO format (YYYY-MM-DD), inclusive", type=str, required=False)
+    @weather_ns.param("format", "Output format: ndjson, csv or arrow", type=str, default="ndjson")
+    def get(self):
+        """
+        Export daily weather data ordered by station and date.
+
+        Returns:
+            Response: Streamed application/x-ndjson, text/csv or Arrow IPC stream body
+            with HTTP status 200.
+        """
+        fmt = request.args.get("format", "ndjson").lower()
+        if fmt == "arrow" and not arrow_available():
+            return make_response(jsonify({"error": "Arrow responses require the 'pyarrow' package."}), 406)
+        try:
+            chunks = WeatherAnalyticsController.stream_weather_data(
+                request.args.get("station_id"),
+                request.args.get("start_date"),
+                request.args.get("end_date"),
+                fmt,
+                current_app.config.get("EXPORT_FETCH_ROWS", 5000),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
 
-        stats_data = WeatherAnalyticsController().fetch_aggregated_weather_statistics(station_id, year, page, per_page)
-        return make_response(jsonify(stats_data), 200)
+        mimetype = {"ndjson": "application/x-ndjson", "csv": "text/csv", "arrow": ARROW_STREAM_MIMETYPE}[fmt]
+        return Response(stream_with_context(chunks), status=200, mimetype=mimetype)
@@ -0,0 +1,109 @@
+import json
+
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.controllers.async_weather_controller import AsyncWeatherController
+
+try:
+    import orjson
+except ImportError:  # optional fast encoder
+    orjson = None
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded like the WSGI app's FastJSONProvider (sorted keys, compact UTF-8)"""
+
+    def render(self, content):
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_SORT_KEYS)
+        return json.dumps(content, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _error(message, status_code=400):
+    return FastJSONResponse({"error": message}, status_code=status_code)
+
+
+def _int_param(request, name, default):
+    """Reads an integer query parameter, falling back to the default like Flask's type=int"""
+    try:
+        return int(request.query_params[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def _flag(value):
+    """Parses a boolean query parameter ("true", "1", "yes")."""
+    return (value or "").lower() in ("1", "true", "yes")
+
+
+async def weather_data(request):
+    """
+    Fetch weather data based on station ID and date or date range.
+
+    Same parameters and response as GET /api/weather/ of the WSGI app.
+    """
+    params = request.query_params
+    station_id, date = params.get("station_id"), params.get("date")
+    start_date, end_date = params.get("start_date"), params.get("end_date")
+    if not station_id and not date and not (start_date or end_date):
+        return _error("At least one of station_id or date is required.")
+    try:
+        async with request.app.state.sessions() as session:
+            result = await AsyncWeatherController.fetch_weather_data_for_date(
+                session, station_id, date, _int_param(request, "page", 1), _int_param(request, "per_page", 20),
+                cursor=params.get("cursor"), include_total=_flag(params.get("include_total")),
+                start_date=start_date, end_date=end_date,
+            )
+    except ValueError as err:
+        return _error(str(err))
+    return FastJSONResponse(result)
+
+
+async def weather_statistics(request):
+    """
+    Fetch aggregated weather statistics for a station and/or year.
+
+    Same parameters and response as GET /api/weather/statistics of the WSGI app.
+    """
+    params = request.query_params
+    station_id, year = params.get("station_id"), _int_param(request, "year", None)
+    try:
+        async with request.app.state.sessions() as session:
+            result = await AsyncWeatherController.fetch_aggregated_weather_statistics(
+                session, station_id, year, _int_param(request, "page", 1), _int_param(request, "per_page", 20),
+                cursor=params.get("cursor"), include_total=_flag(params.get("include_total")),
+            )
+    except ValueError as err:
+        return _error(str(err))
+    return FastJSONResponse(result)
+
+
+async def weather_stations(request):
+    """
+    Fetch daily data and yearly statistics for several stations at once
+    (station_ids is comma separated); the per-station queries run concurrently.
+    """
+    settings = request.app.state.settings
+    station_ids = list(dict.fromkeys(s for s in request.query_params.get("station_ids", "").split(",") if s))
+    if not station_ids:
+        return _error("station_ids is required.")
+    if len(station_ids) > settings["ASYNC_MAX_STATIONS"]:
+        return _error(f"At most {settings['ASYNC_MAX_STATIONS']} stations per request.")
+    try:
+        items = await AsyncWeatherController.fetch_stations(
+            request.app.state.sessions, station_ids,
+            request.query_params.get("start_date"), request.query_params.get("end_date"),
+            max_rows=settings["ASYNC_MAX_ROWS_PER_STATION"],
+            concurrency=settings["ASYNC_QUERY_CONCURRENCY"],
+        )
+    except ValueError as err:
+        return _error(str(err))
+    return FastJSONResponse({"items": items})
+
+
+weather_routes = [
+    Route("/", weather_data),
+    Route("/statistics", weather_statistics),
+    Route("/stations", weather_stations),
+]
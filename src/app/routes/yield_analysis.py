@@ -0,0 +1,36 @@
+from flask_restx import Resource, Namespace
+from flask import request, jsonify, make_response
+from app.controllers.yield_analytics_controller import YieldAnalyticsController
+from app.routes.weather import _flag
+from app.services.response_cache import cached_json_response
+
+yield_ns = Namespace("yield", description="Operations relating crop yield to weather")
+
+
+@yield_ns.route("/analysis")
+class YieldAnalysisResource(Resource):
+    """
+    Relates yearly corn yield to seasonal weather features across all stations.
+    """
+
+    @yield_ns.param("features", "Comma separated features for a multiple regression (e.g. summer_max_temp,summer_precipitation)", type=str, required=False)
+    @yield_ns.param("include_matrix", "Also return the per-year feature matrix", type=bool, default=False)
+    def get(self):
+        """
+        Retrieve correlation and regression summaries between yield and weather.
+
+        Returns:
+            dict: Yield trend, per-feature summaries and the optional regression with
+            HTTP status 200, or 304 when the client's ETag is still current.
+        """
+        features = [f.strip() for f in request.args.get("features", "").split(",") if f.strip()]
+        include_matrix = _flag(request.args.get("include_matrix"))
+
+        params = {"features": ",".join(features), "include_matrix": include_matrix}
+        try:
+            return cached_json_response(
+                "yield_analysis", params,
+                lambda: YieldAnalyticsController().fetch_yield_analysis(features or None, include_matrix),
+            )
+        except ValueError as err:
+            return make_response(jsonify({"error": str(err)}), 400)
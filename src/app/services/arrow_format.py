@@ -0,0 +1,143 @@
+import io
+
+from flask import request
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # optional columnar responses
+    pa = pc = None
+
+ARROW_STREAM_MIMETYPE = "application/vnd.apache.arrow.stream"
+JSON_MIMETYPE = "application/json"
+
+
+def arrow_available():
+    return pa is not None
+
+
+def negotiate_format():
+    """
+    Picks the response format from the Accept header.
+
+    Returns:
+        str: "arrow" when Arrow IPC is preferred over JSON, "json" otherwise (also
+        without an Accept header), or None when only Arrow is acceptable but
+        pyarrow is not installed (the caller answers 406).
+    """
+    accept = request.accept_mimetypes
+    offers = [JSON_MIMETYPE, ARROW_STREAM_MIMETYPE] if pa is not None else [JSON_MIMETYPE]
+    best = accept.best_match(offers)
+    if best == ARROW_STREAM_MIMETYPE:
+        return "arrow"
+    if best is None and pa is None and accept[ARROW_STREAM_MIMETYPE]:
+        return None
+    return "json"
+
+
+# Same names and units as the JSON rows: degrees Celsius, millimeters (daily) and centimeters (yearly)
+WEATHER_DATA_SCHEMA = pa.schema([
+    ("station_id", pa.string()), ("date", pa.date32()),
+    ("max_temp", pa.float64()), ("min_temp", pa.float64()), ("precipitation", pa.float64()),
+]) if pa is not None else None
+WEATHER_STATS_SCHEMA = pa.schema([
+    ("station_id", pa.string()), ("year", pa.int32()),
+    ("avg_max_temp", pa.float64()), ("avg_min_temp", pa.float64()), ("total_precipitation", pa.float64()),
+]) if pa is not None else None
+
+
+def _columns(rows, width):
+    return list(zip(*rows)) if rows else [()] * width
+
+
+def weather_data_table(rows):
+    """
+    Arrow table of weather_data rows, built column by column; missing
+    measurements become nulls in the validity bitmaps.
+
+    Args:
+        rows: Row tuples in WEATHER_DATA_COLUMNS order (measurements in tenths).
+
+    Returns:
+        pyarrow.Table: The rows converted to degrees Celsius and millimeters.
+    """
+    station_ids, dates, *measures = _columns(rows, len(WEATHER_DATA_SCHEMA))
+    return pa.Table.from_arrays(
+        [pa.array(station_ids, pa.string()), pa.array(dates, pa.date32())]
+        + [pc.divide(pa.array(values, pa.int32()), 10.0) for values in measures],
+        schema=WEATHER_DATA_SCHEMA,
+    )
+
+
+def weather_stats_table(rows):
+    """
+    Arrow table of weather_stats rows.
+
+    Args:
+        rows: Row tuples in WEATHER_STATS_COLUMNS order.
+
+    Returns:
+        pyarrow.Table: The statistics, nulls where a value is missing.
+    """
+    schema = WEATHER_STATS_SCHEMA
+    return pa.Table.from_arrays(
+        [pa.array(values, field.type) for values, field in zip(_columns(rows, len(schema)), schema)],
+        schema=schema,
+    )
+
+
+def to_ipc_stream(table, metadata=None):
+    """
+    Serializes a table as an Arrow IPC stream.
+
+    Args:
+        table (pyarrow.Table): The table.
+        metadata (dict): String values attached to the schema (e.g. the keyset
+            "next_cursor" and "total"); None values are left out.
+
+    Returns:
+        bytes: The stream.
+    """
+    metadata = {k: str(v) for k, v in (metadata or {}).items() if v is not None}
+    if metadata:
+        table = table.replace_schema_metadata(metadata)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def ipc_response_body(result):
+    """IPC stream of a controller result: a table, or a keyset page dict whose
+    next_cursor and total go into the schema metadata"""
+    if isinstance(result, dict):
+        return to_ipc_stream(result["items"], {"next_cursor": result["next_cursor"], "total": result.get("total")})
+    return to_ipc_stream(result)
+
+
+def weather_data_ipc_chunks(partitions):
+    """
+    Writes weather_data row partitions as one Arrow IPC stream, yielding the bytes
+    produced so far after each partition, so an export never holds more than one
+    partition in memory.
+
+    Args:
+        partitions: Iterable of row lists in WEATHER_DATA_COLUMNS order.
+
+    Returns:
+        generator: Byte chunks of the stream.
+    """
+    buffer = io.BytesIO()
+    writer = pa.ipc.new_stream(buffer, WEATHER_DATA_SCHEMA)
+    for rows in partitions:
+        writer.write_table(weather_data_table(rows))
+        yield _drain(buffer)
+    writer.close()
+    yield _drain(buffer)
+
+
+def _drain(buffer):
+    data = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return data
@@ -0,0 +1,51 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+# Async drivers used in place of the synchronous ones of the same database
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+
+def async_database_url(url):
+    """
+    Rewrites a database URL to the async driver of its database.
+
+    Args:
+        url (str): Database URL, e.g. postgresql://... or sqlite:///weather.db.
+
+    Returns:
+        URL: The same URL with the asyncpg or aiosqlite driver.
+
+    Raises:
+        ValueError: If there is no async driver for the database.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for {backend} databases")
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def create_async_database(settings):
+    """
+    Builds the async engine and session factory from the app settings.
+
+    The DB_POOL_* settings apply as in the WSGI app, except for SQLite.
+
+    Args:
+        settings (dict): The Config settings (SQLALCHEMY_DATABASE_URI, DB_POOL_*).
+
+    Returns:
+        tuple: (AsyncEngine, async_sessionmaker).
+    """
+    url = async_database_url(settings["SQLALCHEMY_DATABASE_URI"])
+    options = {}
+    if url.get_backend_name() != "sqlite":
+        options = {
+            "pool_size": settings.get("DB_POOL_SIZE", 5),
+            "max_overflow": settings.get("DB_MAX_OVERFLOW", 10),
+            "pool_timeout": settings.get("DB_POOL_TIMEOUT", 30),
+            "pool_recycle": settings.get("DB_POOL_RECYCLE", 1800),
+            "pool_pre_ping": settings.get("DB_POOL_PRE_PING", True),
+        }
+    engine = create_async_engine(url, **options)
+    return engine, async_sessionmaker(engine, expire_on_commit=False)
@@ -0,0 +1,338 @@
+import logging
+import threading
+import time
+from bisect import bisect_left
+from datetime import date as date_type
+
+import numpy as np
+import pandas as pd
+from flask import abort, current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.data_version import DataVersion
+from app.models.weather_data import WeatherData
+from app.models.weather_stats import WeatherStats
+from app.services.response_cache import current_data_version
+
+log = logging.getLogger(__name__)
+
+# Composite sort key: station code in the high 32 bits, the biased day or year below,
+# so one int64 binary search finds any (station, date|year) position
+_SHIFT = 1 << 32
+_BIAS = 1 << 31
+_EPOCH_ORDINAL = date_type(1970, 1, 1).toordinal()
+
+
+def _packed(values, dtype):
+    """Nullable integer column as a compact array, with the dtype's minimum marking NULL"""
+    missing = np.iinfo(dtype).min
+    return np.where(np.isnan(values), missing, values).astype(dtype), missing
+
+
+class _StationIndex:
+    """Rows sorted by (station_id, sub-key) behind one sorted int64 key array"""
+
+    def __init__(self, station_ids, subkeys):
+        self.stations, codes = np.unique(np.asarray(station_ids, dtype=object), return_inverse=True)
+        self.stations = self.stations.tolist()
+        self.keys = codes.astype(np.int64) * _SHIFT + (np.asarray(subkeys, dtype=np.int64) + _BIAS)
+        order = np.argsort(self.keys, kind="stable")
+        self.keys = self.keys[order]
+        self.order = order
+
+    def _code(self, station_id):
+        i = bisect_left(self.stations, station_id)
+        return i if i < len(self.stations) and self.stations[i] == station_id else None
+
+    def ranges(self, station_id=None, low=None, high=None):
+        """
+        Index ranges of the matching rows, one per station in key order.
+
+        Returns:
+            tuple: (lo, hi) arrays; rows lo[i]:hi[i] of station i match.
+        """
+        if station_id is not None:
+            code = self._code(station_id)
+            if code is None:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+            codes = np.array([code], dtype=np.int64)
+        else:
+            codes = np.arange(len(self.stations), dtype=np.int64)
+        low = -_BIAS if low is None else low
+        high = _BIAS - 1 if high is None else high
+        lo = np.searchsorted(self.keys, codes * _SHIFT + (low + _BIAS), side="left")
+        hi = np.searchsorted(self.keys, codes * _SHIFT + (high + _BIAS), side="right")
+        return lo, np.maximum(hi, lo)
+
+    def position_after(self, station_id, subkey):
+        """First row whose (station_id, sub-key) is greater than the given one"""
+        code = self._code(station_id)
+        if code is None:
+            return int(np.searchsorted(self.keys, bisect_left(self.stations, station_id) * _SHIFT, side="left"))
+        return int(np.searchsorted(self.keys, code * _SHIFT + (subkey + _BIAS), side="right"))
+
+    def decode(self, position):
+        """(station_id, sub-key) of a row position"""
+        key = int(self.keys[position])
+        return self.stations[key // _SHIFT], key % _SHIFT - _BIAS
+
+
+def _take(lo, hi, skip, limit):
+    """Row positions skip .. skip + limit of the concatenated ranges"""
+    taken, remaining = [], limit
+    for start, end in zip(lo.tolist(), hi.tolist()):
+        count = end - start
+        if skip >= count:
+            skip -= count
+            continue
+        n = min(count - skip, remaining)
+        taken.append(np.arange(start + skip, start + skip + n))
+        skip, remaining = 0, remaining - n
+        if not remaining:
+            break
+    return np.concatenate(taken) if taken else np.empty(0, dtype=np.int64)
+
+
+class WeatherSnapshot:
+    """
+    weather_data and weather_stats as sorted, packed arrays. Reads are binary
+    searches and return exactly what the WeatherAnalyticsController queries return.
+    """
+
+    def __init__(self, version, weather_frame, stats_frame):
+        self.version = version
+        days = weather_frame["date"].to_numpy(dtype="datetime64[D]").astype(np.int64)
+        self.data_index = _StationIndex(weather_frame["station_id"].to_numpy(), days)
+        data_order = self.data_index.order
+        self.max_temp, self._max_missing = _packed(weather_frame["max_temp"].to_numpy(np.float64)[data_order], np.int16)
+        self.min_temp, self._min_missing = _packed(weather_frame["min_temp"].to_numpy(np.float64)[data_order], np.int16)
+        self.precipitation, self._precip_missing = _packed(
+            weather_frame["precipitation"].to_numpy(np.float64)[data_order], np.int32
+        )
+
+        self.stats_index = _StationIndex(stats_frame["station_id"].to_numpy(), stats_frame["year"].to_numpy())
+        stats_order = self.stats_index.order
+        self.stats_values = stats_frame[["avg_max_temp", "avg_min_temp", "total_precipitation"]].to_numpy(
+            np.float64
+        )[stats_order]
+        del self.data_index.order, self.stats_index.order
+
+    @classmethod
+    def load(cls):
+        """Reads both tables (and the data version they correspond to) from the database"""
+        version_row = db.session.get(DataVersion, 1)
+        connection = db.session.connection()
+        weather_frame = pd.read_sql(select(
+            WeatherData.station_id, WeatherData.date, WeatherData.max_temp, WeatherData.min_temp,
+            WeatherData.precipitation,
+        ), connection)
+        weather_frame["date"] = pd.to_datetime(weather_frame["date"])
+        stats_frame = pd.read_sql(select(
+            WeatherStats.station_id, WeatherStats.year, WeatherStats.avg_max_temp,
+            WeatherStats.avg_min_temp, WeatherStats.total_precipitation,
+        ), connection)
+        db.session.rollback()
+        snapshot = cls(version_row.version if version_row else 0, weather_frame, stats_frame)
+        log.info("Loaded weather snapshot v%s: %d rows, %.1f MB",
+                 snapshot.version, len(weather_frame), snapshot.nbytes / 2 ** 20)
+        return snapshot
+
+    @property
+    def nbytes(self):
+        return sum(array.nbytes for array in (
+            self.data_index.keys, self.max_temp, self.min_temp, self.precipitation,
+            self.stats_index.keys, self.stats_values,
+        ))
+
+    def fetch_weather_data(self, station_id=None, date=None, page=1, per_page=20, cursor=None,
+                           include_total=False, start_date=None, end_date=None, format_func=None):
+        """Same arguments and result as WeatherAnalyticsController.fetch_weather_data_for_date;
+        rows are formatted by format_func (by default _format_weather_data)"""
+        from app.controllers.weather_analytics_controller import WeatherAnalyticsController as controller
+
+        start, end = controller._parse_date_range(start_date, end_date)
+        if date:
+            # The database path applies both filters, so the day only counts inside the range
+            day = controller._parse_date_range(date, None)[0]
+            start, end = max(start or day, day), min(end or day, day)
+        low = start.toordinal() - _EPOCH_ORDINAL if start else None
+        high = end.toordinal() - _EPOCH_ORDINAL if end else None
+        lo, hi = self.data_index.ranges(station_id or None, low, high)
+
+        def rows(positions):
+            return [
+                (
+                    *self._station_day(position),
+                    self._value(self.max_temp, self._max_missing, position),
+                    self._value(self.min_temp, self._min_missing, position),
+                    self._value(self.precipitation, self._precip_missing, position),
+                )
+                for position in positions.tolist()
+            ]
+
+        key_columns = (WeatherData.station_id, WeatherData.date)
+        return self._page(lo, hi, self.data_index, key_columns, rows, page, per_page, cursor, include_total,
+                          format_func or controller._format_weather_data, controller)
+
+    def fetch_statistics(self, station_id=None, year=None, page=1, per_page=20, cursor=None, include_total=False,
+                         format_func=None):
+        """Same arguments and result as WeatherAnalyticsController.fetch_aggregated_weather_statistics;
+        rows are formatted by format_func (by default _format_weather_stats)"""
+        from app.controllers.weather_analytics_controller import WeatherAnalyticsController as controller
+
+        lo, hi = self.stats_index.ranges(station_id or None, year or None, year or None)
+
+        def rows(positions):
+            return [
+                (*self.stats_index.decode(position),
+                 *(None if np.isnan(v) else float(v) for v in self.stats_values[position]))
+                for position in positions.tolist()
+            ]
+
+        key_columns = (WeatherStats.station_id, WeatherStats.year)
+        return self._page(lo, hi, self.stats_index, key_columns, rows, page, per_page, cursor, include_total,
+                          format_func or controller._format_weather_stats, controller)
+
+    def _station_day(self, position):
+        station_id, day = self.data_index.decode(position)
+        return station_id, date_type.fromordinal(_EPOCH_ORDINAL + day)
+
+    @staticmethod
+    def _value(values, missing, position):
+        value = int(values[position])
+        return None if value == missing else value
+
+    @staticmethod
+    def _page(lo, hi, index, key_columns, rows, page, per_page, cursor, include_total, format_func, controller):
+        """Page-number or keyset paging over the matching ranges, like the database path"""
+        if cursor is None:
+            # Flask-SQLAlchemy's paginate() answers out-of-range pages with 404
+            if page < 1 or per_page < 0:
+                abort(404)
+            positions = _take(lo, hi, (page - 1) * per_page, per_page)
+            if not positions.size and page != 1:
+                abort(404)
+            return format_func(rows(positions))
+
+        result = {}
+        if include_total:
+            result["total"] = int((hi - lo).sum())
+        if cursor:
+            station_id, subkey = controller._decode_cursor(cursor, key_columns)
+            if isinstance(subkey, date_type):
+                subkey = subkey.toordinal() - _EPOCH_ORDINAL
+            lo = np.maximum(lo, index.position_after(station_id, subkey))
+        positions = _take(lo, np.maximum(hi, lo), 0, per_page + 1)
+
+        has_more = positions.size > per_page
+        page_rows = rows(positions[:per_page])
+        result["items"] = format_func(page_rows)
+        result["next_cursor"] = (
+            controller._encode_cursor(list(page_rows[-1][:2])) if has_more else None
+        )
+        return result
+
+
+class MemoryStore:
+    """
+    Holds the current WeatherSnapshot of an app. When the data version moves on, a
+    new snapshot is loaded in a background thread, then swapped in with a single
+    reference assignment. Until then the snapshot is behind the version the response
+    cache keys on, so requests are answered from the database instead of caching
+    stale rows under the new version. A failed load is retried only after
+    retry_seconds, so a failing database is not re-read in full on every request.
+    """
+
+    def __init__(self, app, retry_seconds=30.0):
+        self._app = app
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._loader = None
+        self.retry_seconds = retry_seconds
+        self._failed_at = float("-inf")
+
+    def snapshot(self):
+        """
+        The current snapshot, loading the first one synchronously; None while it is
+        behind the data version or a failed load is backing off.
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            if self._backing_off():
+                return None
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = self._load()
+                return self._snapshot
+        version = current_data_version()
+        if version is not None and version > snapshot.version:
+            self._start_reload()
+            return None
+        return snapshot
+
+    def _backing_off(self):
+        return time.monotonic() - self._failed_at < self.retry_seconds
+
+    def _load(self):
+        try:
+            snapshot = WeatherSnapshot.load()
+        except SQLAlchemyError:
+            self._failed_at = time.monotonic()
+            raise
+        self._failed_at = float("-inf")
+        return snapshot
+
+    def _start_reload(self):
+        if self._backing_off():
+            return
+        with self._lock:
+            if self._loader is not None and self._loader.is_alive():
+                return
+            self._loader = threading.Thread(target=self._reload, name="weather-snapshot-loader", daemon=True)
+            self._loader.start()
+
+    def _reload(self):
+        with self._app.app_context():
+            try:
+                self._snapshot = self._load()
+            except SQLAlchemyError:
+                log.exception("Reloading the weather snapshot failed; retrying in %.0f s", self.retry_seconds)
+
+    def wait_for_reload(self, timeout=None):
+        """Blocks until a background reload in progress has finished"""
+        loader = self._loader
+        if loader is not None:
+            loader.join(timeout)
+
+
+def init_memory_store(app):
+    """
+    Registers the in-memory serving tier when MEMORY_STORE_ENABLED is set. With
+    MEMORY_STORE_PRELOAD the first snapshot is loaded right away, so workers forked
+    from a preloading server share its arrays copy-on-write.
+    """
+    if not app.config.get("MEMORY_STORE_ENABLED", False):
+        app.extensions["memory_store"] = None
+        return
+    store = app.extensions["memory_store"] = MemoryStore(app, app.config.get("MEMORY_STORE_RETRY_SECONDS", 30.0))
+    if app.config.get("MEMORY_STORE_PRELOAD", False):
+        with app.app_context():
+            try:
+                store.snapshot()
+            except SQLAlchemyError as err:
+                log.warning("Weather snapshot not preloaded (%s); loading on first use", err)
+
+
+def memory_snapshot():
+    """The app's current snapshot, or None when the tier is disabled, behind the data version or cannot load"""
+    store = current_app.extensions.get("memory_store")
+    if store is None:
+        return None
+    try:
+        return store.snapshot()
+    except SQLAlchemyError:
+        db.session.rollback()
+        log.exception("Weather snapshot unavailable; reading from the database")
+        return None
@@ -0,0 +1,229 @@
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+from app import db
+
+slow_query_log = logging.getLogger("app.sql.slow")
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 250)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter with optional labels, rendered in Prometheus text format"""
+
+    def __init__(self, name, documentation, labels=()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self, extra=()):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key, extra)} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels, rendered in Prometheus text format"""
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self, extra=()):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + ("+Inf",), counts):
+                    cumulative += bucket_count
+                    labels = _format_labels(self.labels, key, [*extra, ("le", bound)])
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labels, key, extra)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(self.labels, key, extra)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The API's request, SQL, connection pool and serialization metrics.
+
+    Values live in the process that recorded them, so under gunicorn every worker
+    keeps its own and /metrics answers for whichever worker served the scrape.
+    Each series carries a worker="<pid>" label to keep them apart; sum over the
+    label in queries (e.g. sum without (worker) (rate(...))) for service totals.
+    """
+
+    def __init__(self):
+        self.request_duration = Histogram(
+            "weather_api_request_duration_seconds", "Request latency by endpoint.",
+            ("endpoint", "method", "status"),
+        )
+        self.request_sql_statements = Histogram(
+            "weather_api_request_sql_statements", "SQL statements executed per request.",
+            ("endpoint",), COUNT_BUCKETS,
+        )
+        self.request_sql_duration = Histogram(
+            "weather_api_request_sql_duration_seconds", "Time spent in SQL per request.", ("endpoint",),
+        )
+        self.request_serialization_duration = Histogram(
+            "weather_api_request_serialization_seconds", "Time spent encoding JSON per request.", ("endpoint",),
+        )
+        self.sql_duration = Histogram(
+            "weather_api_sql_statement_duration_seconds", "SQL statement latency by operation.", ("operation",),
+        )
+        self.pool_checkout_wait = Histogram(
+            "weather_api_pool_checkout_wait_seconds", "Time spent waiting for a pooled database connection.",
+        )
+        self.slow_queries = Counter(
+            "weather_api_slow_queries_total", "SQL statements slower than SLOW_QUERY_SECONDS.", ("operation",),
+        )
+
+    def render(self):
+        metrics = (
+            self.request_duration, self.request_sql_statements, self.request_sql_duration,
+            self.request_serialization_duration, self.sql_duration, self.pool_checkout_wait,
+            self.slow_queries,
+        )
+        worker = (("worker", os.getpid()),)
+        return "\n".join(line for metric in metrics for line in metric.render(worker)) + "\n"
+
+
+def _registry():
+    return current_app.extensions.get("metrics") if has_app_context() else None
+
+
+def _endpoint_label():
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+def _operation(statement):
+    return statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "UNKNOWN"
+
+
+def record_serialization(seconds):
+    """Adds JSON encoding time to the current request (no-op outside requests)"""
+    if has_request_context() and "metrics_started_at" in g:
+        g.metrics_serialization_seconds += seconds
+
+
+def _before_request():
+    g.metrics_started_at = time.perf_counter()
+    g.metrics_sql_statements = 0
+    g.metrics_sql_seconds = 0.0
+    g.metrics_serialization_seconds = 0.0
+
+
+def _after_request(response):
+    registry = _registry()
+    started_at = g.pop("metrics_started_at", None)
+    if registry is None or started_at is None:
+        return response
+    endpoint = _endpoint_label()
+    registry.request_duration.observe(
+        time.perf_counter() - started_at,
+        endpoint=endpoint, method=request.method, status=response.status_code,
+    )
+    registry.request_sql_statements.observe(g.metrics_sql_statements, endpoint=endpoint)
+    registry.request_sql_duration.observe(g.metrics_sql_seconds, endpoint=endpoint)
+    registry.request_serialization_duration.observe(g.metrics_serialization_seconds, endpoint=endpoint)
+    return response
+
+
+def _instrument_engine(app, engine, registry):
+    """Hooks statement timing, the slow-query log and checkout timing into one engine"""
+    slow_seconds = app.config.get("SLOW_QUERY_SECONDS", 0.5)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_started_at", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("metrics_started_at")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        operation = _operation(statement)
+        registry.sql_duration.observe(elapsed, operation=operation)
+        if has_request_context() and "metrics_started_at" in g:
+            g.metrics_sql_statements += 1
+            g.metrics_sql_seconds += elapsed
+        if slow_seconds is not None and elapsed >= slow_seconds:
+            registry.slow_queries.inc(operation=operation)
+            slow_query_log.warning(
+                "Slow query (%.3f s): %s | parameters: %.1000r", elapsed, " ".join(statement.split()), parameters,
+            )
+
+    # Connection checkout has no "before" pool event; time Engine.raw_connection,
+    # which every Connection goes through (and which survives engine.dispose())
+    raw_connection = engine.raw_connection
+
+    def _timed_raw_connection(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        finally:
+            registry.pool_checkout_wait.observe(time.perf_counter() - started)
+
+    engine.raw_connection = _timed_raw_connection
+
+
+def init_metrics(app):
+    """Registers request hooks, SQL instrumentation and the /metrics endpoint"""
+    if not app.config.get("METRICS_ENABLED", True):
+        app.extensions["metrics"] = None
+        return
+
+    registry = MetricsRegistry()
+    app.extensions["metrics"] = registry
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    with app.app_context():
+        for engine in db.engines.values():
+            _instrument_engine(app, engine, registry)
+
+    @app.route("/metrics")
+    def metrics():
+        return Response(registry.render(), mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+import numpy as np
+
+# Growing degree days for corn (modified 86/50 method): daily max and min
+# temperatures are clamped to [10, 30] degrees Celsius before averaging, base 10
+GDD_BASE = 100   # tenths of a degree Celsius
+GDD_CAP = 300
+
+SERIES = ("max_temp", "min_temp", "precipitation", "gdd")
+
+
+def daily_gdd(max_temp, min_temp):
+    """
+    Growing degree days per day, in tenths of a degree-day.
+
+    Args:
+        max_temp (ndarray): Daily maximum temperatures in tenths, NaN where missing.
+        min_temp (ndarray): Daily minimum temperatures in tenths, NaN where missing.
+
+    Returns:
+        ndarray: GDD per day, NaN where either temperature is missing.
+    """
+    high = np.clip(max_temp, GDD_BASE, GDD_CAP)
+    low = np.clip(min_temp, GDD_BASE, GDD_CAP)
+    return (high + low) / 2 - GDD_BASE
+
+
+class StationPrefixSums:
+    """
+    Prefix sums of one station's daily series over a gap-free calendar, with
+    companion prefix counts of the days each value was observed on, so the sum,
+    count and mean of any date range is two array lookups.
+    """
+
+    def __init__(self, first_date, values):
+        """
+        Args:
+            first_date (date): Calendar day of the first array element.
+            values (dict): Daily arrays per SERIES name, NaN where not observed.
+        """
+        self.first_date = first_date
+        self.days = len(values["max_temp"])
+        self.sums, self.counts = {}, {}
+        for name in SERIES:
+            observed = ~np.isnan(values[name])
+            self.sums[name] = np.concatenate(([0.0], np.cumsum(np.where(observed, values[name], 0.0))))
+            # A station has far fewer than 2**31 days, so int32 halves the count arrays
+            self.counts[name] = np.concatenate((np.zeros(1, np.int32), np.cumsum(observed, dtype=np.int32)))
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Builds the prefix sums from weather_data rows.
+
+        Args:
+            rows: (date, max_temp, min_temp, precipitation) tuples in date order, values in tenths.
+
+        Returns:
+            StationPrefixSums: The prefix sums, or None without rows.
+        """
+        if not rows:
+            return None
+        first_date = rows[0][0]
+        positions = np.array([(row[0] - first_date).days for row in rows])
+        values = {}
+        for column, name in enumerate(("max_temp", "min_temp", "precipitation"), start=1):
+            daily = np.full(positions[-1] + 1, np.nan)
+            daily[positions] = [np.nan if row[column] is None else row[column] for row in rows]
+            values[name] = daily
+        values["gdd"] = daily_gdd(values["max_temp"], values["min_temp"])
+        return cls(first_date, values)
+
+    @property
+    def last_date(self):
+        return self.first_date + timedelta(days=self.days - 1)
+
+    def bounds(self, start=None, end=None):
+        """Half-open array positions [i, j) of a date range, clipped to the calendar"""
+        i = 0 if start is None else min(max((start - self.first_date).days, 0), self.days)
+        j = self.days if end is None else min(max((end - self.first_date).days + 1, 0), self.days)
+        return i, max(i, j)
+
+    def range_total(self, name, i, j):
+        """(sum, observed days) of a series over positions [i, j)"""
+        return float(self.sums[name][j] - self.sums[name][i]), int(self.counts[name][j] - self.counts[name][i])
+
+    def running_totals(self, name, i, j):
+        """Cumulative sum of a series from position i, for every position in [i, j)"""
+        return self.sums[name][i + 1:j + 1] - self.sums[name][i]
+
+    def moving_means(self, name, i, j, window):
+        """
+        Trailing `window`-day means for every position in [i, j), over the observed
+        days of each window (the window may reach before i); NaN where none were observed.
+        """
+        ends = np.arange(i + 1, j + 1)
+        starts = np.maximum(ends - window, 0)
+        totals = self.sums[name][ends] - self.sums[name][starts]
+        counts = self.counts[name][ends] - self.counts[name][starts]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, totals / counts, np.nan)
@@ -0,0 +1,56 @@
+import zlib
+
+import numpy as np
+
+
+def decode_sketch(blob):
+    """
+    Reads a sketch written by scripts.weather_sketches.encode_sketch (keep in sync):
+    zlib-compressed little-endian int32 values followed by their day counts.
+
+    Returns:
+        tuple: (values, counts) as int64 arrays, values ascending.
+    """
+    data = np.frombuffer(zlib.decompress(blob), dtype="<i4").astype(np.int64)
+    half = data.size // 2
+    return data[:half], data[half:]
+
+
+def merge_sketches(sketches):
+    """
+    Merges (values, counts) histograms by adding the counts of equal values.
+
+    Returns:
+        tuple: (values, counts) of the merged histogram, values ascending.
+    """
+    sketches = list(sketches)
+    if not sketches:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    values = np.concatenate([v for v, _ in sketches])
+    counts = np.concatenate([c for _, c in sketches])
+    merged_values, group = np.unique(values, return_inverse=True)
+    return merged_values, np.bincount(group, weights=counts, minlength=merged_values.size).astype(np.int64)
+
+
+def quantiles(values, counts, qs):
+    """
+    Quantiles of the days described by a histogram, interpolated linearly between
+    neighbouring days exactly like numpy.quantile on the expanded data.
+
+    Args:
+        values (ndarray): Distinct values, ascending.
+        counts (ndarray): Days per value.
+        qs (list): Quantiles between 0 and 1.
+
+    Returns:
+        list: One float per quantile, None for all of them when there are no days.
+    """
+    total = int(counts.sum())
+    if total == 0:
+        return [None] * len(qs)
+    ends = np.cumsum(counts)
+    positions = np.asarray(qs, dtype=np.float64) * (total - 1)
+    lower, upper = np.floor(positions).astype(np.int64), np.ceil(positions).astype(np.int64)
+    low_values = values[np.searchsorted(ends, lower, side="right")]
+    high_values = values[np.searchsorted(ends, upper, side="right")]
+    return (low_values + (high_values - low_values) * (positions - lower)).tolist()
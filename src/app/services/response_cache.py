@@ -0,0 +1,259 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, current_app, request
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.data_version import DataVersion
+
+try:
+    import redis
+except ImportError:  # optional shared backend
+    redis = None
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache bounded by entry count and entry age.
+    """
+
+    def __init__(self, max_entries=4096, ttl_seconds=300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_local_shared_cache = None
+_local_shared_lock = threading.Lock()
+
+
+def local_shared_cache(max_entries=4096, ttl_seconds=300.0):
+    """
+    Stand-in for a shared cache service: a single LRUCache used by every app
+    instance in the process, behind the same get/set interface as RedisCache.
+    """
+    global _local_shared_cache
+    with _local_shared_lock:
+        if _local_shared_cache is None:
+            _local_shared_cache = LRUCache(max_entries, ttl_seconds)
+        return _local_shared_cache
+
+
+class RedisCache:
+    """Shared cache backed by Redis; entries expire after ttl_seconds"""
+
+    def __init__(self, url, ttl_seconds=300.0, prefix="weather-api:"):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+        self._client = redis.Redis.from_url(url)
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, value, ex=max(1, int(self.ttl_seconds)))
+
+    def clear(self):
+        for key in self._client.scan_iter(self.prefix + "*"):
+            self._client.delete(key)
+
+
+class ResponseCache:
+    """
+    Caches serialized JSON responses keyed on the endpoint, the normalized query
+    parameters and the current data version, so any ingestion or statistics run
+    invalidates every entry at once without explicit purging.
+    """
+
+    def __init__(self, backend, version_check_seconds=1.0):
+        self.backend = backend
+        self.version_check_seconds = version_check_seconds
+        self._version = None
+        self._version_checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def data_version(self):
+        """
+        Returns the current data_version counter, re-read at most once per
+        version_check_seconds. None means it could not be read (caching is skipped).
+        """
+        now = time.monotonic()
+        if now - self._version_checked_at < self.version_check_seconds:
+            return self._version
+        with self._lock:
+            if now - self._version_checked_at >= self.version_check_seconds:
+                try:
+                    row = db.session.get(DataVersion, 1)
+                    self._version = row.version if row else 0
+                except SQLAlchemyError:
+                    db.session.rollback()
+                    self._version = None
+                self._version_checked_at = now
+        return self._version
+
+    @staticmethod
+    def make_key(endpoint, params, version):
+        normalized = "&".join(
+            f"{name}={params[name]}" for name in sorted(params) if params[name] is not None
+        )
+        digest = hashlib.sha1(f"{endpoint}?{normalized}".encode()).hexdigest()
+        return f"{version}:{digest}"
+
+    def json_response(self, endpoint, params, producer):
+        """
+        Serves producer() as JSON through the cache.
+
+        Args:
+            endpoint (str): Name identifying the resource.
+            params (dict): Parsed request parameters (defaults applied), used for the key.
+            producer (function): Returns the JSON-serializable payload on a miss.
+
+        Returns:
+            Response: 200 with ETag, or 304 when If-None-Match matches.
+        """
+        return self.response(endpoint, params, producer, _dumps_bytes, "application/json")
+
+    def response(self, endpoint, params, producer, serialize, mimetype):
+        """
+        Serves serialize(producer()) through the cache, as json_response does for JSON.
+
+        Args:
+            endpoint (str): Name identifying the resource and representation.
+            params (dict): Parsed request parameters (defaults applied), used for the key.
+            producer (function): Returns the payload on a miss.
+            serialize (function): Encodes the payload to bytes.
+            mimetype (str): Content type of the encoded payload.
+
+        Returns:
+            Response: 200 with ETag, or 304 when If-None-Match matches.
+        """
+        version = self.data_version()
+        if version is None:
+            return Response(serialize(producer()), status=200, mimetype=mimetype)
+
+        key = self.make_key(endpoint, params, version)
+        etag = key.replace(":", "-")
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            body = self.backend.get(key)
+            if body is None:
+                body = serialize(producer())
+                self.backend.set(key, body)
+            response = Response(body, status=200, mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        return response
+
+
+def _dumps_bytes(payload):
+    """Encodes with the app's JSON provider, directly to bytes when it supports that"""
+    dumps_bytes = getattr(current_app.json, "dumps_bytes", None)
+    if dumps_bytes is not None:
+        return dumps_bytes(payload)
+    return current_app.json.dumps(payload).encode()
+
+
+def _json(payload):
+    return Response(_dumps_bytes(payload), status=200, mimetype="application/json")
+
+
+def init_response_cache(app):
+    """Builds the configured cache backend and registers it on the app"""
+    if not app.config.get("CACHE_ENABLED", True):
+        app.extensions["response_cache"] = None
+        return
+
+    max_entries = app.config.get("CACHE_MAX_ENTRIES", 4096)
+    ttl_seconds = app.config.get("CACHE_TTL_SECONDS", 300.0)
+    backend_name = app.config.get("CACHE_BACKEND", "lru")
+    if backend_name == "redis":
+        backend = RedisCache(app.config["CACHE_REDIS_URL"], ttl_seconds)
+    elif backend_name == "shared":
+        backend = local_shared_cache(max_entries, ttl_seconds)
+    else:
+        backend = LRUCache(max_entries, ttl_seconds)
+    app.extensions["response_cache"] = ResponseCache(
+        backend, app.config.get("CACHE_VERSION_CHECK_SECONDS", 1.0)
+    )
+
+
+def cached_json_response(endpoint, params, producer):
+    """Serves producer() through the app's response cache, or directly if disabled"""
+    cache = current_app.extensions.get("response_cache")
+    if cache is None:
+        return _json(producer())
+    return cache.json_response(endpoint, params, producer)
+
+
+def cached_response(endpoint, params, producer, serialize, mimetype):
+    """Serves serialize(producer()) with the given content type through the app's
+    response cache, or directly if disabled"""
+    cache = current_app.extensions.get("response_cache")
+    if cache is None:
+        return Response(serialize(producer()), status=200, mimetype=mimetype)
+    return cache.response(endpoint, params, producer, serialize, mimetype)
+
+
+def current_data_version():
+    """The data_version counter, via the app's response cache when enabled (throttled)"""
+    cache = current_app.extensions.get("response_cache")
+    if cache is not None:
+        return cache.data_version()
+    try:
+        row = db.session.get(DataVersion, 1)
+        return row.version if row else 0
+    except SQLAlchemyError:
+        db.session.rollback()
+        return None
+
+
+_versioned_lock = threading.Lock()
+
+
+def cached_by_data_version(name, builder):
+    """
+    Returns builder() memoized per app until the data version changes, for derived
+    in-memory structures that are too expensive to rebuild per request. When the
+    version cannot be read the value is rebuilt on every call.
+    """
+    version = current_data_version()
+    if version is None:
+        return builder()
+    values = current_app.extensions.setdefault("versioned_values", {})
+    entry = values.get(name)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    value = builder()
+    with _versioned_lock:
+        values[name] = (version, value)
+    return value
@@ -0,0 +1,41 @@
+REGION_LEVELS = ("station", "state", "all")
+PERIODS = ("month", "season", "year")
+
+# Grains kept in weather_rollup, coarsest first; keep in sync with
+# scripts.weather_rollups.STORED_GRAINS
+STORED_GRAINS = (("all", "year"), ("state", "year"), ("station", "season"), ("station", "month"))
+
+
+def can_answer(stored, requested):
+    """
+    Whether cells of a stored grain can be summed into a requested grain.
+
+    Stations nest in states and states in "all"; months nest in seasons and
+    years, but seasons do not nest in calendar years (DJF straddles two).
+    """
+    stored_level, stored_period = stored
+    level, period = requested
+    if REGION_LEVELS.index(stored_level) > REGION_LEVELS.index(level):
+        return False
+    return stored_period == period or stored_period == "month"
+
+
+def plan_rollup(level, period):
+    """
+    Picks the coarsest stored grain that answers a request.
+
+    Args:
+        level (str): "station", "state" or "all".
+        period (str): "month", "season" or "year".
+
+    Returns:
+        tuple: The (level, period) of the stored grain to read.
+
+    Raises:
+        ValueError: If the level or period is unknown.
+    """
+    if level not in REGION_LEVELS:
+        raise ValueError(f"Unsupported level: {level}")
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported period: {period}")
+    return next(stored for stored in STORED_GRAINS if can_answer(stored, (level, period)))
@@ -0,0 +1,4 @@
+"""ASGI entry point for the async API: uvicorn asgi:app --workers 2"""
+from app.asgi import create_asgi_app
+
+app = create_asgi_app()
@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for the production server (gunicorn --config gunicorn.conf.py wsgi:app).
+
+The app is loaded once in the master and forked into the workers. Send SIGHUP to the
+master for a graceful reload (new workers start, old ones finish their requests), or
+set GUNICORN_PRELOAD=false so the reload also picks up new code.
+
+Each worker keeps its own /metrics values, labelled with its pid (worker="<pid>");
+a scrape reaches one worker, so aggregate over the label rather than reading a
+single scrape as the service total.
+"""
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+# Recycle workers now and then so slow leaks cannot build up; jitter avoids restarting all at once
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Gives each worker its own connection pool instead of the master's sockets"""
+    app = getattr(server.app, "callable", None)  # set only when the app was preloaded
+    if app is not None:
+        from app import dispose_engines_after_fork
+        dispose_engines_after_fork(app)
@@ -1,14 +1,15 @@
-from app import create_app, db
+from app import create_app
 
 def initialize(app):
     """
-    Initializes the database and starts the Flask app in debug mode.
+    Starts the Flask development server (debug mode follows FLASK_DEBUG).
+
+    Create the tables first with `flask --app wsgi init-db`; in production serve
+    wsgi:app with gunicorn (see gunicorn.conf.py) instead.
     """
-    with app.app_context():
-        db.create_all()  # Creates all the database tables from models
-    app.run(host='0.0.0.0', debug=True)
+    app.run(host='0.0.0.0', debug=app.config["DEBUG"])
 
 if __name__ == "__main__":
     app = create_app()  # Create the Flask app instance
-    # Initialize the database and then start the app
+    # Start the development server
     initialize(app)
\ No newline at end of file
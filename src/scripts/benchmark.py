@@ -0,0 +1,258 @@
+import os, sys, json, time, pathlib, platform, subprocess, tempfile, logging
+from dataclasses import dataclass, asdict
+from datetime import date, datetime, timezone
+from typing import Callable, Optional
+import numpy as np
+from sqlalchemy import create_engine, func, select
+
+from scripts.db_weather_ingestor import WeatherInfoLoader
+from scripts.synthetic_weather import generate_weather_files, station_ids
+from scripts.weather_analytics_engine import MeteorologicalProcessor, DbConfig
+from scripts.weather_schema import metadata, weather_data
+
+log = logging.getLogger("WeatherBenchmark")
+
+FIRST_YEAR = 1985
+# Throughput results are compared on rows_per_second (higher is better), latency
+# results on p50_ms (lower is better)
+THROUGHPUT_METRIC = "rows_per_second"
+LATENCY_METRIC = "p50_ms"
+
+
+@dataclass
+class BenchmarkConfig:
+    connection_string: Optional[str] = None  # None runs against a temporary SQLite file
+    stations: int = 20
+    years: int = 5
+    missing_rate: float = 0.02
+    seed: int = 0
+    query_iterations: int = 50
+    stats_engine: str = "sql"
+    reset_database: bool = False             # allow dropping the tables of connection_string
+
+
+def _throughput(name: str, job: Callable[[], object], rows: Callable[[], int]) -> dict:
+    """Times one run of a batch job; rows() is read afterwards"""
+    started = time.perf_counter()
+    job()
+    seconds = time.perf_counter() - started
+    processed = rows()
+    return {
+        "name": name,
+        "seconds": seconds,
+        "rows": processed,
+        THROUGHPUT_METRIC: processed / seconds if seconds else None,
+    }
+
+
+def _latency(name: str, call: Callable[[], object], iterations: int) -> dict:
+    """Times repeated calls after one warm-up call"""
+    call()
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        started = time.perf_counter()
+        call()
+        timings[i] = time.perf_counter() - started
+    return {
+        "name": name,
+        "iterations": iterations,
+        "ops_per_second": iterations / timings.sum(),
+        LATENCY_METRIC: float(np.percentile(timings, 50) * 1000),
+        "p95_ms": float(np.percentile(timings, 95) * 1000),
+        "max_ms": float(timings.max() * 1000),
+    }
+
+
+def _reset_database(conn_str: str) -> None:
+    """Drops and recreates the project tables so every run starts empty"""
+    engine = create_engine(conn_str)
+    log.warning("Resetting weather tables in %s", engine.url.render_as_string(hide_password=True))
+    metadata.drop_all(engine)
+    metadata.create_all(engine, tables=[weather_data])
+    engine.dispose()
+
+
+def _row_count(conn_str: str, table) -> int:
+    engine = create_engine(conn_str)
+    with engine.connect() as conn:
+        count = conn.execute(select(func.count()).select_from(table)).scalar()
+    engine.dispose()
+    return count
+
+
+def _query_benchmarks(conn_str: str, cfg: BenchmarkConfig) -> list:
+    """Controller read paths, run inside a Flask app context without the response cache"""
+    from app import create_app, db
+    from app.controllers.weather_analytics_controller import WeatherAnalyticsController as controller
+
+    stations = station_ids(cfg.stations)
+    station = stations[0]
+    mid_year = FIRST_YEAR + cfg.years // 2
+    mid_date = date(mid_year, 7, 1).isoformat()
+    last_page = max(1, cfg.years * 365 // 20)
+    batch_keys = [
+        {"station_id": stations[i % len(stations)], "date": date(mid_year, 1 + i % 12, 1 + i % 28).isoformat()}
+        for i in range(100)
+    ]
+
+    def keyset_walk():
+        cursor = ""
+        while cursor is not None:
+            cursor = controller.fetch_weather_data_for_date(station, None, per_page=500, cursor=cursor)["next_cursor"]
+
+    benchmarks = {
+        "query.weather_data.station_first_page": lambda: controller.fetch_weather_data_for_date(station, None, 1, 20),
+        "query.weather_data.station_last_page": lambda: controller.fetch_weather_data_for_date(station, None, last_page, 20),
+        "query.weather_data.station_keyset_walk": keyset_walk,
+        "query.weather_data.date_all_stations": lambda: controller.fetch_weather_data_for_date(None, mid_date, 1, 1000),
+        "query.statistics.station": lambda: controller.fetch_aggregated_weather_statistics(station, None, 1, 100),
+        "query.statistics.year_all_stations": lambda: controller.fetch_aggregated_weather_statistics(None, mid_year, 1, 1000),
+        "query.resample.station_monthly": lambda: controller.fetch_resampled_weather_data(station, period="month"),
+        "query.rollup.state_season": lambda: controller.fetch_rollup("state", "season"),
+        "query.batch.100_keys": lambda: controller.fetch_batch(batch_keys),
+        "query.export.station_ndjson": lambda: "".join(controller.stream_weather_data(station)),
+    }
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": conn_str, "CACHE_ENABLED": False})
+    results = []
+    with app.app_context():
+        for name, call in benchmarks.items():
+            results.append(_latency(name, call, cfg.query_iterations))
+            log.info("%s: p50 %.2f ms", name, results[-1][LATENCY_METRIC])
+        db.engine.dispose()
+    return results
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=pathlib.Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(cfg: BenchmarkConfig) -> dict:
+    """
+    Generates synthetic station files and benchmarks ingestion, statistics and the
+    controller queries against them.
+
+    The database is reset first, dropping every project table. A connection_string
+    must therefore name a scratch database and is refused unless reset_database is set;
+    without one the run uses a temporary SQLite file.
+
+    :return: JSON-serializable results with run metadata
+    """
+    if cfg.connection_string and not cfg.reset_database:
+        raise ValueError(
+            "Benchmarks drop and recreate every weather table; set BENCH_RESET_DATABASE=true "
+            "to run against the scratch database in BENCH_DATABASE_URL"
+        )
+    with tempfile.TemporaryDirectory() as tmp:
+        conn_str = cfg.connection_string or f"sqlite:///{tmp}/benchmark.db"
+        folder = pathlib.Path(tmp) / "wx_data"
+        generate_weather_files(str(folder), cfg.stations, cfg.years, cfg.missing_rate, FIRST_YEAR, cfg.seed)
+        _reset_database(conn_str)
+
+        results = [
+            _throughput(
+                "ingest.handle_folder",
+                lambda: WeatherInfoLoader(
+                    conn_str=conn_str, accumulate=cfg.stats_engine == "accumulators"
+                ).handle_folder(str(folder)),
+                lambda: _row_count(conn_str, weather_data),
+            ),
+            _throughput(
+                "statistics.generate_statistics",
+                lambda: MeteorologicalProcessor(
+                    DbConfig(connection_string=conn_str, stats_engine=cfg.stats_engine)
+                ).generate_statistics(),
+                lambda: _row_count(conn_str, weather_data),
+            ),
+        ]
+        results.extend(_query_benchmarks(conn_str, cfg))
+        dialect = create_engine(conn_str).dialect.name
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": dialect,
+            "config": {**asdict(cfg), "connection_string": None},
+        },
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.10) -> list:
+    """
+    Compares two run_benchmarks outputs benchmark by benchmark.
+
+    :param threshold: Relative slowdown above which a benchmark counts as a regression
+    :return: One entry per benchmark present in both runs, with the relative change
+             (positive means slower) and a regression flag
+    """
+    previous = {result["name"]: result for result in baseline["results"]}
+    comparison = []
+    for result in current["results"]:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+        metric = THROUGHPUT_METRIC if THROUGHPUT_METRIC in result else LATENCY_METRIC
+        old, new = before.get(metric), result.get(metric)
+        if not old or not new:
+            continue
+        slowdown = old / new - 1 if metric == THROUGHPUT_METRIC else new / old - 1
+        comparison.append({
+            "name": result["name"],
+            "metric": metric,
+            "baseline": old,
+            "current": new,
+            "slowdown": slowdown,
+            "regression": slowdown > threshold,
+        })
+    return comparison
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO)
+    # The engine module configures the root logger at WARNING on import
+    log.setLevel(logging.INFO)
+    if sys.argv[1:2] == ["compare"]:
+        with open(sys.argv[2]) as baseline_file, open(sys.argv[3]) as current_file:
+            comparison = compare_results(
+                json.load(baseline_file), json.load(current_file),
+                float(os.getenv("BENCH_REGRESSION_THRESHOLD", 0.10)),
+            )
+        for entry in comparison:
+            flag = "REGRESSION" if entry["regression"] else "ok"
+            print(f"{entry['name']:<45} {entry['metric']:<16} {entry['slowdown']:+7.1%}  {flag}")
+        return 1 if any(entry["regression"] for entry in comparison) else 0
+
+    cfg = BenchmarkConfig(
+        connection_string=os.getenv("BENCH_DATABASE_URL") or None,
+        stations=int(os.getenv("BENCH_STATIONS", 20)),
+        years=int(os.getenv("BENCH_YEARS", 5)),
+        missing_rate=float(os.getenv("BENCH_MISSING_RATE", 0.02)),
+        seed=int(os.getenv("BENCH_SEED", 0)),
+        query_iterations=int(os.getenv("BENCH_QUERY_ITERATIONS", 50)),
+        stats_engine=os.getenv("STATS_ENGINE", "sql"),
+        reset_database=os.getenv("BENCH_RESET_DATABASE", "false").lower() == "true",
+    )
+    output = os.getenv("BENCH_OUTPUT", "benchmark_results.json")
+    try:
+        results = run_benchmarks(cfg)
+    except ValueError as err:
+        log.error("%s", err)
+        return 2
+    with open(output, "w") as handle:
+        json.dump(results, handle, indent=2)
+    log.info("Wrote %d benchmark results to %s", len(results["results"]), output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
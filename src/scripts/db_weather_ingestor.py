@@ -1,25 +1,162 @@
-import pathlib, os
+import pathlib, os, io, csv, hashlib
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from dotenv import load_dotenv
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, exc
+from sqlalchemy import create_engine, exc, text, select
 import logging
-from typing import Union
+from typing import Union, Tuple, Iterable, Iterator
+
+from scripts.weather_schema import (
+    metadata, weather_data, ingest_manifest, stats_dirty, data_version, station_year_accumulators,
+    accumulator_gaps, upsert, dirty_station_years, record_weather_changes, mark_accumulator_gaps,
+)
+from scripts.stats_accumulators import (
+    empty_accumulators, accumulate_station_years, merge_accumulators, save_accumulators,
+)
+from scripts.partitioning import partition_name, partition_table, ensure_partitions, existing_partition_years
 
 load_dotenv()
 
+WEATHER_COLUMNS = ["station_id", "date", "max_temp", "min_temp", "precipitation"]
+MISSING_VALUE = -9999
+# Compact dtypes for streamed chunks; -9999 becomes the mask of a nullable array
+STREAM_DTYPES = {"max_temp": "int16", "min_temp": "int16", "precipitation": "int32"}
+
+
+def read_weather_file(file_loc: str) -> pd.DataFrame:
+    """
+    Reads a tab separated station file into a dataframe.
+
+    Kept at module level so it can be shipped to worker processes.
+
+    :param file_loc: Path to weather data file
+    :return: Dataframe with missing values (-9999) replaced by NA
+    """
+    raw_df = pd.read_csv(
+        file_loc,
+        delimiter="\t",
+        header=None,
+        names=["date", "max_temp", "min_temp", "precipitation"],
+    )
+
+    raw_df["date"] = pd.to_datetime(
+        raw_df["date"], format="%Y%m%d", errors="coerce"
+    )
+    raw_df["station_id"] = pathlib.Path(file_loc).stem
+    processed_df = raw_df.replace(-9999, pd.NA)
+
+    return processed_df.dropna(subset=["date"])
+
+
+def iter_weather_chunks(file_loc: str, chunk_rows: int, offset: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Streams a station file as fixed-size frames so peak memory is bounded by
+    chunk_rows rather than by the file size.
+
+    Measurements use nullable Int16/Int32 arrays built on the parsed buffers (no
+    object columns) and the station id is a single-category Categorical.
+
+    :param file_loc: Path to weather data file
+    :param chunk_rows: Maximum rows per yielded frame
+    :param offset: Byte offset to start reading from (must be at a line boundary)
+    """
+    station = pd.CategoricalDtype([pathlib.Path(file_loc).stem])
+    with open(file_loc, "rb") as handle:
+        handle.seek(offset)
+        reader = pd.read_csv(
+            handle,
+            delimiter="\t",
+            header=None,
+            names=["date", "max_temp", "min_temp", "precipitation"],
+            dtype={"date": "str", **STREAM_DTYPES},
+            chunksize=chunk_rows,
+        )
+        for raw_chunk in reader:
+            # Parsed like read_weather_file: malformed dates become NaT and their rows are dropped
+            dates = pd.to_datetime(raw_chunk["date"], format="%Y%m%d", errors="coerce")
+            valid = ~np.isnat(dates.to_numpy())
+            chunk = pd.DataFrame({
+                "station_id": pd.Categorical.from_codes(np.zeros(valid.sum(), dtype=np.int8), dtype=station),
+                "date": dates[valid],
+            })
+            for column in STREAM_DTYPES:
+                values = raw_chunk[column].to_numpy()[valid]
+                chunk[column] = pd.arrays.IntegerArray(values, values == MISSING_VALUE)
+            yield chunk
+
+
+def _hash_file(file_loc: str, prefix_size: int = 0) -> Tuple[str, Union[str, None], bool]:
+    """
+    Hashes a file in one pass.
+
+    :return: (full sha256, sha256 of the first prefix_size bytes, whether the prefix ends a line)
+    """
+    hasher = hashlib.sha256()
+    prefix_digest, prefix_ends_line = None, False
+    with open(file_loc, "rb") as handle:
+        if prefix_size:
+            prefix = handle.read(prefix_size)
+            hasher.update(prefix)
+            prefix_digest = hasher.hexdigest()
+            prefix_ends_line = prefix.endswith(b"\n")
+        for block in iter(lambda: handle.read(1 << 20), b""):
+            hasher.update(block)
+    return hasher.hexdigest(), prefix_digest, prefix_ends_line
+
+
+def _to_records(weather_df: pd.DataFrame) -> list:
+    """Converts a parsed frame into DB-API friendly dicts (NA -> None, Timestamp -> date)"""
+    rows = weather_df[WEATHER_COLUMNS].astype(object)
+    rows["date"] = weather_df["date"].dt.date
+    return rows.where(rows.notna(), None).to_dict("records")
+
+
+def _parse_in_worker(file_loc: str) -> Tuple[str, Union[pd.DataFrame, None], Union[str, None]]:
+    """Process pool entry point; errors are returned rather than raised"""
+    try:
+        return file_loc, read_weather_file(file_loc), None
+    except Exception as err:
+        return file_loc, None, str(err)
+
 
 class WeatherInfoLoader:
     """Handles loading of weather observations into storage"""
 
-    def __init__(self, conn_str: str, file_suffix: str = ".txt"):
+    def __init__(
+        self,
+        conn_str: str,
+        file_suffix: str = ".txt",
+        workers: int = 1,
+        batch_size: int = 50_000,
+        incremental: bool = False,
+        chunk_rows: Union[int, None] = None,
+        partitioned: bool = False,
+        accumulate: bool = False,
+    ):
         """
         :param conn_str: Storage connection string
         :param file_suffix: Data file extension
+        :param workers: Parser processes used by handle_folder (1 keeps the sequential path)
+        :param batch_size: Rows sent to the database per COPY / executemany batch
+        :param incremental: Skip unchanged files and upsert only new rows, tracked in ingest_manifest
+        :param chunk_rows: Stream files in chunks of this many rows instead of loading them whole
+        :param partitioned: Route rows to the per-year partitions of weather_data (see scripts.partitioning)
+        :param accumulate: Maintain station_year_accumulators from the parsed rows, in the same
+                           transaction as the rows, for the "accumulators" statistics engine
         """
         self.storage_link = conn_str
         self.destination = "weather_data"
         self.file_pattern = file_suffix
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.incremental = incremental
+        self.chunk_rows = chunk_rows
+        self.partitioned = partitioned
+        self.accumulate = accumulate
         self.db_adapter = create_engine(conn_str)
+        self._tables_ready = False
+        self._partition_years = None
 
         logging.basicConfig(
             level=logging.INFO,
@@ -27,6 +164,46 @@ class WeatherInfoLoader:
         )
         self.log_handler = logging.getLogger(self.__class__.__name__)
 
+    def _ensure_tables(self):
+        """Creates the ingestion bookkeeping tables on first use"""
+        if not self._tables_ready:
+            tables = [ingest_manifest, stats_dirty, data_version, accumulator_gaps]
+            if self.accumulate:
+                tables.append(station_year_accumulators)
+            metadata.create_all(self.db_adapter, tables=tables)
+            self._tables_ready = True
+
+    def _route(self, db_session, weather_df: pd.DataFrame) -> Iterator[Tuple[Union[int, None], str, pd.DataFrame]]:
+        """
+        Splits rows by destination table: (year, partition name, rows) per year in the
+        partitioned layout, creating missing partitions first, else (None, weather_data, rows).
+        """
+        if not self.partitioned:
+            yield None, self.destination, weather_df
+            return
+        years = weather_df["date"].dt.year
+        if self._partition_years is None:
+            self._partition_years = existing_partition_years(db_session)
+        new_years = set(years.unique().tolist()) - self._partition_years
+        if new_years:
+            ensure_partitions(db_session, new_years)
+            self._partition_years |= new_years
+        for year, rows in weather_df.groupby(years, sort=True):
+            yield year, partition_name(year), rows
+
+    def _accumulate(self, totals: pd.DataFrame, weather_df: pd.DataFrame) -> pd.DataFrame:
+        """Folds a parsed frame into running station-year totals (unchanged unless accumulate)"""
+        if not self.accumulate:
+            return totals
+        return merge_accumulators(totals, accumulate_station_years(weather_df))
+
+    def _save_accumulators(self, db_session, totals: pd.DataFrame, dirty: set, replace: bool = False):
+        """Saves the totals, or without accumulate marks the station-years the accumulators now miss"""
+        if self.accumulate:
+            save_accumulators(db_session, totals, replace)
+        else:
+            mark_accumulator_gaps(db_session, dirty)
+
     def _parse_weather_file(self, file_loc: str) -> Union[pd.DataFrame, None]:
         """
         :param file_loc: Path to weather data file
@@ -34,20 +211,7 @@ class WeatherInfoLoader:
         """
         try:
             self.log_handler.info(f"Loading data from: {file_loc}")
-            raw_df = pd.read_csv(
-                file_loc,
-                delimiter="\t",
-                header=None,
-                names=["date", "max_temp", "min_temp", "precipitation"],
-            )
-
-            raw_df["date"] = pd.to_datetime(
-                raw_df["date"], format="%Y%m%d", errors="coerce"
-            )
-            raw_df["station_id"] = pathlib.Path(file_loc).stem
-            processed_df = raw_df.replace(-9999, pd.NA)
-
-            valid_records = processed_df.dropna(subset=["date"])
+            valid_records = read_weather_file(file_loc)
             self.log_handler.info(
                 f"Completed processing {file_loc} | Valid entries: {len(valid_records)}"
             )
@@ -63,22 +227,191 @@ class WeatherInfoLoader:
             self.log_handler.info(
                 f"Attempting to insert {record_count} entries to {self.destination}"
             )
-            with self.db_adapter.connect() as db_session:
-                weather_df.to_sql(
-                    self.destination,
-                    db_session,
-                    if_exists="append",
-                    index=False,
-                    method="multi",
-                )
+            with self.db_adapter.begin() as db_session:
+                for _, table_name, rows in self._route(db_session, weather_df):
+                    # Plain dates, so SQLite stores ISO dates rather than timestamps
+                    rows.assign(date=rows["date"].dt.date).to_sql(
+                        table_name,
+                        db_session,
+                        if_exists="append",
+                        index=False,
+                        method="multi",
+                    )
+                dirty = dirty_station_years(weather_df)
+                self._save_accumulators(db_session, self._accumulate(empty_accumulators(), weather_df), dirty)
+                # Same transaction as the rows, so a crash cannot leave them unmarked
+                record_weather_changes(db_session, dirty)
             self.log_handler.info(
                 f"Successfully stored {record_count} entries in {self.destination}"
             )
         except exc.SQLAlchemyError as db_err:
             self.log_handler.error(f"Storage operation failed: {db_err}")
 
+    def _copy_rows(self, frames: Iterable[pd.DataFrame]) -> int:
+        """Streams rows through PostgreSQL COPY FROM STDIN in batch_size chunks"""
+        copy_sql = (
+            "COPY {table} (" + ", ".join(WEATHER_COLUMNS) + ") FROM STDIN WITH (FORMAT csv)"
+        )
+        row_count, dirty, totals = 0, set(), empty_accumulators()
+        with self.db_adapter.begin() as db_session:
+            # COPY runs on the DBAPI cursor but inside the SQLAlchemy transaction,
+            # so the dirty marks below commit atomically with the rows.
+            with db_session.connection.dbapi_connection.cursor() as cursor:
+                for weather_df in frames:
+                    for _, table_name, rows in self._route(db_session, weather_df):
+                        for start in range(0, len(rows), self.batch_size):
+                            chunk = rows.iloc[start:start + self.batch_size]
+                            buffer = io.StringIO()
+                            chunk.to_csv(
+                                buffer, columns=WEATHER_COLUMNS, header=False, index=False,
+                                date_format="%Y-%m-%d", quoting=csv.QUOTE_MINIMAL,
+                            )
+                            buffer.seek(0)
+                            cursor.copy_expert(copy_sql.format(table=table_name), buffer)
+                    row_count += len(weather_df)
+                    dirty |= dirty_station_years(weather_df)
+                    totals = self._accumulate(totals, weather_df)
+            self._save_accumulators(db_session, totals, dirty)
+            record_weather_changes(db_session, dirty)
+        return row_count
+
+    def _executemany_rows(self, frames: Iterable[pd.DataFrame]) -> int:
+        """Portable fallback (e.g. SQLite): batched executemany inside one transaction"""
+        insert_sql = (
+            "INSERT INTO {table} (" + ", ".join(WEATHER_COLUMNS) + ") "
+            "VALUES (" + ", ".join(":" + c for c in WEATHER_COLUMNS) + ")"
+        )
+        row_count, dirty, totals = 0, set(), empty_accumulators()
+        with self.db_adapter.begin() as db_session:
+            for weather_df in frames:
+                for _, table_name, rows in self._route(db_session, weather_df):
+                    statement = text(insert_sql.format(table=table_name))
+                    for start in range(0, len(rows), self.batch_size):
+                        chunk = rows.iloc[start:start + self.batch_size]
+                        db_session.execute(statement, _to_records(chunk))
+                row_count += len(weather_df)
+                dirty |= dirty_station_years(weather_df)
+                totals = self._accumulate(totals, weather_df)
+            self._save_accumulators(db_session, totals, dirty)
+            record_weather_changes(db_session, dirty)
+        return row_count
+
+    def _bulk_transfer_to_storage(self, frames: Iterable[pd.DataFrame]):
+        """
+        Writes parsed frames in a single transaction using the fastest bulk path the
+        database offers. Frames may be a lazy iterator (see iter_weather_chunks).
+        """
+        try:
+            if self.db_adapter.dialect.name == "postgresql":
+                row_count = self._copy_rows(frames)
+            else:
+                row_count = self._executemany_rows(frames)
+            self.log_handler.info(
+                f"Bulk stored {row_count} entries in {self.destination}"
+            )
+        except Exception as db_err:
+            self.log_handler.error(f"Bulk storage operation failed: {db_err}")
+
+    def _upsert_rows(self, db_session, weather_df: pd.DataFrame):
+        """Inserts rows, overwriting existing (station_id, date) entries via ON CONFLICT"""
+        for year, _, rows in self._route(db_session, weather_df):
+            stmt = upsert(
+                weather_data if year is None else partition_table(year), self.db_adapter.dialect.name,
+                ["station_id", "date"], ["max_temp", "min_temp", "precipitation"],
+            )
+            for start in range(0, len(rows), self.batch_size):
+                db_session.execute(stmt, _to_records(rows.iloc[start:start + self.batch_size]))
+
+    def handle_file_incremental(self, file_path: str):
+        """
+        Loads a file only as far as needed according to its manifest entry:
+        unchanged files are skipped, appended files load just the new tail and
+        anything else is re-upserted in full. Data and manifest commit together.
+        """
+        self._ensure_tables()
+        path = pathlib.Path(file_path)
+        file_stat = path.stat()
+        manifest_key = str(path.resolve())
+        with self.db_adapter.connect() as db_session:
+            previous = db_session.execute(
+                select(ingest_manifest).where(ingest_manifest.c.path == manifest_key)
+            ).mappings().first()
+
+        if previous and previous["size_bytes"] == file_stat.st_size \
+                and previous["mtime"] == file_stat.st_mtime:
+            self.log_handler.info(f"Unchanged, skipping: {file_path}")
+            return
+
+        prefix_size = previous["size_bytes"] if previous else 0
+        if prefix_size > file_stat.st_size:
+            prefix_size = 0
+        content_hash, prefix_hash, prefix_ends_line = _hash_file(file_path, prefix_size)
+
+        offset, last_date = 0, None
+        if previous and content_hash == previous["content_hash"]:
+            self.log_handler.info(f"Content unchanged, skipping: {file_path}")
+        elif previous and prefix_hash == previous["content_hash"] and prefix_ends_line:
+            offset, last_date = prefix_size, previous["last_date"]
+            self.log_handler.info(f"Loading appended tail of {file_path} from byte {offset}")
+        else:
+            self.log_handler.info(f"Loading full file: {file_path}")
+
+        needs_load = not previous or content_hash != previous["content_hash"]
+        loaded_last_date = previous["last_date"] if previous else None
+        row_count, dirty, totals = 0, set(), empty_accumulators()
+        try:
+            with self.db_adapter.begin() as db_session:
+                if needs_load and offset < file_stat.st_size:
+                    chunks = iter_weather_chunks(file_path, self.chunk_rows or self.batch_size, offset)
+                    for new_rows in chunks:
+                        if last_date is not None:
+                            new_rows = new_rows[new_rows["date"].dt.date > last_date]
+                        if new_rows.empty:
+                            continue
+                        self._upsert_rows(db_session, new_rows)
+                        row_count += len(new_rows)
+                        dirty |= dirty_station_years(new_rows)
+                        totals = self._accumulate(totals, new_rows)
+                        newest = new_rows["date"].max().date()
+                        loaded_last_date = max(loaded_last_date, newest) if loaded_last_date else newest
+                # A full reload rewrote every row of its station-years; an appended tail only added rows
+                self._save_accumulators(db_session, totals, dirty, replace=offset == 0)
+                record_weather_changes(db_session, dirty)
+                db_session.execute(
+                    ingest_manifest.delete().where(ingest_manifest.c.path == manifest_key)
+                )
+                db_session.execute(ingest_manifest.insert(), {
+                    "path": manifest_key,
+                    "station_id": path.stem,
+                    "size_bytes": file_stat.st_size,
+                    "mtime": file_stat.st_mtime,
+                    "content_hash": content_hash,
+                    "last_date": loaded_last_date,
+                })
+            self.log_handler.info(f"Upserted {row_count} entries from {file_path}")
+        except (ValueError, pd.errors.ParserError) as err:
+            self.log_handler.error(f"Failed processing {file_path} | Reason: {err}")
+        except exc.SQLAlchemyError as db_err:
+            self.log_handler.error(f"Incremental storage operation failed: {db_err}")
+
+    def handle_file_streaming(self, file_path: str):
+        """Feeds bounded-size chunks straight from the parser into the bulk writer"""
+        self.log_handler.info(f"Streaming data from: {file_path} in chunks of {self.chunk_rows}")
+        try:
+            self._bulk_transfer_to_storage(iter_weather_chunks(file_path, self.chunk_rows))
+        except (ValueError, pd.errors.ParserError) as err:
+            self.log_handler.error(f"Failed processing {file_path} | Reason: {err}")
+
     def handle_file(self, file_path: str):
         """Orchestrates file processing pipeline"""
+        self._ensure_tables()
+        if self.incremental:
+            self.handle_file_incremental(file_path)
+            return
+        if self.chunk_rows:
+            self.handle_file_streaming(file_path)
+            return
+
         processed_data = self._parse_weather_file(file_path)
         if processed_data is not None and not processed_data.empty:
             self._transfer_to_storage(processed_data)
@@ -101,9 +434,48 @@ class WeatherInfoLoader:
             )
             return
 
+        if self.workers > 1:
+            if not (self.incremental or self.chunk_rows):
+                self._handle_files_parallel([str(f) for f in file_list])
+                return
+            self.log_handler.warning(
+                f"workers={self.workers} is ignored in incremental and streaming modes; loading files one at a time"
+            )
+
         for weather_file in file_list:
             self.handle_file(str(weather_file))
 
+    def _handle_files_parallel(self, file_list: list):
+        """
+        Parses files in a process pool while this process acts as the single writer,
+        so parsing of the next files overlaps with the bulk load of the current one.
+        At most 2 x workers files are parsed or waiting to be written at a time, so
+        parsed frames cannot pile up while the writer catches up.
+        """
+        self.log_handler.info(
+            f"Parallel ingestion of {len(file_list)} files with {self.workers} workers"
+        )
+        self._ensure_tables()
+        remaining = iter(file_list)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = set()
+            while True:
+                for file_loc in remaining:
+                    pending.add(pool.submit(_parse_in_worker, file_loc))
+                    if len(pending) >= 2 * self.workers:
+                        break
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_loc, weather_df, error = future.result()
+                    if error is not None:
+                        self.log_handler.error(f"Failed processing {file_loc} | Reason: {error}")
+                    elif weather_df is None or weather_df.empty:
+                        self.log_handler.warning(f"Empty dataset in {file_loc}")
+                    else:
+                        self._bulk_transfer_to_storage([weather_df])
+
 
 if __name__ == "__main__":
     DATABASE_URL = os.getenv(
@@ -112,5 +484,13 @@ if __name__ == "__main__":
     SOURCE_FOLDER = "./wx_data"
     WEATHER_TABLE = "weather_data"
 
-    loader = WeatherInfoLoader(conn_str=DATABASE_URL)
+    loader = WeatherInfoLoader(
+        conn_str=DATABASE_URL,
+        workers=int(os.getenv("INGEST_WORKERS", os.cpu_count() or 1)),
+        batch_size=int(os.getenv("INGEST_BATCH_SIZE", 50_000)),
+        incremental=os.getenv("INGEST_MODE", "full") == "incremental",
+        chunk_rows=int(os.getenv("INGEST_CHUNK_ROWS", 0)) or None,
+        partitioned=os.getenv("WEATHER_DATA_LAYOUT", "plain") == "partitioned",
+        accumulate=os.getenv("INGEST_ACCUMULATE", "false").lower() == "true",
+    )
     loader.handle_folder(SOURCE_FOLDER)
\ No newline at end of file
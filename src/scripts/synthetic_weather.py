@@ -0,0 +1,83 @@
+import os, pathlib, logging
+from typing import List
+import numpy as np
+import pandas as pd
+
+from scripts.db_weather_ingestor import MISSING_VALUE
+
+log = logging.getLogger("SyntheticWeather")
+
+# NCDC codes of the states in wx_data (IL, IN, IA, NE, OH), cycled over generated stations
+STATE_CODES = ("11", "12", "13", "25", "33")
+
+
+def station_ids(stations: int) -> List[str]:
+    """COOP-style ids (USC00SSNNNN) so rollups group generated stations by state"""
+    return [
+        f"USC00{STATE_CODES[i % len(STATE_CODES)]}{i // len(STATE_CODES):04d}"
+        for i in range(stations)
+    ]
+
+
+def synthetic_station_frame(rng: np.random.Generator, first_year: int, years: int,
+                            missing_rate: float) -> pd.DataFrame:
+    """
+    One station's daily series with a seasonal cycle, day-to-day noise and dry days.
+
+    :param missing_rate: Probability that any single measurement is -9999
+    :return: Dataframe with an int date (YYYYMMDD) and the three measurements in tenths
+    """
+    dates = pd.date_range(f"{first_year}-01-01", f"{first_year + years - 1}-12-31", freq="D")
+    season = np.cos(2 * np.pi * (dates.dayofyear.to_numpy() - 200) / 365.25)
+    max_temp = np.rint(170 + 150 * season + rng.normal(0, 40, len(dates))).astype(np.int64)
+    min_temp = max_temp - np.rint(rng.uniform(50, 150, len(dates))).astype(np.int64)
+    wet = rng.random(len(dates)) < 0.3
+    precipitation = np.where(wet, np.rint(rng.gamma(0.8, 60, len(dates))), 0).astype(np.int64)
+
+    frame = pd.DataFrame({
+        "date": dates.strftime("%Y%m%d").astype(np.int64),
+        "max_temp": max_temp,
+        "min_temp": min_temp,
+        "precipitation": precipitation,
+    })
+    for column in ("max_temp", "min_temp", "precipitation"):
+        frame.loc[rng.random(len(frame)) < missing_rate, column] = MISSING_VALUE
+    return frame
+
+
+def generate_weather_files(folder_path: str, stations: int, years: int, missing_rate: float = 0.02,
+                           first_year: int = 1985, seed: int = 0) -> List[pathlib.Path]:
+    """
+    Writes wx_data-format station files (tab separated, right-aligned values).
+
+    The output depends only on the arguments, so runs are comparable across commits.
+
+    :param folder_path: Directory to write <station_id>.txt files into (created if missing)
+    :param stations: Number of stations
+    :param years: Number of years per station, starting at first_year
+    :param missing_rate: Probability that any single measurement is -9999
+    :param seed: Random seed
+    :return: Paths of the written files
+    """
+    folder = pathlib.Path(folder_path)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    paths = []
+    for station_id in station_ids(stations):
+        frame = synthetic_station_frame(rng, first_year, years, missing_rate)
+        path = folder / f"{station_id}.txt"
+        np.savetxt(path, frame.to_numpy(), fmt="%d\t%5d\t%5d\t%5d")
+        paths.append(path)
+    log.info("Generated %d stations x %d years in %s", stations, years, folder)
+    return paths
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    generate_weather_files(
+        os.getenv("SYNTHETIC_FOLDER", "./synthetic_wx_data"),
+        stations=int(os.getenv("SYNTHETIC_STATIONS", 167)),
+        years=int(os.getenv("SYNTHETIC_YEARS", 30)),
+        missing_rate=float(os.getenv("SYNTHETIC_MISSING_RATE", 0.02)),
+        seed=int(os.getenv("SYNTHETIC_SEED", 0)),
+    )
@@ -0,0 +1,58 @@
+import unittest
+import tempfile
+from unittest.mock import patch
+from scripts.db_weather_ingestor import read_weather_file
+from scripts.synthetic_weather import generate_weather_files
+from scripts.benchmark import BenchmarkConfig, run_benchmarks, compare_results
+
+
+class TestBenchmarkSuite(unittest.TestCase):
+
+    def test_generated_files_are_reproducible_and_ingestible(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = generate_weather_files(f"{tmp}/a", stations=6, years=2, missing_rate=0.1, seed=7)
+            second = generate_weather_files(f"{tmp}/b", stations=6, years=2, missing_rate=0.1, seed=7)
+            self.assertEqual([p.name for p in first][:2], ["USC00110000.txt", "USC00120000.txt"])
+            self.assertEqual([p.read_bytes() for p in first], [p.read_bytes() for p in second])
+
+            frame = read_weather_file(str(first[0]))
+        self.assertEqual(len(frame), 730)
+        self.assertAlmostEqual(frame["max_temp"].isna().mean(), 0.1, delta=0.04)
+
+    def test_run_benchmarks_reports_every_path(self):
+        results = run_benchmarks(BenchmarkConfig(stations=2, years=1, query_iterations=2))
+
+        self.assertEqual(results["meta"]["database"], "sqlite")
+        by_name = {r["name"]: r for r in results["results"]}
+        self.assertEqual(by_name["ingest.handle_folder"]["rows"], 730)
+        self.assertIn("statistics.generate_statistics", by_name)
+        self.assertIn("query.rollup.state_season", by_name)
+        self.assertGreater(by_name["query.batch.100_keys"]["p50_ms"], 0)
+
+    def test_named_databases_are_not_reset_without_consent(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            with patch("scripts.benchmark._reset_database") as reset:
+                with self.assertRaises(ValueError):
+                    run_benchmarks(BenchmarkConfig(connection_string=conn_str))
+            reset.assert_not_called()
+
+    def test_compare_flags_slowdowns_beyond_the_threshold(self):
+        baseline = {"results": [
+            {"name": "ingest", "rows_per_second": 1000.0},
+            {"name": "query", "p50_ms": 10.0},
+        ]}
+        current = {"results": [
+            {"name": "ingest", "rows_per_second": 800.0},
+            {"name": "query", "p50_ms": 10.5},
+        ]}
+
+        comparison = {c["name"]: c for c in compare_results(baseline, current, threshold=0.10)}
+
+        self.assertTrue(comparison["ingest"]["regression"])
+        self.assertAlmostEqual(comparison["ingest"]["slowdown"], 0.25)
+        self.assertFalse(comparison["query"]["regression"])
+
+
+if __name__ == '__main__':
+    unittest.main()
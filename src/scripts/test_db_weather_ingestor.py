@@ -1,11 +1,32 @@
 import unittest
 from unittest.mock import patch, MagicMock
 import pandas as pd
+from scripts import db_weather_ingestor
 from scripts.db_weather_ingestor import WeatherInfoLoader  # Replace with your actual module
 import os
 from pathlib import Path
 from sqlalchemy import create_engine, exc
 from io import StringIO
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+WEATHER_DATA_DDL = """
+    CREATE TABLE weather_data (
+        id INTEGER PRIMARY KEY,
+        station_id VARCHAR(50) NOT NULL,
+        date DATE NOT NULL,
+        max_temp INT,
+        min_temp INT,
+        precipitation INT,
+        UNIQUE(station_id, date)
+    )
+"""
+
+
+def write_station_file(folder, station_id, lines):
+    path = Path(folder) / f"{station_id}.txt"
+    path.write_text("".join(f"{line}\n" for line in lines))
+    return path
 
 
 class TestWeatherInfoLoader(unittest.TestCase):
@@ -23,5 +44,193 @@ class TestWeatherInfoLoader(unittest.TestCase):
         # Ensure handle_file is called for each file in the folder
         self.assertEqual(mock_print.call_count, 0)  # We only care about ensuring it runs, not actual log output
 
+    def test_parallel_folder_ingestion_bulk_writes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_station_file(tmp, "STN001", ["19850101\t  -22\t -128\t   94", "19850102\t-9999\t-9999\t    0"])
+            write_station_file(tmp, "STN002", ["19850101\t   10\t   -5\t-9999"])
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(WEATHER_DATA_DDL)
+
+            loader = WeatherInfoLoader(conn_str=conn_str, workers=2, batch_size=1)
+            loader.handle_folder(tmp)
+
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(
+                    "SELECT station_id, date, max_temp, min_temp, precipitation "
+                    "FROM weather_data ORDER BY station_id, date"
+                ).fetchall()
+            engine.dispose()
+
+        self.assertEqual(
+            rows,
+            [
+                ("STN001", "1985-01-01", -22, -128, 94),
+                ("STN001", "1985-01-02", None, None, 0),
+                ("STN002", "1985-01-01", 10, -5, None),
+            ],
+        )
+
+    def test_parallel_ingestion_bounds_the_files_in_flight(self):
+        submitted, written, in_flight = [], [], []
+
+        class CountingPool(ThreadPoolExecutor):
+            def submit(self, fn, *args):
+                submitted.append(args[0])
+                return super().submit(fn, *args)
+
+        def write(frames):
+            in_flight.append(len(submitted) - len(written))
+            written.append(frames)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for i in range(9):
+                write_station_file(tmp, f"STN00{i}", ["19850101\t  -22\t -128\t   94"])
+            loader = WeatherInfoLoader(conn_str=f"sqlite:///{tmp}/weather.db", workers=2)
+            with patch.object(db_weather_ingestor, "ProcessPoolExecutor", CountingPool), \
+                    patch.object(loader, "_bulk_transfer_to_storage", side_effect=write):
+                loader.handle_folder(tmp)
+            loader.db_adapter.dispose()
+
+        self.assertEqual(len(written), 9)
+        self.assertLessEqual(max(in_flight), 4)
+
+    def test_workers_are_ignored_with_a_warning_in_incremental_mode(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_station_file(tmp, "STN001", ["19850101\t  -22\t -128\t   94"])
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(WEATHER_DATA_DDL)
+            loader = WeatherInfoLoader(conn_str=conn_str, workers=2, incremental=True)
+            with self.assertLogs(loader.log_handler, "WARNING") as logs:
+                loader.handle_folder(tmp)
+            loader.db_adapter.dispose()
+            engine.dispose()
+
+        self.assertTrue(any("workers=2 is ignored" in line for line in logs.output))
+
+    def test_incremental_ingestion_skips_unchanged_and_loads_tail(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            station_file = write_station_file(tmp, "STN001", ["19850101\t  -22\t -128\t   94"])
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(WEATHER_DATA_DDL)
+
+            loader = WeatherInfoLoader(conn_str=conn_str, incremental=True)
+            loader.handle_file(str(station_file))
+            # Re-running on an unchanged file must not hit unique_station_date
+            loader.handle_file(str(station_file))
+            with open(station_file, "a") as handle:
+                handle.write("19850102\t   15\t  -40\t    0\n")
+            reader = patch.object(
+                db_weather_ingestor, "iter_weather_chunks", wraps=db_weather_ingestor.iter_weather_chunks
+            )
+            with reader as mock_reader:
+                loader.handle_file(str(station_file))
+                self.assertGreater(mock_reader.call_args.args[2], 0)  # only the tail was parsed
+
+            with engine.connect() as conn:
+                rows = conn.exec_driver_sql(
+                    "SELECT station_id, date, max_temp FROM weather_data ORDER BY date"
+                ).fetchall()
+                manifest = conn.exec_driver_sql(
+                    "SELECT station_id, last_date FROM ingest_manifest"
+                ).fetchall()
+            engine.dispose()
+
+        self.assertEqual(rows, [("STN001", "1985-01-01", -22), ("STN001", "1985-01-02", 15)])
+        self.assertEqual(manifest, [("STN001", "1985-01-02")])
+
+    def test_accumulators_follow_appends_and_full_reloads(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            station_file = write_station_file(tmp, "STN001", [
+                "19851231\t  100\t  -20\t  150",
+                "19860101\t-9999\t  -40\t   50",
+            ])
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(WEATHER_DATA_DDL)
+
+            loader = WeatherInfoLoader(conn_str=conn_str, incremental=True, accumulate=True)
+            loader.handle_file(str(station_file))
+            with open(station_file, "a") as handle:
+                handle.write("19860102\t   70\t-9999\t   25\n")
+            loader.handle_file(str(station_file))  # appended tail: added to 1986
+            appended = self._accumulators(engine)
+
+            station_file.write_text("19851231\t  120\t  -20\t  150\n")
+            loader.handle_file(str(station_file))  # rewritten file: 1985 replaced
+            reloaded = self._accumulators(engine)
+            engine.dispose()
+
+        self.assertEqual(appended, [
+            ("STN001", 1985, 1, 100, 1, -20, 1, 150, 1),
+            ("STN001", 1986, 2, 70, 1, -40, 1, 75, 2),
+        ])
+        self.assertEqual(reloaded[0], ("STN001", 1985, 1, 120, 1, -20, 1, 150, 1))
+
+    def test_bulk_paths_accumulate_while_loading(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_station_file(tmp, "STN001", ["19850101\t  100\t  -20\t  150", "19850102\t   50\t-9999\t    0"])
+            write_station_file(tmp, "STN002", ["19850101\t-9999\t-9999\t-9999"])
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            with engine.begin() as conn:
+                conn.exec_driver_sql(WEATHER_DATA_DDL)
+
+            WeatherInfoLoader(conn_str=conn_str, chunk_rows=1, accumulate=True).handle_folder(tmp)
+            accumulators = self._accumulators(engine)
+            engine.dispose()
+
+        self.assertEqual(accumulators, [
+            ("STN001", 1985, 2, 150, 2, -20, 1, 150, 2),
+            ("STN002", 1985, 1, 0, 0, 0, 0, 0, 0),
+        ])
+
+    @staticmethod
+    def _accumulators(engine):
+        with engine.connect() as conn:
+            return conn.exec_driver_sql(
+                "SELECT station_id, year, observed_days, max_temp_sum, max_temp_count, min_temp_sum, "
+                "min_temp_count, precipitation_sum, precipitation_count "
+                "FROM station_year_accumulators ORDER BY station_id, year"
+            ).fetchall()
+
+    def test_streaming_chunks_are_compact_and_bounded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            station_file = write_station_file(tmp, "STN001", [
+                "19850101\t  -22\t -128\t   94",
+                "19850102\t-9999\t  -50\t    0",
+                "19850103\t   12\t-9999\t-9999",
+            ])
+            chunks = list(db_weather_ingestor.iter_weather_chunks(str(station_file), chunk_rows=2))
+
+        self.assertEqual([len(c) for c in chunks], [2, 1])
+        self.assertEqual(str(chunks[0]["max_temp"].dtype), "Int16")
+        self.assertEqual(str(chunks[0]["precipitation"].dtype), "Int32")
+        self.assertEqual(chunks[0]["station_id"].dtype.categories.tolist(), ["STN001"])
+        self.assertTrue(pd.isna(chunks[0]["max_temp"].iloc[1]))
+        self.assertTrue(pd.isna(chunks[1]["precipitation"].iloc[0]))
+        self.assertEqual(chunks[1]["max_temp"].iloc[0], 12)
+
+
+    def test_streaming_chunks_drop_malformed_dates_like_the_file_reader(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            station_file = write_station_file(tmp, "STN001", [
+                "19850101\t  -22\t -128\t   94",
+                "1985013X\t   10\t   20\t    0",
+                "19850103\t   12\t-9999\t-9999",
+            ])
+            chunks = list(db_weather_ingestor.iter_weather_chunks(str(station_file), chunk_rows=2))
+            whole = db_weather_ingestor.read_weather_file(str(station_file))
+
+        dates = pd.concat(chunks)["date"].tolist()
+        self.assertEqual(dates, whole["date"].tolist())
+        self.assertEqual(dates, [pd.Timestamp("1985-01-01"), pd.Timestamp("1985-01-03")])
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,33 @@
+import unittest
+import tempfile
+from pathlib import Path
+from sqlalchemy import create_engine, select
+from scripts.db_yield_ingestor import YieldInfoLoader
+from scripts.weather_schema import yield_data, data_version
+
+
+class TestYieldInfoLoader(unittest.TestCase):
+
+    def test_handle_file_upserts_years_and_bumps_the_data_version(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            yield_file = Path(tmp) / "US_corn_grain_yield.txt"
+            yield_file.write_text("1985\t225447\n1986\t208944\n")
+            loader = YieldInfoLoader(conn_str=conn_str)
+            self.assertEqual(loader.handle_file(str(yield_file)), 2)
+
+            yield_file.write_text("1986\t209000\n1987\t181143\n")
+            self.assertEqual(loader.handle_file(str(yield_file)), 2)
+
+            engine = create_engine(conn_str)
+            with engine.connect() as conn:
+                rows = conn.execute(select(yield_data.c.year, yield_data.c.total_yield).order_by(yield_data.c.year)).all()
+                version = conn.execute(select(data_version.c.version)).scalar()
+            engine.dispose()
+
+        self.assertEqual(rows, [(1985, 225447), (1986, 209000), (1987, 181143)])
+        self.assertEqual(version, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+import tempfile
+from pathlib import Path
+from sqlalchemy import create_engine
+from scripts.db_weather_ingestor import WeatherInfoLoader
+from scripts.partitioning import create_partitioned_layout, is_partitioned, existing_partition_years
+
+
+class TestPartitionedLayout(unittest.TestCase):
+
+    def test_ingestor_routes_rows_to_year_partitions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            with engine.begin() as conn:
+                create_partitioned_layout(conn, 1985, 1985)
+                self.assertTrue(is_partitioned(conn))
+
+            station_file = Path(tmp) / "STN001.txt"
+            station_file.write_text("19851231\t  100\t  -20\t  150\n19860101\t   50\t  -40\t    0\n")
+            WeatherInfoLoader(conn_str=conn_str, partitioned=True, workers=1, chunk_rows=10).handle_file(str(station_file))
+            # Re-loading through the incremental path upserts into the same partitions
+            station_file.write_text("19851231\t  110\t  -20\t  150\n19860101\t   50\t  -40\t    0\n")
+            WeatherInfoLoader(conn_str=conn_str, partitioned=True, incremental=True).handle_file(str(station_file))
+
+            with engine.connect() as conn:
+                years = existing_partition_years(conn)
+                per_partition = [
+                    conn.exec_driver_sql(f"SELECT COUNT(*) FROM weather_data_y{year}").scalar()
+                    for year in (1985, 1986)
+                ]
+                rows = conn.exec_driver_sql(
+                    "SELECT id, station_id, date, max_temp FROM weather_data ORDER BY date"
+                ).fetchall()
+            engine.dispose()
+
+        self.assertEqual(years, {1985, 1986})
+        self.assertEqual(per_partition, [1, 1])
+        self.assertEqual([row[1:] for row in rows], [("STN001", "1985-12-31", 110), ("STN001", "1986-01-01", 50)])
+        self.assertEqual(len({row[0] for row in rows}), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+import tempfile
+from datetime import date
+from pathlib import Path
+import numpy as np
+from scripts.station_store import StationStore, MISSING_MAX_TEMP, MISSING_PRECIPITATION
+
+
+class TestStationStore(unittest.TestCase):
+
+    def test_build_from_files_and_read_range(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = Path(tmp) / "wx_data"
+            source.mkdir()
+            (source / "STN001.txt").write_text(
+                "19850102\t-9999\t  -50\t    0\n"
+                "19850101\t  -22\t -128\t   94\n"
+                "19850103\t   12\t  -80\t-9999\n"
+            )
+            store = StationStore.build_from_files(Path(tmp) / "store", str(source))
+
+            series = StationStore(store.root).read("STN001", date(1985, 1, 2), date(1985, 1, 3))
+
+            self.assertEqual(store.stations(), ["STN001"])
+            self.assertIsInstance(series.max_temp, np.memmap)
+            self.assertEqual(series.dates.tolist(), [date(1985, 1, 2).toordinal(), date(1985, 1, 3).toordinal()])
+            self.assertEqual(series.min_temp.tolist(), [-50, -80])
+            self.assertEqual(series.missing.tolist(), [MISSING_MAX_TEMP, MISSING_PRECIPITATION])
+            with self.assertRaises(KeyError):
+                store.read("STN999")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import numpy as np
+import pandas as pd
+
+from scripts.stats_accumulators import (
+    accumulate_station_years, merge_accumulators, statistics_from_accumulators,
+)
+
+
+def parsed_frame(rows):
+    """Frame shaped like read_weather_file output; None marks a missing measurement"""
+    frame = pd.DataFrame(rows, columns=["station_id", "date", "max_temp", "min_temp", "precipitation"])
+    frame["date"] = pd.to_datetime(frame["date"])
+    for column in ("max_temp", "min_temp", "precipitation"):
+        frame[column] = frame[column].astype("Int32")
+    return frame
+
+
+class TestStatsAccumulators(unittest.TestCase):
+
+    def test_split_batches_merge_to_the_single_pass_totals(self):
+        rows = [
+            ("STN001", "1985-12-31", 100, -20, 150),
+            ("STN001", "1986-01-01", None, -40, 50),
+            ("STN001", "1986-01-02", 70, None, 25),
+            ("STN002", "1986-01-01", None, None, None),
+        ]
+        whole = accumulate_station_years(parsed_frame(rows))
+        merged = merge_accumulators(
+            accumulate_station_years(parsed_frame(rows[:2])), accumulate_station_years(parsed_frame(rows[2:]))
+        )
+
+        pd.testing.assert_frame_equal(merged, whole, check_dtype=False)
+        self.assertEqual(whole.iloc[1].tolist(), ["STN001", 1986, 2, 70, 1, -40, 1, 75, 2])
+
+    def test_statistics_follow_sql_rounding(self):
+        accumulators = accumulate_station_years(parsed_frame([
+            ("STN001", "1985-01-01", 101, -20, 150),
+            ("STN001", "1985-01-02", None, -41, 99),
+            ("STN001", "1986-01-01", None, None, None),
+        ]))
+
+        stats = statistics_from_accumulators(accumulators, dialect="sqlite")
+
+        self.assertEqual(stats['mean_max_temp'].iloc[0], 101 / 10)
+        self.assertEqual(stats['mean_min_temp'].iloc[0], (-61 / 2) / 10)
+        self.assertEqual(stats['total_precipitation'].iloc[0], 2.0)  # SUM(...)/100 is integer division
+        self.assertTrue(np.isnan(stats.iloc[1][['mean_max_temp', 'mean_min_temp', 'total_precipitation']].astype(float)).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
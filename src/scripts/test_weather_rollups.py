@@ -0,0 +1,91 @@
+import unittest
+import tempfile
+from pathlib import Path
+from sqlalchemy import create_engine, select, text
+from scripts.db_weather_ingestor import WeatherInfoLoader
+from scripts.weather_schema import metadata, weather_data, weather_rollup
+from scripts.weather_analytics_engine import MeteorologicalProcessor, DbConfig
+from scripts.weather_rollups import refresh_rollups, station_state
+
+
+class TestWeatherRollups(unittest.TestCase):
+
+    def _cells(self, engine):
+        with engine.connect() as conn:
+            rows = conn.execute(select(
+                weather_rollup.c.grain, weather_rollup.c.region, weather_rollup.c.year,
+                weather_rollup.c.period, weather_rollup.c.observed_days,
+                weather_rollup.c.max_temp_sum, weather_rollup.c.max_temp_count,
+                weather_rollup.c.precipitation_sum,
+            )).all()
+        return {(r.grain, r.region, r.year, r.period): tuple(r[4:]) for r in rows}
+
+    def test_station_state_from_coop_id(self):
+        self.assertEqual(station_state("USC00110072"), "IL")
+        self.assertEqual(station_state("USC00257515"), "NE")
+        self.assertIsNone(station_state("STN001"))
+
+    def test_incremental_refresh_matches_a_full_rebuild(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            metadata.create_all(engine, tables=[weather_data])
+            illinois = Path(tmp) / "USC00110001.txt"
+            nebraska = Path(tmp) / "USC00250001.txt"
+            illinois.write_text("19851231\t  100\t  -20\t  150\n19860101\t   50\t-9999\t  250\n")
+            nebraska.write_text("19860102\t   70\t  -40\t-9999\n")
+            loader = WeatherInfoLoader(conn_str=conn_str, incremental=True)
+            loader.handle_folder(tmp)
+            processor = MeteorologicalProcessor(DbConfig(connection_string=conn_str))
+            processor.refresh_statistics()
+
+            cells = self._cells(engine)
+            self.assertEqual(cells[("station_month", "USC00110001", 1985, 12)], (1, 100, 1, 150))
+            # December 1985 belongs to the 1986 winter
+            self.assertEqual(cells[("station_season", "USC00110001", 1986, 1)], (2, 150, 2, 400))
+            self.assertEqual(cells[("state_year", "NE", 1986, 0)], (1, 70, 1, 0))
+            self.assertEqual(cells[("all_year", "ALL", 1986, 0)], (2, 120, 2, 250))
+
+            with open(nebraska, "a") as handle:
+                handle.write("19860301\t  200\t  100\t   30\n")
+            loader.handle_file(str(nebraska))
+            processor.refresh_statistics()
+            incremental = self._cells(engine)
+            self.assertEqual(incremental[("all_year", "ALL", 1986, 0)], (3, 320, 3, 280))
+            self.assertEqual(incremental[("station_season", "USC00250001", 1986, 2)], (1, 200, 1, 30))
+
+            with engine.begin() as conn:
+                refresh_rollups(conn)
+            self.assertEqual(self._cells(engine), incremental)
+            engine.dispose()
+
+    def test_rollup_table_without_heat_days_is_upgraded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            conn_str = f"sqlite:///{tmp}/weather.db"
+            engine = create_engine(conn_str)
+            metadata.create_all(engine, tables=[weather_data])
+            with engine.begin() as conn:
+                # weather_rollup as it was created before heat_days was added
+                conn.execute(text(
+                    "CREATE TABLE weather_rollup (id INTEGER PRIMARY KEY, grain VARCHAR(20) NOT NULL,"
+                    " region VARCHAR(50) NOT NULL, state VARCHAR(2), year INTEGER NOT NULL,"
+                    " period INTEGER NOT NULL, observed_days INTEGER NOT NULL,"
+                    " max_temp_sum BIGINT NOT NULL, max_temp_count INTEGER NOT NULL,"
+                    " min_temp_sum BIGINT NOT NULL, min_temp_count INTEGER NOT NULL,"
+                    " precipitation_sum BIGINT NOT NULL, precipitation_count INTEGER NOT NULL)"
+                ))
+            station = Path(tmp) / "USC00110001.txt"
+            station.write_text("19860701\t  320\t  180\t    0\n19860702\t  250\t  150\t   10\n")
+            WeatherInfoLoader(conn_str=conn_str, incremental=True).handle_folder(tmp)
+            MeteorologicalProcessor(DbConfig(connection_string=conn_str)).refresh_statistics()
+
+            with engine.connect() as conn:
+                heat_days = conn.execute(select(weather_rollup.c.heat_days).where(
+                    weather_rollup.c.grain == "all_year", weather_rollup.c.year == 1986
+                )).scalar_one()
+            self.assertEqual(heat_days, 1)
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,165 @@
+import os, pathlib, logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, Tuple
+import numpy as np
+import pandas as pd
+
+from scripts.db_weather_ingestor import iter_weather_chunks
+from scripts.station_store import StationStore, MISSING_MAX_TEMP, MISSING_MIN_TEMP, MISSING_PRECIPITATION
+
+log = logging.getLogger('WeatherAnalyzer')
+
+STATS_COLUMNS = ['site_id', 'year', 'mean_max_temp', 'mean_min_temp', 'total_precipitation']
+
+
+def station_year_statistics(station_id: str, years: np.ndarray, max_temp: np.ndarray,
+                            min_temp: np.ndarray, precipitation: np.ndarray,
+                            max_valid: np.ndarray, min_valid: np.ndarray,
+                            precip_valid: np.ndarray, dialect: str = "postgresql") -> pd.DataFrame:
+    """
+    Yearly statistics for one station using bincount group-by reductions.
+
+    Mirrors MeteorologicalProcessor._fetch_weather_data exactly:
+    AVG(max_temp)/10, AVG(min_temp)/10 over non-missing days, SUM(precipitation)/100
+    with integer division, NULL when a year has no valid value, and every year
+    that has at least one row is reported.
+
+    The temperature means follow the rounding of the given SQL dialect: PostgreSQL
+    divides exact numerics (one rounding to float), SQLite divides doubles twice.
+    """
+    if years.size == 0:
+        return pd.DataFrame(columns=STATS_COLUMNS)
+    unique_years, group = np.unique(years, return_inverse=True)
+    n_groups = unique_years.size
+
+    def mean_tenths(values, valid):
+        counts = np.bincount(group, weights=valid, minlength=n_groups).astype(np.int64)
+        sums = np.bincount(group[valid], weights=values[valid], minlength=n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if dialect == "sqlite":
+                means = (sums / counts) / 10
+            else:
+                means = sums / (counts * 10)
+        return np.where(counts > 0, means, np.nan)
+
+    precip_counts = np.bincount(group, weights=precip_valid, minlength=n_groups)
+    precip_sums = np.bincount(
+        group[precip_valid], weights=precipitation[precip_valid], minlength=n_groups
+    ).astype(np.int64)
+    totals = np.where(precip_counts > 0, (precip_sums // 100).astype(np.float64), np.nan)
+
+    return pd.DataFrame({
+        'site_id': station_id,
+        'year': unique_years.astype(np.int64),
+        'mean_max_temp': mean_tenths(max_temp, max_valid),
+        'mean_min_temp': mean_tenths(min_temp, min_valid),
+        'total_precipitation': totals,
+    })
+
+
+def _frame_statistics(station_id: str, frame: pd.DataFrame, dialect: str) -> pd.DataFrame:
+    """Statistics from a frame with date and nullable measurement columns"""
+    years = frame['date'].dt.year.to_numpy()
+    columns = {}
+    for name in ('max_temp', 'min_temp', 'precipitation'):
+        valid = frame[name].notna().to_numpy()
+        columns[name] = (frame[name].to_numpy(dtype=np.float64, na_value=0), valid)
+    return station_year_statistics(
+        station_id, years,
+        columns['max_temp'][0], columns['min_temp'][0], columns['precipitation'][0],
+        columns['max_temp'][1], columns['min_temp'][1], columns['precipitation'][1],
+        dialect,
+    )
+
+
+def _file_statistics(task: Tuple[str, str]) -> pd.DataFrame:
+    """Process pool task: statistics for one raw station file"""
+    file_loc, dialect = task
+    frame = pd.concat(iter_weather_chunks(file_loc, 100_000), ignore_index=True)
+    return _frame_statistics(pathlib.Path(file_loc).stem, frame, dialect)
+
+
+def _store_statistics(task: Tuple[str, str, str]) -> pd.DataFrame:
+    """Process pool task: statistics for one station of a StationStore"""
+    root, station_id, dialect = task
+    series = StationStore(root).read(station_id)
+    years = series.as_datetime64().astype('datetime64[Y]').astype(np.int64) + 1970
+    missing = np.asarray(series.missing)
+    return station_year_statistics(
+        station_id, years,
+        np.asarray(series.max_temp, dtype=np.float64),
+        np.asarray(series.min_temp, dtype=np.float64),
+        np.asarray(series.precipitation, dtype=np.float64),
+        (missing & MISSING_MAX_TEMP) == 0,
+        (missing & MISSING_MIN_TEMP) == 0,
+        (missing & MISSING_PRECIPITATION) == 0,
+        dialect,
+    )
+
+
+def _extract_statistics(task: Tuple[Tuple[str, pd.DataFrame], str]) -> pd.DataFrame:
+    (station_id, frame), dialect = task
+    return _frame_statistics(station_id, frame, dialect)
+
+
+def _fan_out(func, tasks: Iterable, workers: int) -> pd.DataFrame:
+    """Runs per-station tasks on a process pool and concatenates ordered results"""
+    tasks = list(tasks)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(func, tasks))
+    else:
+        parts = [func(task) for task in tasks]
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=STATS_COLUMNS)
+    return pd.concat(parts, ignore_index=True).sort_values(['site_id', 'year'], ignore_index=True)
+
+
+def statistics_from_files(folder_path: str, workers: int = 1, file_suffix: str = ".txt",
+                          dialect: str = "postgresql") -> pd.DataFrame:
+    """Yearly statistics straight from the raw wx_data files, one station per task"""
+    files = sorted(str(f) for f in pathlib.Path(folder_path).glob(f"*{file_suffix}") if f.is_file())
+    log.info("Computing statistics for %d station files on %d workers", len(files), workers)
+    return _fan_out(_file_statistics, [(f, dialect) for f in files], workers)
+
+
+def statistics_from_store(root: str, workers: int = 1, dialect: str = "postgresql") -> pd.DataFrame:
+    """Yearly statistics from a StationStore; workers memory-map their own stations"""
+    stations = StationStore(root).stations()
+    log.info("Computing statistics for %d stored stations on %d workers", len(stations), workers)
+    return _fan_out(_store_statistics, [(str(root), s, dialect) for s in stations], workers)
+
+
+def statistics_from_extract(extract: pd.DataFrame, workers: int = 1,
+                            dialect: str = "postgresql") -> pd.DataFrame:
+    """
+    Yearly statistics from a bulk weather_data extract
+    (station_id, date, max_temp, min_temp, precipitation with NULLs for missing).
+    """
+    extract = extract.assign(date=pd.to_datetime(extract['date']))
+    for name in ('max_temp', 'min_temp', 'precipitation'):
+        extract[name] = extract[name].astype('Int32')
+    tasks = [(group, dialect) for group in extract.groupby('station_id', sort=True)]
+    log.info("Computing statistics for %d extracted stations on %d workers", len(tasks), workers)
+    return _fan_out(_extract_statistics, tasks, workers)
+
+
+def compare_statistics(expected: pd.DataFrame, actual: pd.DataFrame) -> pd.DataFrame:
+    """
+    Rows where two statistics frames disagree (by exact float equality, NULLs equal).
+    An empty result means the engines are at parity.
+    """
+    keys = ['site_id', 'year']
+    left = expected.astype({'year': np.int64}).set_index(keys).astype(np.float64)
+    right = actual.astype({'year': np.int64}).set_index(keys).astype(np.float64)
+    joined = left.join(right, how='outer', lsuffix='_expected', rsuffix='_actual')
+    mismatch = np.zeros(len(joined), dtype=bool)
+    for name in STATS_COLUMNS[2:]:
+        a, b = joined[f'{name}_expected'], joined[f'{name}_actual']
+        mismatch |= ~((a == b) | (a.isna() & b.isna())).to_numpy()
+    return joined[mismatch].reset_index()
+
+
+def default_workers() -> int:
+    return int(os.getenv('STATS_WORKERS', os.cpu_count() or 1))
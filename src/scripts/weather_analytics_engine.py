@@ -1,20 +1,51 @@
 import os, sys
 from dataclasses import dataclass
+from typing import Optional
 from contextlib import contextmanager
 from dotenv import find_dotenv, load_dotenv
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, select, tuple_
 from sqlalchemy.exc import DatabaseError
 import logging.handlers
 
+from scripts.weather_schema import (
+    metadata, weather_data, weather_stats, stats_dirty, data_version, weather_rollup, weather_sketch,
+    weather_normals, station_year_accumulators, upsert, bump_data_version,
+)
+from scripts import vectorized_stats, weather_rollups, weather_sketches, weather_climatology, stats_accumulators
+
 # Configure root logger first
 logging.basicConfig(level=logging.WARNING)
 log = logging.getLogger('WeatherAnalyzer')
 
+# Aggregate query output columns -> weather_stats (WeatherStats model) columns
+STATS_COLUMN_MAP = {
+    'site_id': 'station_id',
+    'year': 'year',
+    'mean_max_temp': 'avg_max_temp',
+    'mean_min_temp': 'avg_min_temp',
+    'total_precipitation': 'total_precipitation',
+}
+
 @dataclass
 class DbConfig:
     connection_string: str
     results_table: str = "weather_stats"
+    refresh_mode: str = "full"          # "full" or "incremental"
+    stats_engine: str = "sql"           # "sql" (GROUP BY in the database), "vectorized" or "accumulators"
+    data_source: str = "database"       # vectorized input: "database", "files" or "store"
+    source_path: str = "./wx_data"      # wx_data folder or StationStore root
+    workers: int = 1                    # vectorized engine process pool size
+    # Derived tables, each aggregated from weather_data in the database; None maintains
+    # them only with the sql engine, as the other engines keep that work off the database
+    rollups: Optional[bool] = None      # maintain weather_rollup with the stats
+    sketches: Optional[bool] = None     # maintain weather_sketch (percentile histograms) with the stats
+    normals: Optional[bool] = None      # maintain weather_normals (1985-2014 day-of-year climatology) with the stats
+
+    def __post_init__(self):
+        for name in ("rollups", "sketches", "normals"):
+            if getattr(self, name) is None:
+                setattr(self, name, self.stats_engine == "sql")
 
 class MeteorologicalProcessor:
     """Transforms raw weather observations into aggregated statistics"""
@@ -35,12 +66,38 @@ class MeteorologicalProcessor:
             log.critical("Database connection failed: %s", db_err)
             raise RuntimeError("Database unavailable") from db_err
 
+    @contextmanager
+    def _db_transaction(self):
+        """Managed connection wrapped in a single transaction"""
+        try:
+            with self._db_engine.begin() as conn:
+                yield conn
+        except DatabaseError as db_err:
+            log.critical("Database transaction failed: %s", db_err)
+            raise RuntimeError("Database unavailable") from db_err
+
+    def _ensure_stats_tables(self) -> None:
+        """Creates weather_stats (with unique_station_year), weather_rollup, weather_sketch, weather_normals, bookkeeping and (for the accumulators engine) accumulator tables if absent, and upgrades a weather_rollup that predates heat_days"""
+        tables = [weather_stats, stats_dirty, data_version, weather_rollup, weather_sketch, weather_normals]
+        if self._db_cfg.stats_engine == "accumulators":
+            tables.append(station_year_accumulators)
+        metadata.create_all(self._db_engine, tables=tables)
+        with self._db_transaction() as session:
+            if weather_rollups.upgrade_rollup_table(session):
+                bump_data_version(session)
+
+    def _year_expression(self) -> str:
+        """SQL for the year of weather_data.date (SQLite has no EXTRACT)"""
+        if self._db_engine.dialect.name == "sqlite":
+            return "CAST(strftime('%Y', date) AS INTEGER)"
+        return "EXTRACT(YEAR FROM date)"
+
     def _fetch_weather_data(self) -> pd.DataFrame:
         """Retrieve aggregated meteorological measurements"""
-        analysis_query = text("""
+        analysis_query = text(f"""
             SELECT 
                 station_id AS site_id,
-                EXTRACT(YEAR FROM date) AS year,
+                {self._year_expression()} AS year,
                 AVG(max_temp)/10 AS mean_max_temp,
                 AVG(min_temp)/10 AS mean_min_temp,
                 SUM(precipitation)/100 AS total_precipitation
@@ -53,8 +110,145 @@ class MeteorologicalProcessor:
         with self._db_session() as session:
             return pd.read_sql(analysis_query, session)
 
-    def _save_weather_stats(self, metrics: pd.DataFrame) -> None:
-        """Persist calculated statistics to database"""
+    def _fetch_raw_weather_data(self) -> pd.DataFrame:
+        """Bulk extract of daily rows for the vectorized engine"""
+        extract_query = text("""
+            SELECT station_id, date, max_temp, min_temp, precipitation
+            FROM weather_data
+        """)
+        log.info("Extracting daily weather records")
+        with self._db_session() as session:
+            return pd.read_sql(extract_query, session)
+
+    def _compute_vectorized_statistics(self) -> pd.DataFrame:
+        """Aggregate in-process with NumPy, fanning stations out over worker processes"""
+        cfg = self._db_cfg
+        # Round like the database the SQL engine would have used, for parity checks
+        dialect = self._db_engine.dialect.name
+        if cfg.data_source == "files":
+            return vectorized_stats.statistics_from_files(cfg.source_path, cfg.workers, dialect=dialect)
+        if cfg.data_source == "store":
+            return vectorized_stats.statistics_from_store(cfg.source_path, cfg.workers, dialect=dialect)
+        return vectorized_stats.statistics_from_extract(
+            self._fetch_raw_weather_data(), cfg.workers, dialect=dialect
+        )
+
+    def _compute_accumulator_statistics(self) -> pd.DataFrame:
+        """
+        Derive statistics from the ingest-time station_year_accumulators, without
+        aggregating weather_data. Station-years the ingestor marked in accumulator_gaps
+        (rows loaded without accumulate) are rebuilt from their own rows first, and
+        every accumulator when there are none yet for existing rows.
+        """
+        with self._db_transaction() as session:
+            self._repair_accumulators(session)
+        log.info("Reading station-year accumulators")
+        with self._db_session() as session:
+            accumulators = stats_accumulators.read_accumulators(session)
+        return stats_accumulators.statistics_from_accumulators(accumulators, self._db_engine.dialect.name)
+
+    @staticmethod
+    def _repair_accumulators(session, pairs: Optional[set] = None) -> None:
+        """
+        Rebuilds from weather_data the accumulators that miss rows: station-years in
+        accumulator_gaps and, for the given dirty pairs, those without accumulators
+        (whose rows may predate the gap marks or be gone). Without pairs, an empty
+        accumulator table next to a non-empty weather_data is built in full.
+        """
+        gaps = stats_accumulators.read_accumulator_gaps(session)
+        if pairs is None:
+            def first(table):
+                return session.execute(select(table.c.station_id).limit(1)).first()
+            if first(station_year_accumulators) is None and first(weather_data) is not None:
+                log.warning("No accumulators for the stored weather_data; building them")
+                stats_accumulators.build_accumulators(session)
+                return
+            stale = gaps
+        else:
+            accumulators = stats_accumulators.read_accumulators(session, pairs)
+            present = set(zip(accumulators["station_id"], accumulators["year"].astype(int)))
+            stale = (pairs & gaps) | (pairs - present)
+        if stale:
+            log.warning("Rebuilding accumulators of %d station-years from weather_data", len(stale))
+            stats_accumulators.build_accumulators(session, stale)
+
+    def _compute_statistics(self) -> pd.DataFrame:
+        """Yearly statistics from the configured engine"""
+        if self._db_cfg.stats_engine == "vectorized":
+            return self._compute_vectorized_statistics()
+        if self._db_cfg.stats_engine == "accumulators":
+            return self._compute_accumulator_statistics()
+        return self._fetch_weather_data()
+
+    def _fetch_dirty_weather_data(self, session) -> tuple:
+        """Aggregate only the station-years flagged in stats_dirty"""
+        dirty = session.execute(
+            select(stats_dirty.c.station_id, stats_dirty.c.year, stats_dirty.c.version)
+        ).all()
+        if not dirty:
+            return dirty, pd.DataFrame(columns=list(STATS_COLUMN_MAP))
+        if self._db_cfg.stats_engine == "accumulators":
+            log.info("Recomputing %d dirty station-years from accumulators", len(dirty))
+            pairs = {(s, y) for s, y, _ in dirty}
+            self._repair_accumulators(session, pairs)
+            accumulators = stats_accumulators.read_accumulators(session, pairs)
+            return dirty, stats_accumulators.statistics_from_accumulators(accumulators, session.dialect.name)
+
+        # Same expressions as _fetch_weather_data; the date range join lets the
+        # database range-scan unique_station_date instead of extracting years.
+        analysis_query = text("""
+            SELECT
+                d.station_id AS site_id,
+                d.year AS year,
+                AVG(w.max_temp)/10 AS mean_max_temp,
+                AVG(w.min_temp)/10 AS mean_min_temp,
+                SUM(w.precipitation)/100 AS total_precipitation
+            FROM stats_dirty d
+            JOIN weather_data w
+              ON w.station_id = d.station_id
+             AND w.date BETWEEN d.start_date AND d.end_date
+            GROUP BY d.station_id, d.year
+            ORDER BY 1, 2
+        """)
+        log.info("Recomputing %d dirty station-years", len(dirty))
+        return dirty, pd.read_sql(analysis_query, session)
+
+    @staticmethod
+    def _stats_records(metrics: pd.DataFrame) -> list:
+        """Maps aggregate output onto weather_stats columns with plain Python values"""
+        rows = metrics[list(STATS_COLUMN_MAP)].rename(columns=STATS_COLUMN_MAP)
+        rows = rows.astype({
+            'year': int, 'avg_max_temp': float, 'avg_min_temp': float, 'total_precipitation': float,
+        })
+        return rows.astype(object).where(rows.notna(), None).to_dict('records')
+
+    def _read_dirty_marks(self) -> list:
+        """(station_id, year, version) of every stats_dirty mark, read before a full regeneration reads its input"""
+        self._ensure_stats_tables()
+        with self._db_session() as session:
+            return session.execute(
+                select(stats_dirty.c.station_id, stats_dirty.c.year, stats_dirty.c.version)
+            ).all()
+
+    @staticmethod
+    def _clear_dirty_marks(session, dirty) -> None:
+        """Deletes the given marks unless they were re-marked (their version changed) since they were read"""
+        if dirty:
+            session.execute(stats_dirty.delete().where(
+                tuple_(stats_dirty.c.station_id, stats_dirty.c.year, stats_dirty.c.version).in_(
+                    [tuple(row) for row in dirty]
+                )
+            ))
+
+    def _save_weather_stats(self, metrics: pd.DataFrame, dirty=()) -> None:
+        """
+        Persist calculated statistics to database.
+
+        Rows are replaced inside one transaction instead of dropping the table, so
+        the WeatherStats constraints survive and readers never see it empty. The
+        dirty marks read before the statistics were computed are covered by them
+        and cleared in the same transaction.
+        """
         if metrics.empty:
             log.warning("No statistics available for storage")
             return
@@ -62,27 +256,76 @@ class MeteorologicalProcessor:
         log.info("Storing %d weather metrics in %s", 
                 len(metrics), self._db_cfg.results_table)
         try:
-            with self._db_session() as session:
-                metrics.to_sql(
-                    name=self._db_cfg.results_table,
-                    con=session,
-                    if_exists='replace',
-                    index=False,
-                    method='multi'
-                )
+            self._ensure_stats_tables()
+            with self._db_transaction() as session:
+                session.execute(weather_stats.delete())
+                session.execute(weather_stats.insert(), self._stats_records(metrics))
+                if self._db_cfg.rollups:
+                    weather_rollups.refresh_rollups(session)
+                if self._db_cfg.sketches:
+                    weather_sketches.refresh_sketches(session)
+                if self._db_cfg.normals:
+                    weather_climatology.refresh_normals(session)
+                self._clear_dirty_marks(session, dirty)
+                bump_data_version(session)
             log.info("Weather metrics committed successfully")
         except DatabaseError as db_err:
             log.error("Metrics storage failed: %s", db_err)
             raise
 
+    def refresh_statistics(self) -> int:
+        """
+        Recompute and upsert only the station-years marked dirty by ingestion,
+        along with the rollup cells, sketches and normals they feed.
+
+        Everything happens in one transaction; dirty marks are cleared only if
+        their version did not change while the refresh was running.
+
+        Returns:
+            int: Number of station-years refreshed
+        """
+        log.info("Initiating incremental meteorological analysis")
+        self._ensure_stats_tables()
+        with self._db_transaction() as session:
+            dirty, metrics = self._fetch_dirty_weather_data(session)
+            if not dirty:
+                log.info("No dirty station-years, statistics are current")
+                return 0
+
+            if not metrics.empty:
+                session.execute(
+                    upsert(weather_stats, session.dialect.name, ['station_id', 'year'],
+                           ['avg_max_temp', 'avg_min_temp', 'total_precipitation']),
+                    self._stats_records(metrics),
+                )
+            present = set(zip(metrics['site_id'], metrics['year'].astype(int)))
+            vanished = [(s, y) for s, y, _ in dirty if (s, y) not in present]
+            if vanished:
+                session.execute(weather_stats.delete().where(
+                    tuple_(weather_stats.c.station_id, weather_stats.c.year).in_(vanished)
+                ))
+            if self._db_cfg.rollups:
+                weather_rollups.refresh_rollups(session, [(s, y) for s, y, _ in dirty])
+            if self._db_cfg.sketches:
+                weather_sketches.refresh_sketches(session, [(s, y) for s, y, _ in dirty])
+            if self._db_cfg.normals:
+                weather_climatology.refresh_normals(
+                    session, weather_climatology.base_period_stations((s, y) for s, y, _ in dirty)
+                )
+            self._clear_dirty_marks(session, dirty)
+            bump_data_version(session)
+        log.info("Refreshed %d station-years", len(dirty))
+        return len(dirty)
+
     def generate_statistics(self) -> None:
         """Execute complete statistics generation workflow"""
         try:
             log.info("Initiating meteorological analysis")
-            observations = self._fetch_weather_data()
+            dirty = self._read_dirty_marks()
+            observations = self._compute_statistics()
             
             if not observations.empty:
-                self._save_weather_stats(observations)
+                self._save_weather_stats(observations, dirty)
                 log.info("Analysis process completed")
             else:
                 log.warning("No observational data available")
@@ -91,6 +334,11 @@ class MeteorologicalProcessor:
             log.error("Processing failure: %s", analysis_error)
             raise
 
+def _optional_flag(name: str) -> Optional[bool]:
+    """true/false environment setting, None when unset"""
+    value = os.getenv(name)
+    return None if value is None else value.lower() == 'true'
+
 def main():
     """Entry point for weather analysis system"""
     load_dotenv(find_dotenv(usecwd=True))
@@ -102,12 +350,23 @@ def main():
     
     config = DbConfig(
         connection_string=db_uri,
-        results_table="weather_stats"
+        results_table="weather_stats",
+        refresh_mode=os.getenv('STATS_REFRESH_MODE', 'full'),
+        stats_engine=os.getenv('STATS_ENGINE', 'sql'),
+        data_source=os.getenv('STATS_DATA_SOURCE', 'database'),
+        source_path=os.getenv('STATS_SOURCE_PATH', './wx_data'),
+        workers=vectorized_stats.default_workers(),
+        rollups=_optional_flag('STATS_ROLLUPS'),
+        sketches=_optional_flag('STATS_SKETCHES'),
+        normals=_optional_flag('STATS_NORMALS'),
     )
     
     try:
         processor = MeteorologicalProcessor(config)
-        processor.generate_statistics()
+        if config.refresh_mode == 'incremental':
+            processor.refresh_statistics()
+        else:
+            processor.generate_statistics()
     except KeyboardInterrupt:
         log.info("Processing halted by user")
     except Exception as fatal_error:
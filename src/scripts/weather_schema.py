@@ -0,0 +1,255 @@
+from datetime import date
+from sqlalchemy import (
+    MetaData, Table, Column, Integer, BigInteger, Float, String, Date, LargeBinary,
+    UniqueConstraint, Index,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+
+# Daily maximum (tenths of a degree Celsius) at or above which a day counts as a heat day
+HEAT_DAY_MAX_TEMP = 300
+
+# Core mirrors of the tables used by the batch scripts. The scripts run without a
+# Flask app context, so they cannot use the db.Model classes in app.models; keep the
+# definitions here in sync with those models.
+metadata = MetaData()
+
+weather_data = Table(
+    "weather_data",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("station_id", String(50), nullable=False),
+    Column("date", Date, nullable=False),
+    Column("max_temp", Integer),        # In tenths of a degree Celsius
+    Column("min_temp", Integer),        # In tenths of a degree Celsius
+    Column("precipitation", Integer),   # In tenths of a millimeter
+    UniqueConstraint("station_id", "date", name="unique_station_date"),
+    # Date-first lookups (all stations on a day, year ranges) cannot use the
+    # station-first unique index
+    Index("ix_weather_data_date_station", "date", "station_id"),
+)
+
+# One row per ingested station file, used to skip unchanged files and to load
+# only the appended tail of files that grew since the previous run.
+ingest_manifest = Table(
+    "ingest_manifest",
+    metadata,
+    Column("path", String(512), primary_key=True),
+    Column("station_id", String(50), nullable=False),
+    Column("size_bytes", BigInteger, nullable=False),
+    Column("mtime", Float, nullable=False),
+    Column("content_hash", String(64), nullable=False),  # sha256 hex digest
+    Column("last_date", Date),
+)
+
+weather_stats = Table(
+    "weather_stats",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("station_id", String(50), nullable=False),
+    Column("year", Integer, nullable=False),
+    Column("avg_max_temp", Float),          # In degrees Celsius
+    Column("avg_min_temp", Float),          # In degrees Celsius
+    Column("total_precipitation", Float),   # In centimeters
+    UniqueConstraint("station_id", "year", name="unique_station_year"),
+    Index("ix_weather_stats_year", "year"),
+)
+
+# Yearly US corn grain yield from yld_data (one row per year)
+yield_data = Table(
+    "yield_data",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("year", Integer, nullable=False),
+    Column("total_yield", BigInteger, nullable=False),    # In 1000s of megatons, as published
+    UniqueConstraint("year", name="unique_yield_year"),
+)
+
+# Additive aggregates (sums and counts, so finer grains roll up into coarser ones)
+# at the grains listed in scripts.weather_rollups.STORED_GRAINS. region is the
+# station id, the state code or "ALL"; period is the month (1-12), the season
+# (1=DJF .. 4=SON, with December counted in the following year) or 0 for a year.
+weather_rollup = Table(
+    "weather_rollup",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("grain", String(20), nullable=False),
+    Column("region", String(50), nullable=False),
+    Column("state", String(2)),
+    Column("year", Integer, nullable=False),
+    Column("period", Integer, nullable=False),
+    Column("observed_days", Integer, nullable=False),
+    Column("max_temp_sum", BigInteger, nullable=False),     # In tenths of a degree Celsius
+    Column("max_temp_count", Integer, nullable=False),
+    Column("heat_days", Integer, nullable=False, server_default="0"),  # Days with max_temp >= HEAT_DAY_MAX_TEMP
+    Column("min_temp_sum", BigInteger, nullable=False),     # In tenths of a degree Celsius
+    Column("min_temp_count", Integer, nullable=False),
+    Column("precipitation_sum", BigInteger, nullable=False),  # In tenths of a millimeter
+    Column("precipitation_count", Integer, nullable=False),
+    UniqueConstraint("grain", "region", "year", "period", name="unique_rollup_cell"),
+    Index("ix_weather_rollup_grain_year", "grain", "year"),
+)
+
+# Mergeable per-station-year distribution of one measure, maintained by
+# scripts.weather_sketches alongside weather_stats. Measurements are integer tenths,
+# so the sketch is the exact histogram: distinct values and their day counts as
+# little-endian int32 arrays, zlib compressed. Merging adds counts per value.
+weather_sketch = Table(
+    "weather_sketch",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("station_id", String(50), nullable=False),
+    Column("state", String(2)),
+    Column("year", Integer, nullable=False),
+    Column("measure", String(20), nullable=False),     # max_temp, min_temp or precipitation
+    Column("observations", Integer, nullable=False),   # Non-missing days
+    Column("sketch", LargeBinary, nullable=False),
+    UniqueConstraint("station_id", "year", "measure", name="unique_sketch"),
+    Index("ix_weather_sketch_measure_year", "measure", "year"),
+)
+
+# Smoothed day-of-year normals per station over the climatology base period, built by
+# scripts.weather_climatology. day_of_year counts on a leap-year calendar (Feb 29 is
+# day 60, Dec 31 is day 366) so every date maps to one row. Means and standard
+# deviations are in tenths, like weather_data; counts are the days pooled into them.
+weather_normals = Table(
+    "weather_normals",
+    metadata,
+    Column("station_id", String(50), primary_key=True),
+    Column("day_of_year", Integer, primary_key=True),
+    Column("max_temp_mean", Float), Column("max_temp_std", Float),
+    Column("max_temp_count", Integer, nullable=False),
+    Column("min_temp_mean", Float), Column("min_temp_std", Float),
+    Column("min_temp_count", Integer, nullable=False),
+    Column("precipitation_mean", Float), Column("precipitation_std", Float),
+    Column("precipitation_count", Integer, nullable=False),
+)
+
+# Running per-station-year totals kept by WeatherInfoLoader(accumulate=True) while it
+# parses, so weather_stats can be derived without scanning weather_data again. All
+# columns are sums or counts, so batches merge by addition.
+station_year_accumulators = Table(
+    "station_year_accumulators",
+    metadata,
+    Column("station_id", String(50), primary_key=True),
+    Column("year", Integer, primary_key=True),
+    Column("observed_days", Integer, nullable=False),
+    Column("max_temp_sum", BigInteger, nullable=False),     # In tenths of a degree Celsius
+    Column("max_temp_count", Integer, nullable=False),
+    Column("min_temp_sum", BigInteger, nullable=False),     # In tenths of a degree Celsius
+    Column("min_temp_count", Integer, nullable=False),
+    Column("precipitation_sum", BigInteger, nullable=False),  # In tenths of a millimeter
+    Column("precipitation_count", Integer, nullable=False),
+)
+
+# (station_id, year) pairs that received weather_data rows without accumulate, so
+# their station_year_accumulators miss those rows until
+# scripts.stats_accumulators.build_accumulators rebuilds (and unmarks) them.
+accumulator_gaps = Table(
+    "accumulator_gaps",
+    metadata,
+    Column("station_id", String(50), primary_key=True),
+    Column("year", Integer, primary_key=True),
+)
+
+# (station_id, year) pairs whose weather_data rows changed since the last statistics
+# refresh. start_date/end_date bound the year so the refresh can range-scan
+# unique_station_date; version is bumped on every re-mark so a refresh only clears
+# the marks it actually processed.
+stats_dirty = Table(
+    "stats_dirty",
+    metadata,
+    Column("station_id", String(50), primary_key=True),
+    Column("year", Integer, primary_key=True),
+    Column("start_date", Date, nullable=False),
+    Column("end_date", Date, nullable=False),
+    Column("version", Integer, nullable=False, default=1),
+)
+
+
+# Single-row counter bumped whenever weather_data or weather_stats change; the API
+# uses it to invalidate cached responses and to build ETags.
+data_version = Table(
+    "data_version",
+    metadata,
+    Column("id", Integer, primary_key=True),
+    Column("version", BigInteger, nullable=False),
+)
+
+
+def dirty_station_years(frame) -> set:
+    """(station_id, year) pairs touched by a frame with station_id and date columns"""
+    years = frame["date"].dt.year
+    return set(zip(frame["station_id"].astype(str), years.astype(int)))
+
+
+def _dialect_insert(table: Table, dialect_name: str):
+    dialect = {"postgresql": postgresql, "sqlite": sqlite}.get(dialect_name)
+    if dialect is None:
+        raise NotImplementedError(f"Upserts are not supported for {dialect_name}")
+    return dialect.insert(table)
+
+
+def upsert(table: Table, dialect_name: str, key_columns: list, update_columns: list, add: bool = False):
+    """
+    INSERT ... ON CONFLICT (key_columns) DO UPDATE for PostgreSQL and SQLite.
+
+    :param add: Add the new values to the stored ones instead of overwriting them
+    """
+    stmt = _dialect_insert(table, dialect_name)
+    return stmt.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={
+            c: table.c[c] + stmt.excluded[c] if add else stmt.excluded[c]
+            for c in update_columns
+        },
+    )
+
+
+def mark_stats_dirty(db_session, pairs) -> None:
+    """Flags (station_id, year) pairs for the next incremental statistics refresh"""
+    if not pairs:
+        return
+    stmt = _dialect_insert(stats_dirty, db_session.dialect.name)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["station_id", "year"],
+        set_={"version": stats_dirty.c.version + 1},
+    )
+    db_session.execute(stmt, [
+        {
+            "station_id": station_id,
+            "year": year,
+            "start_date": date(year, 1, 1),
+            "end_date": date(year, 12, 31),
+            "version": 1,
+        }
+        for station_id, year in sorted(pairs)
+    ])
+
+
+def bump_data_version(db_session) -> None:
+    """Increments the data_version counter inside the caller's transaction"""
+    stmt = _dialect_insert(data_version, db_session.dialect.name)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={"version": data_version.c.version + 1},
+    )
+    db_session.execute(stmt, {"id": 1, "version": 1})
+
+
+def mark_accumulator_gaps(db_session, pairs) -> None:
+    """Records (station_id, year) pairs loaded without accumulate (see accumulator_gaps)"""
+    if not pairs:
+        return
+    stmt = _dialect_insert(accumulator_gaps, db_session.dialect.name)
+    db_session.execute(
+        stmt.on_conflict_do_nothing(index_elements=["station_id", "year"]),
+        [{"station_id": station_id, "year": int(year)} for station_id, year in sorted(pairs)],
+    )
+
+
+def record_weather_changes(db_session, pairs) -> None:
+    """Marks changed station-years for the stats refresh and bumps the data version"""
+    if not pairs:
+        return
+    mark_stats_dirty(db_session, pairs)
+    bump_data_version(db_session)
@@ -0,0 +1,26 @@
+import pytest
+from app import create_app, db
+
+
+@pytest.fixture
+def app_config():
+    """Config overrides of the app fixture; test modules override this fixture to change them."""
+    return {"CACHE_ENABLED": False}
+
+
+@pytest.fixture
+def app(app_config):
+    """
+    Flask application backed by an in-memory SQLite database, with its tables
+    created and an app context pushed. Test modules seed their rows with a
+    fixture of their own that depends on this one.
+    """
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://", **app_config})
+    with app.app_context():
+        db.create_all()
+        yield app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
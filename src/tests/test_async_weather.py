@@ -0,0 +1,81 @@
+import pytest
+from datetime import date
+
+pytest.importorskip("starlette")
+pytest.importorskip("aiosqlite")
+pytest.importorskip("httpx")  # Starlette's TestClient
+
+from starlette.testclient import TestClient
+from app import create_app, db
+from app.asgi import create_asgi_app
+from app.models.weather_data import WeatherData
+from app.models.weather_stats import WeatherStats
+from app.services.async_db import async_database_url
+
+
+@pytest.fixture
+def client(tmp_path):
+    """ASGI app over a SQLite file seeded through the Flask app."""
+    uri = f"sqlite:///{tmp_path}/weather.db"
+    flask_app = create_app({"SQLALCHEMY_DATABASE_URI": uri})
+    with flask_app.app_context():
+        db.create_all()
+        for station_id in ("STN001", "STN002"):
+            db.session.add_all([
+                WeatherData(station_id=station_id, date=date(2023, 1, day), max_temp=300, min_temp=150, precipitation=20)
+                for day in range(1, 4)
+            ])
+            db.session.add(WeatherStats(station_id=station_id, year=2023, avg_max_temp=30.0,
+                                        avg_min_temp=15.0, total_precipitation=0.6))
+        db.session.commit()
+    with TestClient(create_asgi_app({"SQLALCHEMY_DATABASE_URI": uri, "ASYNC_MAX_ROWS_PER_STATION": 2})) as client:
+        yield client
+
+def test_async_database_url_swaps_in_async_drivers():
+    assert async_database_url("postgresql://u:p@db/weather").drivername == "postgresql+asyncpg"
+    assert async_database_url("sqlite:///weather.db").drivername == "sqlite+aiosqlite"
+    with pytest.raises(ValueError):
+        async_database_url("mysql://u:p@db/weather")
+
+def test_weather_data_matches_sync_api(client):
+    response = client.get('/api/weather/?station_id=STN001&per_page=1')
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"station_id": "STN001", "date": "2023-01-01", "max_temp": 30.0, "min_temp": 15.0, "precipitation": 2.0}
+    ]
+
+def test_weather_data_keyset_pages(client):
+    first = client.get('/api/weather/?station_id=STN001&per_page=2&cursor=&include_total=true').json()
+    second = client.get(f'/api/weather/?station_id=STN001&per_page=2&cursor={first["next_cursor"]}').json()
+
+    assert first["total"] == 3
+    assert [row["date"] for row in first["items"] + second["items"]] == ["2023-01-01", "2023-01-02", "2023-01-03"]
+    assert second["next_cursor"] is None
+
+def test_weather_data_requires_a_filter(client):
+    response = client.get('/api/weather/')
+
+    assert response.status_code == 400
+    assert response.json() == {"error": "At least one of station_id or date is required."}
+
+def test_statistics(client):
+    response = client.get('/api/weather/statistics?year=2023')
+
+    assert [row["station_id"] for row in response.json()] == ["STN001", "STN002"]
+
+def test_stations_fans_out_per_station(client):
+    response = client.get('/api/weather/stations?station_ids=STN002,STN001,UNKNOWN&start_date=2023-01-01')
+
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert [item["station_id"] for item in items] == ["STN002", "STN001", "UNKNOWN"]
+    assert [row["date"] for row in items[0]["data"]] == ["2023-01-01", "2023-01-02"]
+    assert items[0]["truncated"] is True
+    assert items[0]["statistics"][0]["year"] == 2023
+    assert items[2] == {"station_id": "UNKNOWN", "data": [], "truncated": False, "statistics": []}
+
+def test_stations_rejects_bad_dates(client):
+    response = client.get('/api/weather/stations?station_ids=STN001&start_date=01/01/2023')
+
+    assert response.status_code == 400
@@ -0,0 +1,44 @@
+import pytest
+from datetime import date
+from app import db
+from app.models.weather_data import WeatherData
+from app.models.weather_stats import WeatherStats
+
+
+@pytest.fixture
+def app_config():
+    return {"BATCH_MAX_KEYS": 3}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """Daily rows for two stations and one yearly statistic."""
+    db.session.add_all([
+        WeatherData(station_id="STN001", date=date(2023, 1, 1), max_temp=300, min_temp=150, precipitation=20),
+        WeatherData(station_id="STN002", date=date(2023, 1, 1), max_temp=310, min_temp=160, precipitation=25),
+        WeatherStats(station_id="STN001", year=2023, avg_max_temp=30.5, avg_min_temp=15.5, total_precipitation=4.5),
+    ])
+    db.session.commit()
+
+
+def test_batch_resolves_keys_in_request_order(client):
+    keys = [
+        {"station_id": "STN002", "date": "2023-01-01"},
+        {"station_id": "STN001", "year": 2023},
+        {"station_id": "STN001", "date": "2023-01-02"},
+    ]
+    response = client.post('/api/weather/batch', json={"keys": keys})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["key"] for r in results] == keys
+    assert results[0]["data"]["max_temp"] == 31.0
+    assert results[1]["data"]["avg_max_temp"] == 30.5
+    assert results[2]["data"] is None
+
+def test_batch_rejects_malformed_and_oversized_requests(client):
+    assert client.post('/api/weather/batch', json={"keys": [{"station_id": "STN001"}]}).status_code == 400
+    assert client.post('/api/weather/batch', json={"keys": [{"station_id": "STN001", "date": "2023-13-01"}]}).status_code == 400
+    response = client.post('/api/weather/batch', json={"keys": [{"station_id": "STN001", "year": 2023}] * 4})
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "At most 3 keys are allowed per request."
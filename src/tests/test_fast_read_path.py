@@ -0,0 +1,39 @@
+import json
+import pytest
+from datetime import date
+from app import db
+from app.models.weather_data import WeatherData
+from app.models.weather_stats import WeatherStats
+from app.services import json_provider
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """One station with a fully observed and a fully missing day."""
+    db.session.add_all([
+        WeatherData(station_id="STN001", date=date(2023, 1, 1), max_temp=0, min_temp=-15, precipitation=0),
+        WeatherData(station_id="STN001", date=date(2023, 1, 2), max_temp=None, min_temp=None, precipitation=None),
+        WeatherStats(station_id="STN001", year=2023, avg_max_temp=0.0, avg_min_temp=-1.5, total_precipitation=0.0),
+    ])
+    db.session.commit()
+
+
+def test_zero_readings_are_not_reported_as_missing(client):
+    rows = client.get('/api/weather/?station_id=STN001').get_json()
+
+    assert rows == [
+        {"station_id": "STN001", "date": "2023-01-01", "max_temp": 0.0, "min_temp": -1.5, "precipitation": 0.0},
+        {"station_id": "STN001", "date": "2023-01-02", "max_temp": None, "min_temp": None, "precipitation": None},
+    ]
+    stats = client.get('/api/weather/statistics?station_id=STN001').get_json()
+    assert stats == [{"station_id": "STN001", "year": 2023, "avg_max_temp": 0.0,
+                      "avg_min_temp": -1.5, "total_precipitation": 0.0}]
+
+@pytest.mark.skipif(json_provider.orjson is None, reason="orjson is not installed")
+def test_fast_provider_matches_the_default_encoding(app):
+    payload = {"b": [1, 0.5, None, "STN001"], "a": {"z": True, "y": "2023-01-01"}}
+
+    encoded = app.json.dumps(payload)
+
+    assert json.loads(encoded) == payload
+    assert encoded == json.dumps(payload, sort_keys=True, separators=(",", ":"))
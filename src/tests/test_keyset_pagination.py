@@ -0,0 +1,44 @@
+import pytest
+from datetime import date, timedelta
+from app import db
+from app.models.weather_data import WeatherData
+from app.controllers.weather_analytics_controller import WeatherAnalyticsController
+
+
+@pytest.fixture
+def app_config():
+    return {}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """Three days for each of two stations, inserted out of key order."""
+    start = date(2023, 1, 1)
+    db.session.add_all([
+        WeatherData(station_id=station, date=start + timedelta(days=day), max_temp=day, min_temp=0, precipitation=0)
+        for station in ("STN002", "STN001")
+        for day in range(3)
+    ])
+    db.session.commit()
+
+def test_keyset_pages_walk_the_table_in_key_order(app):
+    seen, cursor = [], ""
+    while cursor is not None:
+        page = WeatherAnalyticsController.fetch_weather_data_for_date(station_id=None, date=None, per_page=4, cursor=cursor)
+        seen.extend((row["station_id"], row["date"]) for row in page["items"])
+        cursor = page["next_cursor"]
+        assert "total" not in page
+
+    assert seen == sorted(seen)
+    assert len(seen) == 6
+
+def test_keyset_total_only_when_requested(app):
+    page = WeatherAnalyticsController.fetch_weather_data_for_date(station_id="STN001", per_page=2, cursor="", include_total=True)
+    assert page["total"] == 3
+    assert [row["date"] for row in page["items"]] == ["2023-01-01", "2023-01-02"]
+
+def test_invalid_cursor_is_rejected(app):
+    client = app.test_client()
+    response = client.get('/api/weather/?station_id=STN001&cursor=not-a-cursor')
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Invalid cursor"
@@ -0,0 +1,166 @@
+import pytest
+from datetime import date, timedelta
+from sqlalchemy.exc import OperationalError
+from app import db
+from app.controllers.weather_analytics_controller import WeatherAnalyticsController
+from app.models.data_version import DataVersion
+from app.models.weather_data import WeatherData
+from app.models.weather_stats import WeatherStats
+from app.services.memory_store import WeatherSnapshot
+
+
+@pytest.fixture
+def app_config():
+    return {"CACHE_ENABLED": False, "MEMORY_STORE_ENABLED": True}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """Twelve days and three yearly statistics for each of three stations."""
+    db.session.add(DataVersion(id=1, version=1))
+    for station_id in ("STN002", "STN001", "STN003"):
+        db.session.add_all([
+            WeatherData(station_id=station_id, date=date(1999, 12, 25) + timedelta(days=i),
+                        max_temp=200 + i, min_temp=None if i % 3 else -50 - i, precipitation=i * 7)
+            for i in range(12)
+        ])
+        db.session.add_all([
+            WeatherStats(station_id=station_id, year=year, avg_max_temp=20.5,
+                         avg_min_temp=None if year == 2000 else 4.25, total_precipitation=year / 100)
+            for year in (1999, 2000, 2001)
+        ])
+    db.session.commit()
+
+
+def _both(app, method, *args, **kwargs):
+    """(memory store result, database result) of a controller read"""
+    memory = getattr(WeatherAnalyticsController, method)(*args, **kwargs)
+    store, app.extensions["memory_store"] = app.extensions["memory_store"], None
+    try:
+        return memory, getattr(WeatherAnalyticsController, method)(*args, **kwargs)
+    finally:
+        app.extensions["memory_store"] = store
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"station_id": "STN001"},
+    {"station_id": "STN002", "page": 2, "per_page": 5},
+    {"start_date": "1999-12-31", "end_date": "2000-01-02", "per_page": 50},
+    {"station_id": "STN003", "start_date": "2000-01-03"},
+    {"station_id": "STN999"},
+    {"end_date": "1999-12-26", "cursor": "", "per_page": 2, "include_total": True},
+    {"start_date": "2000-01-01", "cursor": "", "per_page": 100},
+    {"date": "2000-01-01", "start_date": "2001-01-01"},
+    {"date": "2000-01-01", "start_date": "1999-12-30", "end_date": "2000-01-02"},
+    {"station_id": "STN001", "date": "2000-01-01", "end_date": "1999-12-31"},
+])
+def test_weather_data_matches_the_database(app, kwargs):
+    with app.app_context():
+        memory, database = _both(app, "fetch_weather_data_for_date", **kwargs)
+
+    assert memory == database
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"station_id": "STN001"},
+    {"year": 2000},
+    {"per_page": 4, "page": 2},
+    {"cursor": "", "per_page": 4, "include_total": True},
+    {"station_id": "STN002", "year": 1990},
+])
+def test_statistics_match_the_database(app, kwargs):
+    with app.app_context():
+        memory, database = _both(app, "fetch_aggregated_weather_statistics", **kwargs)
+
+    assert memory == database
+
+
+def test_keyset_pages_walk_across_stations(app):
+    with app.app_context():
+        seen, cursor = [], ""
+        while cursor is not None:
+            page = WeatherAnalyticsController.fetch_weather_data_for_date(
+                start_date="2000-01-04", cursor=cursor, per_page=4
+            )
+            seen.extend((row["station_id"], row["date"]) for row in page["items"])
+            cursor = page["next_cursor"]
+
+    assert seen == sorted(
+        (station_id, (date(2000, 1, 4) + timedelta(days=i)).isoformat())
+        for station_id in ("STN001", "STN002", "STN003") for i in range(2)
+    )
+
+
+def test_single_date_lookup(app):
+    with app.app_context():
+        rows = WeatherAnalyticsController.fetch_weather_data_for_date(date="2000-01-01")
+
+    assert [(row["station_id"], row["max_temp"], row["min_temp"]) for row in rows] == [
+        ("STN001", 20.7, None), ("STN002", 20.7, None), ("STN003", 20.7, None),
+    ]
+
+
+def test_malformed_cursor_and_out_of_range_page(app):
+    client = app.test_client()
+
+    assert client.get("/api/weather/?station_id=STN001&cursor=bogus").status_code == 400
+    assert client.get("/api/weather/?station_id=STN001&page=9").status_code == 404
+
+
+def test_snapshot_is_swapped_after_a_data_change(app):
+    with app.app_context():
+        store = app.extensions["memory_store"]
+        assert WeatherAnalyticsController.fetch_weather_data_for_date(station_id="STN004") == []
+
+        db.session.add(WeatherData(station_id="STN004", date=date(2000, 1, 1), max_temp=1, min_temp=2, precipitation=3))
+        db.session.get(DataVersion, 1).version = 2
+        db.session.commit()
+
+        # The database answers while the new snapshot loads in the background
+        assert WeatherAnalyticsController.fetch_weather_data_for_date(station_id="STN004") != []
+        store.wait_for_reload()
+        assert store.snapshot().version == 2
+        rows = WeatherAnalyticsController.fetch_weather_data_for_date(station_id="STN004")
+
+    assert rows == [{"station_id": "STN004", "date": "2000-01-01", "max_temp": 0.1, "min_temp": 0.2,
+                     "precipitation": 0.3}]
+
+
+@pytest.mark.parametrize("app_config", [
+    {"CACHE_ENABLED": True, "CACHE_VERSION_CHECK_SECONDS": 0, "MEMORY_STORE_ENABLED": True},
+])
+def test_cached_responses_never_hold_a_stale_snapshot(app, client):
+    url = "/api/weather/?station_id=STN001&per_page=1"
+    assert client.get(url).get_json()[0]["max_temp"] == 20.0
+
+    db.session.query(WeatherData).filter_by(station_id="STN001", date=date(1999, 12, 25)).update({"max_temp": 555})
+    db.session.get(DataVersion, 1).version = 2
+    db.session.commit()
+
+    behind = client.get(url)
+    app.extensions["memory_store"].wait_for_reload()
+    reloaded = client.get(url)
+
+    for response in (behind, reloaded):
+        assert response.headers["ETag"].startswith('"2-')
+        assert response.get_json()[0]["max_temp"] == 55.5
+
+
+def test_failed_reloads_back_off(app, monkeypatch):
+    store = app.extensions["memory_store"]
+    with app.app_context():
+        store.snapshot()
+        attempts = []
+
+        def failing_load():
+            attempts.append(1)
+            raise OperationalError("SELECT", {}, Exception("database is down"))
+
+        monkeypatch.setattr(WeatherSnapshot, "load", failing_load)
+        db.session.get(DataVersion, 1).version = 2
+        db.session.commit()
+        for _ in range(3):
+            WeatherAnalyticsController.fetch_weather_data_for_date(station_id="STN001")
+            store.wait_for_reload()
+
+    assert len(attempts) == 1
@@ -0,0 +1,58 @@
+import logging
+import os
+import pytest
+from datetime import date
+from app import db
+from app.models.weather_data import WeatherData
+from app.services.metrics import Histogram
+
+
+@pytest.fixture
+def app_config():
+    return {"CACHE_ENABLED": False, "SLOW_QUERY_SECONDS": 0.0}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """A single daily row to query."""
+    db.session.add(WeatherData(station_id="STN001", date=date(2023, 1, 1), max_temp=300, min_temp=150, precipitation=20))
+    db.session.commit()
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency.", ("endpoint",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, endpoint="/a")
+    histogram.observe(0.5, endpoint="/a")
+    histogram.observe(5, endpoint="/a")
+
+    assert histogram.render() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{endpoint="/a",le="0.1"} 1',
+        'latency_seconds_bucket{endpoint="/a",le="1.0"} 2',
+        'latency_seconds_bucket{endpoint="/a",le="+Inf"} 3',
+        'latency_seconds_sum{endpoint="/a"} 5.55',
+        'latency_seconds_count{endpoint="/a"} 3',
+    ]
+
+def test_metrics_endpoint_reports_requests_sql_and_serialization(client):
+    assert client.get('/api/weather/?station_id=STN001').status_code == 200
+
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    body = response.get_data(as_text=True)
+    worker = f'worker="{os.getpid()}"'
+    assert f'weather_api_request_duration_seconds_count{{endpoint="/api/weather/",method="GET",status="200",{worker}}} 1' in body
+    assert f'weather_api_request_sql_statements_count{{endpoint="/api/weather/",{worker}}} 1' in body
+    assert f'weather_api_request_serialization_seconds_count{{endpoint="/api/weather/",{worker}}} 1' in body
+    assert f'weather_api_sql_statement_duration_seconds_count{{operation="SELECT",{worker}}}' in body
+    assert f"weather_api_pool_checkout_wait_seconds_count{{{worker}}}" in body
+
+def test_slow_queries_are_logged_with_parameters(client, caplog):
+    with caplog.at_level(logging.WARNING, logger="app.sql.slow"):
+        client.get('/api/weather/?station_id=STN001')
+
+    slow = [record.getMessage() for record in caplog.records if record.name == "app.sql.slow"]
+    assert any("FROM weather_data" in message and "'STN001'" in message for message in slow)
@@ -0,0 +1,67 @@
+import pytest
+from unittest.mock import patch
+from app import db
+from app.models.data_version import DataVersion
+from app.services.response_cache import LRUCache
+
+mock_weather_stats = [
+    {
+        "station_id": "STN001",
+        "year": 2025,
+        "avg_max_temp": 28.5,
+        "avg_min_temp": 20.5,
+        "total_precipitation": 120.0
+    }
+]
+
+@pytest.fixture
+def app_config():
+    return {"CACHE_VERSION_CHECK_SECONDS": 0}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """The data_version row the cache keys on."""
+    db.session.add(DataVersion(id=1, version=1))
+    db.session.commit()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    cache.get("a")
+    cache.set("c", b"3")
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+
+def test_lru_cache_expires_entries():
+    cache = LRUCache(max_entries=2, ttl_seconds=-1)
+    cache.set("a", b"1")
+    assert cache.get("a") is None
+
+def test_statistics_are_cached_until_data_version_changes(app, client):
+    """Repeated queries are served from cache; bumping data_version invalidates them."""
+    target = "app.controllers.weather_analytics_controller.WeatherAnalyticsController.fetch_aggregated_weather_statistics"
+    with patch(target) as mock_method:
+        mock_method.return_value = mock_weather_stats
+
+        first = client.get('/api/weather/statistics?station_id=STN001&year=2025')
+        second = client.get('/api/weather/statistics?year=2025&station_id=STN001&page=1')
+        assert first.get_json() == second.get_json() == mock_weather_stats
+        assert mock_method.call_count == 1
+
+        not_modified = client.get('/api/weather/statistics?station_id=STN001&year=2025',
+                                  headers={"If-None-Match": first.headers["ETag"]})
+        assert not_modified.status_code == 304
+
+        with app.app_context():
+            db.session.get(DataVersion, 1).version = 2
+            db.session.commit()
+
+        refreshed = client.get('/api/weather/statistics?station_id=STN001&year=2025',
+                               headers={"If-None-Match": first.headers["ETag"]})
+        assert refreshed.status_code == 200
+        assert refreshed.headers["ETag"] != first.headers["ETag"]
+        assert mock_method.call_count == 2
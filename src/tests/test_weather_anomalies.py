@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+from datetime import date
+from app import db
+from app.models.weather_data import WeatherData
+from scripts.weather_climatology import day_of_year, refresh_normals, station_normals
+
+JULY_MAX_TEMPS = [300, 310, 290, 320, 280, 300]
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """July days in and after the base period and the normals built from them."""
+    db.session.add_all([
+        WeatherData(station_id="STN001", date=date(1985 + i, 7, 1), max_temp=t, min_temp=None, precipitation=0)
+        for i, t in enumerate(JULY_MAX_TEMPS)
+    ])
+    db.session.add_all([
+        # Outside the base period: observed but not part of the normals
+        WeatherData(station_id="STN001", date=date(2020, 7, 1), max_temp=350, min_temp=150, precipitation=40),
+        WeatherData(station_id="STN002", date=date(2020, 7, 1), max_temp=200, min_temp=100, precipitation=0),
+    ])
+    db.session.commit()
+    refresh_normals(db.session.connection())
+    db.session.commit()
+
+
+def test_day_of_year_uses_a_leap_year_calendar():
+    assert day_of_year(2, 29) == 60
+    assert day_of_year(3, 1) == 61
+    assert day_of_year(12, 31) == 366
+
+def test_smoothing_pools_neighbouring_days_across_the_year_end():
+    moments = pd.DataFrame({
+        "station_id": "STN001", "day_of_year": [1, 366],
+        **{f"{m}_count": [1, 1] for m in ("max_temp", "min_temp", "precipitation")},
+        **{f"{m}_sum": [10, 30] for m in ("max_temp", "min_temp", "precipitation")},
+        **{f"{m}_squares": [100, 900] for m in ("max_temp", "min_temp", "precipitation")},
+    })
+
+    normals = station_normals(moments, half_window=1)
+
+    assert normals[0]["max_temp_mean"] == normals[365]["max_temp_mean"] == 20
+    assert normals[0]["max_temp_std"] == pytest.approx(np.std([10, 30], ddof=1))
+    assert normals[1]["max_temp_count"] == 1 and normals[1]["max_temp_std"] is None
+    assert normals[180]["max_temp_mean"] is None
+
+def test_anomalies_compare_observations_with_the_daily_normal(client):
+    response = client.get('/api/weather/anomalies?date=2020-07-01&station_id=STN001')
+
+    assert response.status_code == 200
+    [row] = response.get_json()
+    mean, std = np.mean(JULY_MAX_TEMPS), np.std(JULY_MAX_TEMPS, ddof=1)
+    assert row["day_of_year"] == day_of_year(7, 1)
+    assert row["max_temp"] == pytest.approx({
+        "value": 35.0, "normal": mean / 10, "std": std / 10,
+        "anomaly": (350 - mean) / 10, "z_score": (350 - mean) / std,
+    })
+    assert row["min_temp"] == {"value": 15.0, "normal": None, "std": None, "anomaly": None, "z_score": None}
+    assert row["precipitation"]["z_score"] is None  # Every July 1 was dry, so the spread is zero
+
+def test_stations_without_normals_are_still_reported(client):
+    rows = client.get('/api/weather/anomalies?date=2020-07-01').get_json()
+
+    assert [row["station_id"] for row in rows] == ["STN001", "STN002"]
+    assert rows[1]["max_temp"]["normal"] is None
+
+@pytest.mark.parametrize("query", ["", "date=07/01/2020"])
+def test_invalid_dates(client, query):
+    assert client.get(f'/api/weather/anomalies?{query}').status_code == 400
@@ -0,0 +1,91 @@
+import json
+import pytest
+from datetime import date
+
+pa = pytest.importorskip("pyarrow")
+
+from app import db
+from app.models.data_version import DataVersion
+from app.models.weather_data import WeatherData
+from app.models.weather_stats import WeatherStats
+from app.services import arrow_format
+
+ARROW = {"Accept": "application/vnd.apache.arrow.stream"}
+
+
+@pytest.fixture
+def app_config():
+    return {"EXPORT_FETCH_ROWS": 2}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """Three days and one yearly statistic for each of two stations."""
+    db.session.add(DataVersion(id=1, version=1))
+    for station_id in ("STN001", "STN002"):
+        db.session.add_all([
+            WeatherData(station_id=station_id, date=date(2023, 1, day), max_temp=300 + day,
+                        min_temp=None if day == 2 else 150, precipitation=20)
+            for day in range(1, 4)
+        ])
+        db.session.add(WeatherStats(station_id=station_id, year=2023, avg_max_temp=30.2,
+                                    avg_min_temp=None, total_precipitation=0.6))
+    db.session.commit()
+
+
+def _table(response):
+    return pa.ipc.open_stream(response.data).read_all()
+
+def test_weather_data_as_arrow_matches_json(client):
+    url = '/api/weather/?start_date=2023-01-01&per_page=10'
+    response = client.get(url, headers=ARROW)
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/vnd.apache.arrow.stream"
+    assert "Accept" in response.headers["Vary"]
+    table = _table(response)
+    assert table.schema.field("date").type == pa.date32()
+    assert table.column("min_temp").null_count == 2
+    rows = [{**row, "date": row["date"].isoformat()} for row in table.to_pylist()]
+    assert rows == client.get(url).get_json()
+
+def test_statistics_as_arrow(client):
+    table = _table(client.get('/api/weather/statistics?year=2023', headers=ARROW))
+
+    assert table.schema.field("year").type == pa.int32()
+    assert table.column("station_id").to_pylist() == ["STN001", "STN002"]
+    assert table.column("avg_min_temp").null_count == 2
+
+def test_keyset_page_metadata(client):
+    response = client.get('/api/weather/?station_id=STN001&cursor=&per_page=2&include_total=true', headers=ARROW)
+
+    table = _table(response)
+    expected = client.get('/api/weather/?station_id=STN001&cursor=&per_page=2&include_total=true').get_json()
+    assert table.num_rows == 2
+    assert table.schema.metadata[b"next_cursor"].decode() == expected["next_cursor"]
+    assert table.schema.metadata[b"total"] == b"3"
+
+def test_json_stays_the_default_and_formats_are_cached_apart(client):
+    assert client.get('/api/weather/?station_id=STN001').mimetype == "application/json"
+    arrow_etag = client.get('/api/weather/?station_id=STN001', headers=ARROW).headers["ETag"]
+    json_etag = client.get('/api/weather/?station_id=STN001', headers={"Accept": "application/json"}).headers["ETag"]
+    assert arrow_etag != json_etag
+
+def test_arrow_export_streams_record_batches(client):
+    response = client.get('/api/weather/export?start_date=2023-01-01&end_date=2023-01-02&format=arrow')
+
+    assert response.status_code == 200
+    reader = pa.ipc.open_stream(response.data)
+    batches = list(reader)
+    assert len(batches) == 2  # EXPORT_FETCH_ROWS rows per batch
+    assert pa.Table.from_batches(batches).column("station_id").to_pylist() == ["STN001", "STN001", "STN002", "STN002"]
+
+def test_arrow_without_pyarrow_is_not_acceptable(client, monkeypatch):
+    monkeypatch.setattr(arrow_format, "pa", None)
+
+    assert client.get('/api/weather/?station_id=STN001', headers=ARROW).status_code == 406
+    fallback = client.get('/api/weather/?station_id=STN001',
+                          headers={"Accept": "application/vnd.apache.arrow.stream, application/json;q=0.5"})
+    assert fallback.status_code == 200
+    assert json.loads(fallback.data)[0]["station_id"] == "STN001"
+    assert client.get('/api/weather/export?station_id=STN001&format=arrow').status_code == 406
@@ -0,0 +1,54 @@
+import json
+import pytest
+from datetime import date, timedelta
+from app import db
+from app.models.weather_data import WeatherData
+
+
+@pytest.fixture
+def app_config():
+    return {"EXPORT_FETCH_ROWS": 2}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """Five days for each of two stations, inserted out of key order."""
+    start = date(2023, 1, 1)
+    db.session.add_all([
+        WeatherData(station_id=station, date=start + timedelta(days=day),
+                    max_temp=day * 10, min_temp=None if day == 1 else 0, precipitation=5)
+        for station in ("STN002", "STN001")
+        for day in range(5)
+    ])
+    db.session.commit()
+
+
+def test_ndjson_export_streams_a_station_in_date_order(client):
+    response = client.get('/api/weather/export?station_id=STN001')
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [row["date"] for row in rows] == [f"2023-01-0{day}" for day in range(1, 6)]
+    assert rows[0] == {"station_id": "STN001", "date": "2023-01-01", "max_temp": 0.0,
+                       "min_temp": 0.0, "precipitation": 0.5}
+    assert rows[1]["min_temp"] is None
+
+def test_csv_export_of_a_date_range_across_stations(client):
+    response = client.get('/api/weather/export?start_date=2023-01-02&end_date=2023-01-03&format=csv')
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.get_data(as_text=True).splitlines() == [
+        "station_id,date,max_temp,min_temp,precipitation",
+        "STN001,2023-01-02,1.0,,0.5",
+        "STN001,2023-01-03,2.0,0.0,0.5",
+        "STN002,2023-01-02,1.0,,0.5",
+        "STN002,2023-01-03,2.0,0.0,0.5",
+    ]
+
+def test_export_rejects_unbounded_or_malformed_requests(client):
+    assert client.get('/api/weather/export').status_code == 400
+    assert client.get('/api/weather/export?start_date=2023-01-01').status_code == 400
+    assert client.get('/api/weather/export?station_id=STN001&format=xml').status_code == 400
+    assert client.get('/api/weather/export?station_id=STN001&end_date=2023-02-30').status_code == 400
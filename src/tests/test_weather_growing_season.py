@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+from datetime import date, timedelta
+from app import db
+from app.models.weather_data import WeatherData
+from app.controllers.weather_analytics_controller import WeatherAnalyticsController
+from app.models.data_version import DataVersion
+from app.services.prefix_sums import StationPrefixSums, daily_gdd
+
+# (max_temp, min_temp, precipitation) in tenths for 2000-05-01 onwards; None is a
+# missing day (no row at all), and a None measurement was -9999 in the source file
+DAYS = [
+    (250, 120, 0), (320, 80, 15), None, (None, 100, 30),
+    (180, 60, None), (350, 220, 5), (90, 20, 0), (280, 150, 120),
+]
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """One station's spring, with a missing day and missing measurements."""
+    db.session.add(DataVersion(id=1, version=1))
+    db.session.add_all([
+        WeatherData(station_id="STN001", date=date(2000, 5, 1) + timedelta(days=i),
+                    max_temp=day[0], min_temp=day[1], precipitation=day[2])
+        for i, day in enumerate(DAYS) if day is not None
+    ])
+    db.session.commit()
+
+
+def test_daily_gdd_clamps_temperatures_to_the_corn_range():
+    gdd = daily_gdd(np.array([350.0, 90.0, np.nan]), np.array([220.0, 20.0, 100.0]))
+
+    assert gdd[0] == pytest.approx((300 + 220) / 2 - 100)
+    assert gdd[1] == 0
+    assert np.isnan(gdd[2])
+
+def test_range_totals_match_summing_the_daily_rows(client):
+    response = client.get('/api/weather/growing-season?station_id=STN001&start_date=2000-05-02&end_date=2000-05-07')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    days = [d for d in DAYS[1:7] if d is not None]
+    expected_gdd = sum(
+        max(0, (min(max(t_max, 100), 300) + min(max(t_min, 100), 300)) / 2 - 100)
+        for t_max, t_min, _ in days if t_max is not None and t_min is not None
+    )
+    assert body["growing_degree_days"] == pytest.approx(expected_gdd / 10)
+    assert body["gdd_days"] == 4
+    assert body["total_precipitation"] == pytest.approx((15 + 30 + 5 + 0) / 100)
+    assert body["precipitation_days"] == 4
+    assert body["avg_max_temp"] == pytest.approx((320 + 180 + 350 + 90) / 4 / 10)
+    assert len(body["series"]) == 6
+    assert body["series"][-1]["growing_degree_days"] == pytest.approx(body["growing_degree_days"])
+
+def test_moving_averages_skip_gaps_and_reach_before_the_range(client):
+    response = client.get('/api/weather/growing-season?station_id=STN001&start_date=2000-05-03&window=3')
+
+    series = response.get_json()["series"]
+    assert series[0]["date"] == "2000-05-03"
+    # 05-01..05-03: the 05-03 row is missing, so the mean is over two days
+    assert series[0]["moving_max_temp"] == pytest.approx((250 + 320) / 2 / 10)
+    # 05-02..05-04: max_temp observed on 05-02 only
+    assert series[1]["moving_max_temp"] == pytest.approx(32.0)
+    assert series[1]["moving_precipitation"] == pytest.approx((15 + 30) / 2 / 10)
+    assert series[-1]["date"] == "2000-05-08"
+    assert series[-1]["total_precipitation"] == pytest.approx((30 + 5 + 0 + 120) / 100)
+
+def test_invalid_requests(client):
+    assert client.get('/api/weather/growing-season').status_code == 400
+    assert client.get('/api/weather/growing-season?station_id=STN001&window=0').status_code == 400
+    assert client.get('/api/weather/growing-season?station_id=NOPE').status_code == 400
+
+def test_count_prefixes_are_int32():
+    prefix = StationPrefixSums.from_rows([(date(2000, 5, 1), 250, None, 0), (date(2000, 5, 3), 300, 120, 5)])
+
+    assert all(counts.dtype == np.int32 for counts in prefix.counts.values())
+    assert prefix.range_total("min_temp", 0, 3) == (120.0, 1)
+
+def test_prefix_sums_cache_is_bounded_and_skips_unknown_stations(app, client, monkeypatch):
+    monkeypatch.setattr(WeatherAnalyticsController, "PREFIX_SUMS_MAX_STATIONS", 2)
+    db.session.add_all([
+        WeatherData(station_id=station_id, date=date(2000, 5, 1), max_temp=200, min_temp=100, precipitation=0)
+        for station_id in ("STN002", "STN003")
+    ])
+    db.session.commit()
+
+    for station_id in ("STN001", "STN002", "NOPE"):
+        client.get(f'/api/weather/growing-season?station_id={station_id}')
+    version, stations = app.extensions["versioned_values"]["prefix_sums"]
+    assert version == 1
+    assert stations.get("STN001") is not None  # the unknown station took no slot
+
+    client.get('/api/weather/growing-season?station_id=STN003')
+    assert stations.get("STN002") is None
+    assert stations.get("STN003") is not None
@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+from datetime import date
+from app import db
+from app.models.weather_data import WeatherData
+from app.models.weather_sketch import WeatherSketch
+from app.services.quantile_sketch import decode_sketch, merge_sketches, quantiles
+from scripts.weather_sketches import encode_sketch, refresh_sketches
+
+IOWA_1, IOWA_2, OHIO = "USC00130001", "USC00130002", "USC00330001"
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """July days for two Iowa and one Ohio station and the sketches built from them."""
+    rows = []
+    for day in range(1, 11):
+        rows.append(WeatherData(station_id=IOWA_1, date=date(2012, 7, day), max_temp=300 + day,
+                                min_temp=None, precipitation=0 if day % 2 else day * 10))
+        rows.append(WeatherData(station_id=IOWA_2, date=date(2012, 7, day), max_temp=250 + day,
+                                min_temp=100, precipitation=0))
+        rows.append(WeatherData(station_id=OHIO, date=date(2013, 7, day), max_temp=100, min_temp=50, precipitation=5))
+    db.session.add_all(rows)
+    db.session.commit()
+    refresh_sketches(db.session.connection())
+    db.session.commit()
+
+
+def test_merged_sketch_quantiles_match_numpy():
+    rng = np.random.default_rng(0)
+    parts = [rng.integers(-100, 400, size) for size in (365, 200, 1)]
+    sketches = [decode_sketch(encode_sketch(*np.unique(part, return_counts=True))) for part in parts]
+
+    values, counts = merge_sketches(sketches)
+    qs = [0, 0.05, 0.5, 0.95, 0.99, 1]
+
+    assert quantiles(values, counts, qs) == pytest.approx(np.quantile(np.concatenate(parts), qs).tolist())
+
+def test_percentiles_for_a_station_year(client):
+    response = client.get(f'/api/weather/percentiles?measure=max_temp&q=0.5,0.95&station_id={IOWA_1}&start_year=2012&end_year=2012')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    expected = np.quantile(np.arange(301, 311), [0.5, 0.95]) / 10
+    assert body["days"] == 10 and body["station_years"] == 1
+    assert [p["value"] for p in body["percentiles"]] == pytest.approx(expected.tolist())
+    assert (body["min"], body["max"]) == (30.1, 31.0)
+
+def test_wet_day_median_across_a_state(client):
+    response = client.get('/api/weather/percentiles?measure=precipitation&q=0.5&state=ia&wet_days=true')
+
+    body = response.get_json()
+    assert body["stations"] == 2
+    assert body["days"] == 5  # Only the even days of IOWA_1 were wet
+    assert body["percentiles"] == [{"q": 0.5, "value": 6.0}]
+
+def test_no_matching_days_returns_nulls(client):
+    body = client.get(f'/api/weather/percentiles?measure=min_temp&q=0.5&station_id={IOWA_1}').get_json()
+
+    assert body["days"] == 0
+    assert body["percentiles"] == [{"q": 0.5, "value": None}]
+
+@pytest.mark.parametrize("query", [
+    "measure=humidity", "q=1.5", "q=abc", "measure=max_temp&wet_days=true",
+])
+def test_invalid_requests(client, query):
+    assert client.get(f'/api/weather/percentiles?{query}').status_code == 400
+
+def test_incremental_refresh_rebuilds_only_the_changed_station_years(app):
+    with app.app_context():
+        db.session.add(WeatherData(station_id=OHIO, date=date(2013, 7, 20), max_temp=400, min_temp=50, precipitation=5))
+        db.session.commit()
+        untouched = db.session.query(WeatherSketch.id).filter_by(station_id=IOWA_1).all()
+
+        assert refresh_sketches(db.session.connection(), [(OHIO, 2013)]) == 3
+        db.session.commit()
+
+        sketch = db.session.query(WeatherSketch).filter_by(station_id=OHIO, measure="max_temp").one()
+        assert sketch.observations == 11
+        assert decode_sketch(sketch.sketch)[0].tolist() == [100, 400]
+        assert db.session.query(WeatherSketch.id).filter_by(station_id=IOWA_1).all() == untouched
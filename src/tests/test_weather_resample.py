@@ -0,0 +1,61 @@
+import pytest
+from datetime import date, timedelta
+from app import db
+from app.models.weather_data import WeatherData
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """One station from 2022-11-25 to 2023-03-05; precipitation missing on Sundays."""
+    # 2022-11-25 .. 2023-03-05 for one station; precipitation missing on Sundays
+    start = date(2022, 11, 25)
+    db.session.add_all([
+        WeatherData(station_id="STN001", date=start + timedelta(days=day), max_temp=100 + day % 2 * 20,
+                    min_temp=-50, precipitation=None if (start + timedelta(days=day)).weekday() == 6 else 10)
+        for day in range(101)
+    ])
+    db.session.commit()
+
+
+def test_monthly_resample_is_clipped_to_the_range(client):
+    response = client.get('/api/weather/resample?station_id=STN001&start_date=2022-12-15&end_date=2023-02-28')
+
+    assert response.status_code == 200
+    rows = response.get_json()
+    assert [row["period_start"] for row in rows] == ["2022-12-01", "2023-01-01", "2023-02-01"]
+    december = rows[0]
+    assert december["days"] == 17
+    assert december["observed_days"] == 17
+    assert december["avg_min_temp"] == -5.0
+    assert december["missing_max_temp"] == 0
+    # Sundays 18th and 25th have no precipitation reading
+    assert december["missing_precipitation"] == 2
+    assert december["total_precipitation"] == pytest.approx(1.5)
+
+def test_seasons_put_december_into_the_next_winter(client):
+    rows = client.get('/api/weather/resample?station_id=STN001&period=season').get_json()
+
+    assert [(row["period_start"], row["days"], row["observed_days"]) for row in rows] == [
+        ("2022-09-01", 91, 6),
+        ("2022-12-01", 90, 90),
+        ("2023-03-01", 92, 5),
+    ]
+    assert rows[0]["missing_max_temp"] == 85
+
+def test_weeks_start_on_monday(client):
+    rows = client.get('/api/weather/resample?station_id=STN001&period=week&end_date=2022-12-11').get_json()
+
+    assert [(row["period_start"], row["observed_days"]) for row in rows] == [
+        ("2022-11-21", 3), ("2022-11-28", 7), ("2022-12-05", 7),
+    ]
+    assert rows[1]["avg_max_temp"] == pytest.approx(78 / 7)
+
+def test_resample_rejects_bad_requests(client):
+    assert client.get('/api/weather/resample').status_code == 400
+    assert client.get('/api/weather/resample?station_id=STN001&period=decade').status_code == 400
+    assert client.get('/api/weather/resample?station_id=STN001&start_date=2023-1-1').status_code == 400
+
+def test_daily_data_accepts_a_date_range(client):
+    rows = client.get('/api/weather/?station_id=STN001&start_date=2023-01-30&end_date=2023-02-02').get_json()
+
+    assert [row["date"] for row in rows] == ["2023-01-30", "2023-01-31", "2023-02-01", "2023-02-02"]
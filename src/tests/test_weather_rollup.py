@@ -0,0 +1,76 @@
+import pytest
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from app import db
+from app.models.weather_data import WeatherData
+from app.services.rollup_planner import plan_rollup
+from scripts.weather_rollups import refresh_rollups
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """Daily rows in two states and the rollup cube built from them."""
+    db.session.add_all([
+        WeatherData(station_id="USC00110001", date=date(2022, 12, 31), max_temp=10, min_temp=-10, precipitation=100),
+        WeatherData(station_id="USC00110001", date=date(2023, 1, 15), max_temp=30, min_temp=None, precipitation=0),
+        WeatherData(station_id="USC00110002", date=date(2023, 2, 1), max_temp=50, min_temp=-30, precipitation=200),
+        WeatherData(station_id="USC00250001", date=date(2023, 7, 1), max_temp=300, min_temp=150, precipitation=None),
+    ])
+    db.session.commit()
+    refresh_rollups(db.session.connection())
+    db.session.commit()
+
+
+@pytest.mark.parametrize("level, period, grain", [
+    ("all", "year", ("all", "year")),
+    ("state", "year", ("state", "year")),
+    ("all", "season", ("station", "season")),
+    ("station", "year", ("station", "month")),
+    ("state", "month", ("station", "month")),
+])
+def test_planner_picks_the_coarsest_answering_grain(level, period, grain):
+    assert plan_rollup(level, period) == grain
+
+def test_state_seasons_are_summed_from_station_months_or_seasons(client):
+    response = client.get('/api/weather/rollup?level=state&period=season&region=IL&year=2023')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["source_grain"] == "station_season"
+    assert body["items"] == [{
+        "region": "IL", "year": 2023, "period": "season", "period_index": 1, "observed_days": 3,
+        "avg_max_temp": 3.0, "avg_min_temp": -2.0, "total_precipitation": 3.0, "heat_days": 0,
+    }]
+
+def test_station_years_roll_up_from_months(client):
+    body = client.get('/api/weather/rollup?level=station&period=year&region=USC00110001').get_json()
+
+    assert body["source_grain"] == "station_month"
+    assert [(item["year"], item["avg_max_temp"]) for item in body["items"]] == [(2022, 1.0), (2023, 3.0)]
+
+def test_all_stations_year_is_a_lookup(client):
+    body = client.get('/api/weather/rollup?level=all&period=year&year=2023').get_json()
+
+    assert body["source_grain"] == "all_year"
+    assert body["items"][0]["observed_days"] == 3
+    assert body["items"][0]["heat_days"] == 1
+    assert body["items"][0]["avg_max_temp"] == pytest.approx(38 / 3)
+
+def test_rollup_rejects_unknown_levels(client):
+    assert client.get('/api/weather/rollup?level=county').status_code == 400
+
+def test_rollup_averages_are_floats_when_sums_are_decimals(client, monkeypatch):
+    # PostgreSQL answers SUM over BIGINT as numeric, which the driver returns as Decimal
+    execute = db.session.execute
+
+    def decimal_sums(statement, *args, **kwargs):
+        rows = execute(statement, *args, **kwargs).mappings().all()
+        return [SimpleNamespace(**{k: Decimal(v) if k.endswith("_sum") and v is not None else v
+                                   for k, v in row.items()}) for row in rows]
+
+    monkeypatch.setattr(db.session, "execute", decimal_sums)
+    item = client.get('/api/weather/rollup?level=state&period=season&region=IL&year=2023').get_json()["items"][0]
+
+    for name in ("avg_max_temp", "avg_min_temp", "total_precipitation"):
+        assert type(item[name]) is float
@@ -0,0 +1,75 @@
+import pytest
+from datetime import date, timedelta
+from app import db
+from app.models.data_version import DataVersion
+from app.models.weather_data import WeatherData
+from app.models.yield_data import YieldData
+from app.controllers.yield_analytics_controller import YieldAnalyticsController
+from scripts.weather_rollups import refresh_rollups
+
+# Hotter summers, lower yields
+SUMMER_MAX_TEMP = {2001: 250, 2002: 330, 2003: 290, 2004: 310, 2005: 270}
+YIELDS = {2001: 1000, 2002: 700, 2003: 880, 2004: 790, 2005: 960, 2006: 500}
+
+
+@pytest.fixture(autouse=True)
+def seed(app):
+    """Summer and winter days per year for two stations, the yields and the rollups."""
+    for station in ("USC00110001", "USC00250001"):
+        for year, summer in SUMMER_MAX_TEMP.items():
+            db.session.add_all([
+                WeatherData(station_id=station, date=date(year, 7, 1) + timedelta(days=day),
+                            max_temp=summer, min_temp=150, precipitation=20 if station == "USC00110001" else 40)
+                for day in range(10)
+            ])
+            db.session.add(WeatherData(station_id=station, date=date(year, 1, 10), max_temp=-20,
+                                       min_temp=-100, precipitation=0))
+    db.session.add_all([YieldData(year=year, total_yield=value) for year, value in YIELDS.items()])
+    db.session.add(DataVersion(id=1, version=1))
+    db.session.commit()
+    refresh_rollups(db.session.connection())
+    db.session.commit()
+
+
+def test_feature_matrix_joins_seasonal_features_with_yield(app):
+    matrix = YieldAnalyticsController._build_feature_matrix()
+
+    assert matrix.index.tolist() == [2001, 2002, 2003, 2004, 2005]
+    assert matrix.loc[2002, "summer_max_temp"] == 33.0
+    assert matrix.loc[2002, "summer_heat_days"] == 10
+    # Per-station totals (2 cm and 4 cm) averaged over stations
+    assert matrix.loc[2002, "summer_precipitation"] == 3.0
+    assert matrix.loc[2002, "winter_min_temp"] == -10.0
+
+def test_analysis_reports_correlations_and_regression(client):
+    response = client.get('/api/yield/analysis?features=summer_max_temp&include_matrix=true')
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["years"] == [2001, 2005]
+    summer = body["features"]["summer_max_temp"]
+    assert summer["n"] == 5
+    assert summer["correlation"] < -0.99
+    assert summer["slope"] < 0
+    assert body["features"]["winter_heat_days"]["correlation"] is None
+    assert body["regression"]["r_squared"] > 0.99
+    assert set(body["regression"]["coefficients"]) == {"intercept", "year", "summer_max_temp"}
+    assert len(body["matrix"]) == 5
+
+def test_feature_matrix_is_rebuilt_only_when_the_data_version_changes(app, mocker):
+    build = mocker.spy(YieldAnalyticsController, "_build_feature_matrix")
+
+    YieldAnalyticsController.fetch_yield_analysis()
+    YieldAnalyticsController.fetch_yield_analysis()
+    assert build.call_count == 1
+
+    db.session.get(DataVersion, 1).version += 1
+    db.session.commit()
+    YieldAnalyticsController.fetch_yield_analysis()
+    assert build.call_count == 2
+
+def test_unknown_features_are_rejected(client):
+    response = client.get('/api/yield/analysis?features=autumn_humidity')
+
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Unknown features: autumn_humidity"